@@ -0,0 +1,52 @@
+"""Benchmark for parsing many pipeline packages in parallel.
+
+Usage:
+    python benchmarks/bench_parse_pipeline_packages.py [--tasks N] [--packages N]
+
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import yaml
+from bench_pipeline_parser import make_pipeline_spec
+
+from kfp_toolbox.pipeline_parser import parse_pipeline_packages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--packages", type=int, default=64)
+    args = parser.parse_args()
+
+    spec = make_pipeline_spec(args.tasks)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(args.packages):
+            if i % 2 == 0:
+                with open(os.path.join(tmpdir, f"pipeline-{i}.json"), "w") as f:
+                    json.dump(spec, f)
+            else:
+                with open(os.path.join(tmpdir, f"pipeline-{i}.yaml"), "w") as f:
+                    yaml.safe_dump(spec, f)
+
+        cpu_count = os.cpu_count() or 1
+        workers_list = sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+        serial = None
+        for workers in workers_list:
+            start = time.perf_counter()
+            for _, result in parse_pipeline_packages(tmpdir, workers=workers):
+                assert not isinstance(result, Exception)
+            elapsed = time.perf_counter() - start
+            serial = serial or elapsed
+            print(
+                f"{args.packages} packages, workers={workers}: {elapsed:.2f}s "
+                f"({serial / elapsed:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
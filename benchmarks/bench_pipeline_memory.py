@@ -0,0 +1,62 @@
+"""Benchmark for the memory held by parsed pipelines.
+
+Usage:
+    python benchmarks/bench_pipeline_memory.py [--tasks N] [--pipelines N]
+
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+
+from bench_pipeline_parser import make_pipeline_spec
+
+from kfp_toolbox.pipeline_parser import parse_pipeline_package
+
+
+def held_memory(paths, **kwargs) -> int:
+    gc.collect()
+    tracemalloc.start()
+    pipelines = [parse_pipeline_package(path, **kwargs) for path in paths]
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del pipelines
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--pipelines", type=int, default=50)
+    args = parser.parse_args()
+
+    spec = make_pipeline_spec(args.tasks)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(args.pipelines):
+            path = os.path.join(tmpdir, f"pipeline-{i}.json")
+            with open(path, "w") as f:
+                json.dump(spec, f)
+            paths.append(path)
+
+        for label, kwargs in [
+            ("retain_spec=True", {}),
+            ("retain_spec=False", {"retain_spec": False}),
+            (
+                "header_only=True, retain_spec=False",
+                {
+                    "header_only": True,
+                    "retain_spec": False,
+                },
+            ),
+        ]:
+            size_mb = held_memory(paths, **kwargs) / 1024 / 1024
+            print(f"{args.pipelines} pipelines, {label}: {size_mb:.1f} MB held")
+
+
+if __name__ == "__main__":
+    main()
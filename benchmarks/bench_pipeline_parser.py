@@ -0,0 +1,135 @@
+"""Benchmark for parsing large pipeline packages.
+
+Usage:
+    python benchmarks/bench_pipeline_parser.py [--tasks N] [--repeat N]
+
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import timeit
+import tracemalloc
+
+import yaml
+
+from kfp_toolbox.pipeline_parser import (
+    parse_pipeline_package,
+    summarize_pipeline_package,
+)
+
+
+def make_pipeline_spec(num_tasks: int) -> dict:
+    components = {}
+    executors = {}
+    tasks = {}
+    for i in range(num_tasks):
+        components[f"comp-task-{i}"] = {
+            "executorLabel": f"exec-task-{i}",
+            "inputDefinitions": {"parameters": {"value": {"type": "STRING"}}},
+            "outputDefinitions": {"parameters": {"Output": {"type": "STRING"}}},
+        }
+        executors[f"exec-task-{i}"] = {
+            "container": {
+                "image": "python:3.7",
+                "command": ["sh", "-c", "echo " + "x" * 1024],
+                "args": ["--executor_input", "{{$}}"],
+            }
+        }
+        tasks[f"task-{i}"] = {
+            "componentRef": {"name": f"comp-task-{i}"},
+            "dependentTasks": [f"task-{i - 1}"] if i > 0 else [],
+            "taskInfo": {"name": f"task-{i}"},
+        }
+
+    return {
+        "pipelineSpec": {
+            "components": components,
+            "deploymentSpec": {"executors": executors},
+            "pipelineInfo": {"name": "bench-pipeline"},
+            "root": {
+                "dag": {"tasks": tasks},
+                "inputDefinitions": {
+                    "parameters": {
+                        "int_param": {"type": "INT"},
+                        "str_param": {"type": "STRING"},
+                    }
+                },
+            },
+            "schemaVersion": "2.0.0",
+            "sdkVersion": "kfp-1.8.22",
+        },
+        "runtimeConfig": {"parameters": {"int_param": {"intValue": 1}}},
+    }
+
+
+def baseline(filepath: str):
+    with open(filepath, "r") as f:
+        return yaml.safe_load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spec = make_pipeline_spec(args.tasks)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = os.path.join(tmpdir, "pipeline.json")
+        with open(json_path, "w") as f:
+            json.dump(spec, f, indent=2)
+        yaml_path = os.path.join(tmpdir, "pipeline.yaml")
+        with open(yaml_path, "w") as f:
+            yaml.safe_dump(spec, f)
+
+        for path in [json_path, yaml_path]:
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            base = min(
+                timeit.repeat(lambda: baseline(path), number=1, repeat=args.repeat)
+            )
+            new = min(
+                timeit.repeat(
+                    lambda: parse_pipeline_package(path), number=1, repeat=args.repeat
+                )
+            )
+            header = min(
+                timeit.repeat(
+                    lambda: parse_pipeline_package(path, header_only=True),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            summary = min(
+                timeit.repeat(
+                    lambda: summarize_pipeline_package(path),
+                    number=1,
+                    repeat=args.repeat,
+                )
+            )
+            print(
+                f"{os.path.basename(path)} ({size_mb:.1f} MB): "
+                f"yaml.safe_load {base:.3f}s, parse_pipeline_package {new:.3f}s "
+                f"({base / new:.1f}x), header_only {header:.3f}s "
+                f"({base / header:.1f}x), summarize {summary:.3f}s "
+                f"({base / summary:.1f}x)"
+            )
+            for label, func in [
+                ("yaml.safe_load", lambda: baseline(path)),
+                ("parse_pipeline_package", lambda: parse_pipeline_package(path)),
+                (
+                    "header_only",
+                    lambda: parse_pipeline_package(path, header_only=True),
+                ),
+                ("summarize", lambda: summarize_pipeline_package(path)),
+            ]:
+                tracemalloc.start()
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"  {label} peak memory: {peak / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark for bulk submission against a fake backend.
+
+The fake backend simulates the latency and the rate limit of a pipeline service, so
+the bulk, retry and throttling paths can be measured offline.
+
+Usage:
+    python benchmarks/bench_submission.py [--runs N] [--latency SECONDS]
+        [--max-rate RPS]
+
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from bench_pipeline_parser import make_pipeline_spec
+
+from kfp_toolbox.backends import FakeApiError, FakeBackend
+from kfp_toolbox.pipeline_jobs import submit_pipeline_job, submit_pipeline_jobs
+from kfp_toolbox.throttling import Throttle
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--max-rate", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pipeline_path = os.path.join(tmpdir, "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            json.dump(make_pipeline_spec(args.tasks), f)
+        arguments_list = [{"param": i} for i in range(args.runs)]
+
+        def report(label, results, backend, elapsed):
+            failed = sum(isinstance(result, FakeApiError) for result in results)
+            print(
+                f"{label}: {elapsed:.2f} s, {args.runs / elapsed:.0f} runs/s, "
+                f"{failed} failed, {backend.throttled} throttled responses"
+            )
+
+        backend = FakeBackend(latency=args.latency, max_rate=args.max_rate, burst=10)
+        start = time.perf_counter()
+        results = []
+        for arguments in arguments_list:
+            try:
+                results.append(
+                    submit_pipeline_job(
+                        pipeline_path, arguments=arguments, backend=backend
+                    )
+                )
+            except FakeApiError as e:
+                results.append(e)
+        report("sequential", results, backend, time.perf_counter() - start)
+
+        for label, throttle in [
+            ("bulk", None),
+            ("bulk with throttle", Throttle(rate=args.max_rate * 2, burst=10)),
+        ]:
+            backend = FakeBackend(
+                latency=args.latency, max_rate=args.max_rate, burst=10
+            )
+            start = time.perf_counter()
+            results = submit_pipeline_jobs(
+                pipeline_path,
+                arguments_list,
+                max_workers=16,
+                backend=backend,
+                throttle=throttle,
+            )
+            report(label, results, backend, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
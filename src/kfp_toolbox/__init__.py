@@ -1,9 +1,39 @@
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 # "_version.py" is automatically generated when building a package.
 from ._version import __version__  # noqa: F401
-from .decorators import (  # noqa: F401
-    caching,
-    container_spec,
-    display_name,
-    override_docstring,
-    spec,
-)
+
+if TYPE_CHECKING:
+    from .decorators import (  # noqa: F401
+        caching,
+        container_spec,
+        display_name,
+        override_docstring,
+        spec,
+    )
+
+# The decorators import the kfp SDK, which takes most of the time to import this
+# package, so they are imported on first access instead (PEP 562).
+_LAZY_ATTRIBUTES = {
+    "caching": "decorators",
+    "container_spec": "decorators",
+    "display_name": "decorators",
+    "override_docstring": "decorators",
+    "spec": "decorators",
+}
+
+__all__ = ["__version__", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
@@ -0,0 +1,1121 @@
+import abc
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+from typing import Any, Callable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+from . import clients, pipeline_cache, pipeline_parser, throttling, tracing
+
+T = TypeVar("T")
+
+Submitter = Callable[[int, Optional[Mapping[str, Any]]], Any]
+
+_KFP_UPLOAD_EXTENSIONS = (".yaml", ".yml", ".tar.gz", ".tgz", ".zip")
+_KFP_FINAL_STATES = {"succeeded", "failed", "skipped", "error"}
+_VERTEX_FINAL_STATES = {
+    "PIPELINE_STATE_SUCCEEDED",
+    "PIPELINE_STATE_FAILED",
+    "PIPELINE_STATE_CANCELLED",
+    "PIPELINE_STATE_PAUSED",
+}
+
+
+def _indexed_name(run_name: Optional[str], index: int) -> Optional[str]:
+    return f"{run_name}-{index}" if run_name else None
+
+
+def _call(
+    throttle: Optional[throttling.Throttle],
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    # A request that reads, or gets or creates a resource by name, which can be
+    # retried on any throttling response.
+    if throttle is None:
+        return func(*args, **kwargs)
+    return throttle.call(func, *args, **kwargs)
+
+
+def _create(
+    throttle: Optional[throttling.Throttle],
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    # A request that creates a new resource, which is retried only if the service
+    # rejected it without creating the resource.
+    if throttle is None:
+        return func(*args, **kwargs)
+    return throttle.create(func, *args, **kwargs)
+
+
+class Backend(abc.ABC):
+    """Service that runs pipeline jobs.
+
+    A backend holds the options specific to the service, such as the endpoint and
+    credentials, while the options common to all services are given on each
+    submission.
+
+    """
+
+    @abc.abstractmethod
+    def submit(
+        self,
+        pipeline_file: str,
+        arguments: Optional[Mapping[str, Any]] = None,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        tracer: Optional[tracing.Tracer] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Any:
+        """Submit a pipeline job.
+
+        Args:
+            pipeline_file (str): Path of the pipeline package file.
+            arguments (Optional[Mapping[str, Any]], optional): Arguments to the
+                pipeline function provided as a dict. Defaults to None.
+            run_name (Optional[str], optional): Name of the run to be shown in the
+                UI. Defaults to None.
+            experiment_name (Optional[str], optional): Name of the experiment to add
+                the run to. Defaults to None.
+            pipeline_root (Optional[str], optional): The root path of the pipeline
+                outputs. Defaults to None.
+            enable_caching (Optional[bool], optional): Whether or not to enable
+                caching for the run. Defaults to None.
+            service_account (Optional[str], optional): The service account that the
+                run uses. Defaults to None.
+            tracer (Optional[tracing.Tracer], optional): Records the phases of the
+                submission, such as creating the client and the run. Defaults to
+                None.
+            throttle (Optional[throttling.Throttle], optional): Limits the rate of
+                each API request of the submission and retries throttled ones. The
+                request that creates the run is retried with
+                :meth:`.throttling.Throttle.create`, so that a run is not created
+                twice. Defaults to None.
+
+        Returns:
+            Any: The submitted run.
+
+        """
+
+    def submitter(
+        self,
+        pipeline_file: str,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Submitter:
+        """Prepare to submit many runs of the same pipeline.
+
+        Work shared by the runs, such as decoding the pipeline package, is done once
+        here. The returned function can be called from several threads.
+
+        The arguments are the same as :meth:`submit`, except that :attr:`run_name`
+        is suffixed with the index of each run and submissions are not traced.
+
+        Returns:
+            Submitter: A function that submits a run given its index and arguments.
+
+        """
+
+        def submit(index: int, arguments: Optional[Mapping[str, Any]]) -> Any:
+            return self.submit(
+                pipeline_file,
+                arguments=arguments,
+                run_name=_indexed_name(run_name, index),
+                experiment_name=experiment_name,
+                pipeline_root=pipeline_root,
+                enable_caching=enable_caching,
+                service_account=service_account,
+                throttle=throttle,
+            )
+
+        return submit
+
+    @abc.abstractmethod
+    def run_state(self, run: Any) -> Tuple[str, bool]:
+        """Get the current state of a submitted run.
+
+        Args:
+            run (Any): A run returned by :meth:`submit`.
+
+        Returns:
+            Tuple[str, bool]: The state, and whether the state is final.
+
+        """
+
+    @property
+    def scope(self) -> str:
+        """str: Identity of the service, such as its endpoint, that distinguishes
+        the runs of identical submissions to different services."""
+
+        return type(self).__name__
+
+    @abc.abstractmethod
+    def run_id(self, run: Any) -> str:
+        """Get the ID of a submitted run.
+
+        Args:
+            run (Any): A run returned by :meth:`submit`.
+
+        Returns:
+            str: The ID from which :meth:`get_run` gets the run.
+
+        """
+
+    @abc.abstractmethod
+    def get_run(self, run_id: str) -> Any:
+        """Get a submitted run by ID.
+
+        Args:
+            run_id (str): An ID returned by :meth:`run_id`.
+
+        Returns:
+            Any: The run, in the same form as returned by :meth:`submit`.
+
+        """
+
+
+@contextlib.contextmanager
+def _upload_path(pipeline_file: str) -> Iterator[str]:
+    # The KFP API service accepts only the extensions of YAML files and archives,
+    # so a JSON package is copied into a temporary YAML file (JSON is valid YAML).
+    if pipeline_file.endswith(_KFP_UPLOAD_EXTENSIONS):
+        yield pipeline_file
+        return
+
+    fd, upload_path = tempfile.mkstemp(suffix=".yaml")
+    try:
+        with os.fdopen(fd, "wb") as dst, open(pipeline_file, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        yield upload_path
+    finally:
+        os.remove(upload_path)
+
+
+class _RunPipelineResult:
+    # The same interface as the result of
+    # kfp.Client.create_run_from_pipeline_package, which is not importable.
+
+    def __init__(self, client: Any, run_info: Any):
+        self._client = client
+        self.run_info = run_info
+        self.run_id = run_info.id
+
+    def wait_for_run_completion(self, timeout: Optional[float] = None) -> Any:
+        return self._client.wait_for_run_completion(
+            self.run_id, timeout or datetime.timedelta.max
+        )
+
+    def __repr__(self) -> str:
+        return f"RunPipelineResult(run_id={self.run_id})"
+
+
+def _default_run_name(pipeline_file: str) -> str:
+    # The same as the run names generated by kfp.Client.
+    return "{} {}".format(
+        os.path.basename(pipeline_file),
+        datetime.datetime.now().strftime("%Y-%m-%d %H-%M-%S"),
+    )
+
+
+def _resolve_experiment_name(experiment_name: Optional[str]) -> str:
+    # The same as kfp.Client.create_run_from_pipeline_package, so that runs land in
+    # the same experiment whichever way they are submitted.
+    experiment_name = experiment_name or os.environ.get(
+        "KF_PIPELINES_DEFAULT_EXPERIMENT_NAME"
+    )
+    overridden_experiment_name = os.environ.get(
+        "KF_PIPELINES_OVERRIDE_EXPERIMENT_NAME", experiment_name
+    )
+    if overridden_experiment_name != experiment_name:
+        warnings.warn(
+            'Changing experiment name from "{}" to "{}".'.format(
+                experiment_name, overridden_experiment_name
+            )
+        )
+    return overridden_experiment_name or "Default"
+
+
+def _override_caching_options(workflow: Mapping[str, Any], enable_caching: bool):
+    # The same as kfp.Client, which applies the option to the tasks that have it.
+    for template in workflow["spec"]["templates"]:
+        labels = template.get("metadata", {}).get("labels", {})
+        if "pipelines.kubeflow.org/enable_caching" in labels:
+            labels["pipelines.kubeflow.org/enable_caching"] = str(
+                enable_caching
+            ).lower()
+
+
+class _PipelineWorkflow:
+    # A pipeline package decoded once, whose workflow is sent with each run. This
+    # is the request of kfp.Client.run_pipeline with a package path, which would
+    # read and decode the package again for every run.
+
+    def __init__(
+        self,
+        client: Any,
+        pipeline_file: str,
+        experiment_id: str,
+        enable_caching: Optional[bool],
+        throttle: Optional[throttling.Throttle] = None,
+    ):
+        self.client = client
+        self.pipeline_file = pipeline_file
+        self.experiment_id = experiment_id
+        self.throttle = throttle
+        workflow = pipeline_parser.parse_pipeline_package(pipeline_file).spec
+        if enable_caching is not None:
+            _override_caching_options(workflow, enable_caching)  # type: ignore
+        self.manifest = json.dumps(workflow)
+
+    def create_run(
+        self,
+        arguments: Optional[Mapping[str, Any]],
+        run_name: Optional[str],
+        pipeline_root: Optional[str],
+        service_account: Optional[str],
+    ) -> _RunPipelineResult:
+        from kfp.compiler._k8s_helper import sanitize_k8s_name
+        from kfp_server_api import models
+
+        params = dict(arguments or {})
+        if pipeline_root is not None:
+            params["pipeline-root"] = pipeline_root
+        body = models.ApiRun(
+            name=run_name or _default_run_name(self.pipeline_file),
+            pipeline_spec=models.ApiPipelineSpec(
+                workflow_manifest=self.manifest,
+                parameters=[
+                    models.ApiParameter(
+                        name=sanitize_k8s_name(name, allow_capital_underscore=True),
+                        value=json.dumps(value)
+                        if isinstance(value, (list, dict))
+                        else str(value),
+                    )
+                    for name, value in params.items()
+                ],
+            ),
+            resource_references=[
+                models.ApiResourceReference(
+                    key=models.ApiResourceKey(
+                        id=self.experiment_id,
+                        type=models.ApiResourceType.EXPERIMENT,
+                    ),
+                    relationship=models.ApiRelationship.OWNER,
+                )
+            ],
+            service_account=service_account,
+        )
+        response = _create(self.throttle, self.client._run_api.create_run, body=body)
+        return _RunPipelineResult(self.client, response.run)
+
+
+class _PipelineVersion:
+    # A pipeline version uploaded to Kubeflow Pipelines once, from which runs are
+    # created by ID. A version recorded in the upload cache but deleted from the
+    # server is uploaded again on the first failed run.
+
+    def __init__(
+        self,
+        client: Any,
+        endpoint: str,
+        pipeline_file: str,
+        throttle: Optional[throttling.Throttle] = None,
+    ):
+        self.client = client
+        self.endpoint = endpoint
+        self.pipeline_file = pipeline_file
+        self.throttle = throttle
+        self.digest = pipeline_cache.package_digest(pipeline_file)
+        self.upload_cache = pipeline_cache.UploadCache()
+        self._lock = threading.Lock()
+
+        cached_ids = self.upload_cache.get(endpoint, self.digest)
+        self.ids = cached_ids or self._upload()
+        self._cached = cached_ids is not None
+
+    def _upload(self) -> Tuple[str, str]:
+        name = pipeline_parser.parse_pipeline_package(
+            self.pipeline_file, header_only=True
+        ).name
+        version_name = f"{name}-{self.digest[:16]}"
+
+        with _upload_path(self.pipeline_file) as upload_path:
+            pipeline_id = _call(self.throttle, self.client.get_pipeline_id, name)
+            version_id = None
+            if pipeline_id is None:
+                # The default version of a new pipeline is named after the
+                # pipeline, so the version named by the digest is uploaded as well
+                # to be found without the upload cache.
+                pipeline_id = _create(
+                    self.throttle,
+                    self.client.upload_pipeline,
+                    pipeline_package_path=upload_path,
+                    pipeline_name=name,
+                ).id
+            else:
+                version_id = self._find_version(pipeline_id, version_name)
+            if version_id is None:
+                version_id = _create(
+                    self.throttle,
+                    self.client.upload_pipeline_version,
+                    pipeline_package_path=upload_path,
+                    pipeline_version_name=version_name,
+                    pipeline_id=pipeline_id,
+                ).id
+
+        self.upload_cache.put(self.endpoint, self.digest, pipeline_id, version_id)
+        return pipeline_id, version_id
+
+    def _find_version(self, pipeline_id: str, version_name: str) -> Optional[str]:
+        page_token = ""
+        while True:
+            response = _call(
+                self.throttle,
+                self.client.list_pipeline_versions,
+                pipeline_id=pipeline_id,
+                page_token=page_token,
+                page_size=100,
+            )
+            for version in response.versions or []:
+                if version.name == version_name:
+                    return version.id
+            page_token = response.next_page_token
+            if not page_token:
+                return None
+
+    def create_run(
+        self,
+        experiment_id: str,
+        arguments: Optional[Mapping[str, Any]],
+        run_name: Optional[str],
+        pipeline_root: Optional[str],
+        service_account: Optional[str],
+    ) -> _RunPipelineResult:
+        run_name = run_name or _default_run_name(self.pipeline_file)
+        ids = self.ids
+        try:
+            return self._create_run(
+                ids, experiment_id, arguments, run_name, pipeline_root, service_account
+            )
+        except Exception as e:
+            if not (self._cached and getattr(e, "status", None) == 404):
+                raise
+
+        with self._lock:
+            if self.ids == ids:
+                self.upload_cache.discard(self.endpoint, self.digest)
+                self.ids = self._upload()
+                self._cached = False
+        return self._create_run(
+            self.ids, experiment_id, arguments, run_name, pipeline_root, service_account
+        )
+
+    def _create_run(
+        self,
+        ids: Tuple[str, str],
+        experiment_id: str,
+        arguments: Optional[Mapping[str, Any]],
+        run_name: str,
+        pipeline_root: Optional[str],
+        service_account: Optional[str],
+    ) -> _RunPipelineResult:
+        run_info = _create(
+            self.throttle,
+            self.client.run_pipeline,
+            experiment_id=experiment_id,
+            job_name=run_name,
+            params=dict(arguments or {}),
+            pipeline_id=ids[0],
+            version_id=ids[1],
+            pipeline_root=pipeline_root,
+            service_account=service_account,
+        )
+        return _RunPipelineResult(self.client, run_info)
+
+
+class KfpBackend(Backend):
+    """Kubeflow Pipelines.
+
+    Clients are reused across submissions through :data:`.clients.default_registry`.
+
+    Args:
+        endpoint (str): Endpoint of the KFP API service to connect.
+        iap_client_id (Optional[str], optional): The client ID used by Identity-Aware
+            Proxy. Defaults to None.
+        api_namespace (str, optional): Kubernetes namespace to connect to the KFP API.
+            Defaults to "kubeflow".
+        other_client_id (Optional[str], optional): The client ID used to obtain the
+            auth codes and refresh tokens. Defaults to None.
+        other_client_secret (Optional[str], optional): The client secret used to
+            obtain the auth codes and refresh tokens. Defaults to None.
+        namespace (Optional[str], optional): Kubernetes namespace where the pipeline
+            runs are created. Defaults to None.
+        upload_pipeline (bool, optional): Whether or not to upload the pipeline
+            package as a pipeline version once and create runs from it by ID, instead
+            of sending the whole package with every run. Uploaded versions are
+            recorded in :class:`.pipeline_cache.UploadCache` by the content hash of
+            the package, so later submissions skip the upload. Defaults to False.
+
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        iap_client_id: Optional[str] = None,
+        api_namespace: str = "kubeflow",
+        other_client_id: Optional[str] = None,
+        other_client_secret: Optional[str] = None,
+        namespace: Optional[str] = None,
+        upload_pipeline: bool = False,
+    ):
+        self.endpoint = endpoint
+        self.iap_client_id = iap_client_id
+        self.api_namespace = api_namespace
+        self.other_client_id = other_client_id
+        self.other_client_secret = other_client_secret
+        self.namespace = namespace
+        self.upload_pipeline = upload_pipeline
+
+    @property
+    def client(self) -> Any:
+        """Any: The ``kfp.Client`` connected to the endpoint."""
+
+        return clients.default_registry.get(
+            endpoint=self.endpoint,
+            iap_client_id=self.iap_client_id,
+            api_namespace=self.api_namespace,
+            other_client_id=self.other_client_id,
+            other_client_secret=self.other_client_secret,
+        )
+
+    def _traced_client(self, tracer: Optional[tracing.Tracer]) -> Any:
+        # The SDK is imported before the client is requested, so that the import
+        # is timed separately from the authentication of a new client.
+        with tracing.span(tracer, "import", module="kfp"):
+            import kfp  # noqa: F401
+        with tracing.span(tracer, "client", endpoint=self.endpoint):
+            return self.client
+
+    def _prepare_upload(
+        self,
+        client: Any,
+        pipeline_file: str,
+        experiment_name: Optional[str],
+        tracer: Optional[tracing.Tracer] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Tuple[_PipelineVersion, str]:
+        with tracing.span(tracer, "upload") as span:
+            version = _PipelineVersion(client, self.endpoint, pipeline_file, throttle)
+            span.attributes["cached"] = version._cached
+            if not version._cached:
+                span.bytes = tracing.file_size(pipeline_file)
+        return version, self._experiment_id(client, experiment_name, tracer, throttle)
+
+    def _experiment_id(
+        self,
+        client: Any,
+        experiment_name: Optional[str],
+        tracer: Optional[tracing.Tracer] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> str:
+        # kfp.Client gets the experiment by name before creating it, so the request
+        # can be retried like a read.
+        with tracing.span(tracer, "experiment"):
+            return _call(
+                throttle,
+                client.create_experiment,
+                name=_resolve_experiment_name(experiment_name),
+                namespace=self.namespace,
+            ).id
+
+    @staticmethod
+    def _check_upload_options(enable_caching: Optional[bool]):
+        if enable_caching is not None:
+            raise ValueError(
+                "enable_caching cannot be specified when the pipeline is uploaded"
+            )
+
+    def submit(
+        self,
+        pipeline_file: str,
+        arguments: Optional[Mapping[str, Any]] = None,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        tracer: Optional[tracing.Tracer] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Any:
+        """Submit a pipeline job.
+
+        Raises:
+            ValueError: If :attr:`enable_caching` is specified with
+                :attr:`upload_pipeline`, since the caching options of an uploaded
+                pipeline version cannot be overridden.
+
+        See :meth:`Backend.submit` for the arguments.
+
+        """
+
+        if self.upload_pipeline:
+            self._check_upload_options(enable_caching)
+            client = self._traced_client(tracer)
+            version, experiment_id = self._prepare_upload(
+                client, pipeline_file, experiment_name, tracer, throttle
+            )
+            # Only the arguments are sent with a run of an uploaded version.
+            with tracing.span(tracer, "run") as span:
+                span.bytes = len(json.dumps(arguments or {}, default=str))
+                return version.create_run(
+                    experiment_id=experiment_id,
+                    arguments=arguments,
+                    run_name=run_name,
+                    pipeline_root=pipeline_root,
+                    service_account=service_account,
+                )
+
+        client = self._traced_client(tracer)
+        # The whole package is read and sent with the run.
+        with tracing.span(tracer, "run") as span:
+            span.bytes = tracing.file_size(pipeline_file)
+            return _create(
+                throttle,
+                client.create_run_from_pipeline_package,
+                pipeline_file=pipeline_file,
+                arguments=arguments,  # type: ignore
+                run_name=run_name,
+                experiment_name=experiment_name,
+                namespace=self.namespace,
+                pipeline_root=pipeline_root,
+                enable_caching=enable_caching,
+                service_account=service_account,
+            )
+
+    def submitter(
+        self,
+        pipeline_file: str,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Submitter:
+        if not self.upload_pipeline:
+            # The package is decoded and the experiment is looked up once, and the
+            # workflow is sent with each run.
+            client = self.client
+            workflow = _PipelineWorkflow(
+                client,
+                pipeline_file,
+                self._experiment_id(client, experiment_name, throttle=throttle),
+                enable_caching,
+                throttle,
+            )
+
+            def submit_workflow(
+                index: int, arguments: Optional[Mapping[str, Any]]
+            ) -> Any:
+                return workflow.create_run(
+                    arguments=arguments,
+                    run_name=_indexed_name(run_name, index),
+                    pipeline_root=pipeline_root,
+                    service_account=service_account,
+                )
+
+            return submit_workflow
+
+        self._check_upload_options(enable_caching)
+        version, experiment_id = self._prepare_upload(
+            self.client, pipeline_file, experiment_name, throttle=throttle
+        )
+
+        def submit(index: int, arguments: Optional[Mapping[str, Any]]) -> Any:
+            return version.create_run(
+                experiment_id=experiment_id,
+                arguments=arguments,
+                run_name=_indexed_name(run_name, index),
+                pipeline_root=pipeline_root,
+                service_account=service_account,
+            )
+
+        return submit
+
+    def run_state(self, run: Any) -> Tuple[str, bool]:
+        return _kfp_run_state(run)
+
+    @property
+    def scope(self) -> str:
+        return f"kfp:{self.endpoint}/{self.namespace or ''}"
+
+    def run_id(self, run: Any) -> str:
+        return run.run_id
+
+    def get_run(self, run_id: str) -> Any:
+        client = self.client
+        return _RunPipelineResult(client, client.get_run(run_id).run)
+
+
+def _kfp_run_state(run: Any) -> Tuple[str, bool]:
+    state = run._client.get_run(run.run_id).run.status or ""
+    return state, state.lower() in _KFP_FINAL_STATES
+
+
+@contextlib.contextmanager
+def _template_path(pipeline_file: str) -> Iterator[str]:
+    # Vertex AI Pipelines reads only plain JSON/YAML templates, so a compressed
+    # package is streamed into a temporary file for the duration of the submission.
+    if not (
+        os.path.isfile(pipeline_file)
+        and pipeline_parser.is_compressed_pipeline_package(pipeline_file)
+    ):
+        yield pipeline_file
+        return
+
+    fd, template_path = tempfile.mkstemp(suffix=".yaml")
+    try:
+        with os.fdopen(fd, "wb") as dst, pipeline_parser.open_pipeline_package(
+            pipeline_file
+        ) as src:
+            shutil.copyfileobj(src, dst)
+        yield template_path
+    finally:
+        os.remove(template_path)
+
+
+def vertex_state(state: Any) -> Tuple[str, bool]:
+    """Get the state of a job of Vertex AI Pipelines from its resource state.
+
+    The state is available without a request, such as from the jobs listed by
+    ``aiplatform.PipelineJob.list``.
+
+    Args:
+        state (Any): The ``PipelineState`` of a job, or its name.
+
+    Returns:
+        Tuple[str, bool]: The name of the state, and whether the state is final.
+
+    """
+
+    name = getattr(state, "name", str(state))
+    return name, name in _VERTEX_FINAL_STATES
+
+
+class VertexBackend(Backend):
+    """Vertex AI Pipelines.
+
+    Args:
+        encryption_spec_key_name (Optional[str], optional): The Cloud KMS resource
+            identifier of the customer managed encryption key used to protect the job.
+            Defaults to None.
+        labels (Optional[Mapping[str, str]], optional): The user defined metadata to
+            organize PipelineJob. Defaults to None.
+        project (Optional[str], optional): The project that you want to run this
+            PipelineJob in. Defaults to None.
+        location (Optional[str], optional): Location to create PipelineJob.
+            Defaults to None.
+        network (Optional[str], optional): The full name of the Compute Engine network
+            to which the job should be peered. Defaults to None.
+
+    """
+
+    def __init__(
+        self,
+        encryption_spec_key_name: Optional[str] = None,
+        labels: Optional[Mapping[str, str]] = None,
+        project: Optional[str] = None,
+        location: Optional[str] = None,
+        network: Optional[str] = None,
+    ):
+        self.encryption_spec_key_name = encryption_spec_key_name
+        self.labels = labels
+        self.project = project
+        self.location = location
+        self.network = network
+
+    def _create_job(
+        self,
+        pipeline_file: str,
+        arguments: Optional[Mapping[str, Any]],
+        run_name: Optional[str],
+        pipeline_root: Optional[str],
+        enable_caching: Optional[bool],
+        tracer: Optional[tracing.Tracer] = None,
+    ) -> Any:
+        with tracing.span(tracer, "import", module="google.cloud.aiplatform"):
+            from google.cloud import aiplatform
+
+        # Creating a job decodes the template and loads the default credentials.
+        with tracing.span(tracer, "parse") as span, _template_path(
+            pipeline_file
+        ) as template_path:
+            span.bytes = tracing.file_size(template_path)
+            return aiplatform.PipelineJob(
+                display_name=None,  # type: ignore  # will be generated
+                template_path=template_path,
+                job_id=run_name,
+                pipeline_root=pipeline_root,
+                parameter_values=arguments,  # type: ignore
+                enable_caching=enable_caching,
+                encryption_spec_key_name=self.encryption_spec_key_name,
+                labels=self.labels,  # type: ignore
+                project=self.project,
+                location=self.location,
+            )
+
+    def submit(
+        self,
+        pipeline_file: str,
+        arguments: Optional[Mapping[str, Any]] = None,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        tracer: Optional[tracing.Tracer] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Any:
+        job = self._create_job(
+            pipeline_file, arguments, run_name, pipeline_root, enable_caching, tracer
+        )
+        # The whole template is sent with the run.
+        with tracing.span(tracer, "run") as span:
+            span.bytes = tracing.file_size(pipeline_file)
+            _create(
+                throttle,
+                job.submit,
+                service_account=service_account,
+                network=self.network,
+                experiment=experiment_name,
+            )
+        return job
+
+    def submitter(
+        self,
+        pipeline_file: str,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Submitter:
+        # The template job is decoded from the pipeline package once and cloned for
+        # each run, along with its credentials.
+        template = self._create_job(
+            pipeline_file, None, run_name, pipeline_root, enable_caching
+        )
+
+        def submit(index: int, arguments: Optional[Mapping[str, Any]]) -> Any:
+            # Generated job IDs have a resolution of a second, so they are made
+            # unique with the index. PipelineJob.clone is available since
+            # google-cloud-aiplatform 1.15, the lowest supported version.
+            job = template.clone(
+                job_id=f"{template.job_id}-{index}",
+                parameter_values=arguments,
+            )
+            _create(
+                throttle,
+                job.submit,
+                service_account=service_account,
+                network=self.network,
+                experiment=experiment_name,
+            )
+            return job
+
+        return submit
+
+    def run_state(self, run: Any) -> Tuple[str, bool]:
+        return vertex_state(run.state)
+
+    @property
+    def scope(self) -> str:
+        return f"vertex:{self.project or ''}/{self.location or ''}"
+
+    def run_id(self, run: Any) -> str:
+        return run.resource_name
+
+    def get_run(self, run_id: str) -> Any:
+        from google.cloud import aiplatform
+
+        return aiplatform.PipelineJob.get(
+            resource_name=run_id, project=self.project, location=self.location
+        )
+
+
+class FakeApiError(Exception):
+    """Error response of a :class:`FakeBackend`.
+
+    Attributes:
+        status: The HTTP status code of the response.
+
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"({status}) {message}")
+        self.status = status
+
+
+class FakeRun:
+    """Run submitted to a :class:`FakeBackend`.
+
+    Attributes:
+        run_id: A unique ID of the run.
+        pipeline_name: The name of the pipeline.
+        run_name: The name of the run.
+        experiment_name: The name of the experiment.
+        arguments: Arguments to the pipeline.
+        created_at: The :func:`time.monotonic` time when the run was created.
+
+    """
+
+    def __init__(
+        self,
+        backend: "FakeBackend",
+        run_id: str,
+        pipeline_name: str,
+        run_name: Optional[str],
+        experiment_name: Optional[str],
+        arguments: Mapping[str, Any],
+    ):
+        self.backend = backend
+        self.run_id = run_id
+        self.pipeline_name = pipeline_name
+        self.run_name = run_name
+        self.experiment_name = experiment_name
+        self.arguments = arguments
+        self.created_at = time.monotonic()
+
+    def __repr__(self) -> str:
+        return f"FakeRun(run_id={self.run_id!r}, run_name={self.run_name!r})"
+
+
+class FakeBackend(Backend):
+    """In-process stand-in for a pipeline service.
+
+    Submissions read the header of the pipeline package like the real services and
+    are recorded in :attr:`runs` instead of being sent anywhere. Latency, throttling
+    and failures of the service can be simulated to exercise and benchmark the
+    submission layer offline. Runs succeed :attr:`run_duration` seconds after they
+    are submitted.
+
+    Args:
+        latency (float, optional): Seconds that each request takes. Defaults to 0.0.
+        max_rate (Optional[float], optional): Requests per second accepted by the
+            service. Requests over the rate fail with :class:`FakeApiError` of status
+            429. If None, all requests are accepted. Defaults to None.
+        burst (int, optional): Requests accepted at once within :attr:`max_rate`.
+            Defaults to 1.
+        failure_rate (float, optional): The probability that a request fails with
+            :class:`FakeApiError` of status 500. Defaults to 0.0.
+        run_duration (float, optional): Seconds until a run succeeds.
+            Defaults to 0.0.
+        seed (Optional[int], optional): The seed of the random failures.
+            Defaults to None.
+
+    Attributes:
+        runs: Runs submitted successfully, in order of submission.
+        requests: The number of requests received, including rejected ones.
+        throttled: The number of requests rejected with status 429.
+        failed: The number of requests rejected with status 500.
+
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        max_rate: Optional[float] = None,
+        burst: int = 1,
+        failure_rate: float = 0.0,
+        run_duration: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.max_rate = max_rate
+        self.burst = burst
+        self.failure_rate = failure_rate
+        self.run_duration = run_duration
+        self.runs: List[FakeRun] = []
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+        self._random = random.Random(seed)
+        self._run_ids = itertools.count()
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _request(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            if self.max_rate is not None:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated_at) * self.max_rate
+                )
+                self._updated_at = now
+                if self._tokens < 1:
+                    self.throttled += 1
+                    raise FakeApiError(429, "Too Many Requests")
+                self._tokens -= 1
+            if self._random.random() < self.failure_rate:
+                self.failed += 1
+                raise FakeApiError(500, "Internal Server Error")
+
+    def submit(
+        self,
+        pipeline_file: str,
+        arguments: Optional[Mapping[str, Any]] = None,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        tracer: Optional[tracing.Tracer] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> FakeRun:
+        with tracing.span(tracer, "parse"):
+            pipeline = pipeline_parser.parse_pipeline_package(
+                pipeline_file, header_only=True, retain_spec=False
+            )
+        with tracing.span(tracer, "run") as span:
+            span.bytes = len(json.dumps(arguments or {}, default=str))
+            return self._create_run(
+                pipeline.name, arguments, run_name, experiment_name, throttle
+            )
+
+    def submitter(
+        self,
+        pipeline_file: str,
+        run_name: Optional[str] = None,
+        experiment_name: Optional[str] = None,
+        pipeline_root: Optional[str] = None,
+        enable_caching: Optional[bool] = None,
+        service_account: Optional[str] = None,
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> Submitter:
+        pipeline = pipeline_parser.parse_pipeline_package(
+            pipeline_file, header_only=True, retain_spec=False
+        )
+
+        def submit(index: int, arguments: Optional[Mapping[str, Any]]) -> FakeRun:
+            return self._create_run(
+                pipeline.name,
+                arguments,
+                _indexed_name(run_name, index),
+                experiment_name,
+                throttle,
+            )
+
+        return submit
+
+    def _create_run(
+        self,
+        pipeline_name: str,
+        arguments: Optional[Mapping[str, Any]],
+        run_name: Optional[str],
+        experiment_name: Optional[str],
+        throttle: Optional[throttling.Throttle] = None,
+    ) -> FakeRun:
+        _create(throttle, self._request)
+        with self._lock:
+            run = FakeRun(
+                self,
+                f"run-{next(self._run_ids)}",
+                pipeline_name,
+                run_name,
+                experiment_name,
+                dict(arguments or {}),
+            )
+            self.runs.append(run)
+        return run
+
+    def run_state(self, run: Any) -> Tuple[str, bool]:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+        if time.monotonic() - run.created_at >= self.run_duration:
+            return "Succeeded", True
+        return "Running", False
+
+    @property
+    def scope(self) -> str:
+        return f"fake:{id(self)}"
+
+    def run_id(self, run: Any) -> str:
+        return run.run_id
+
+    def get_run(self, run_id: str) -> FakeRun:
+        """Get a submitted run by ID.
+
+        Raises:
+            FakeApiError: Of status 404 if the run does not exist.
+
+        See :meth:`Backend.get_run` for the arguments.
+
+        """
+
+        self._request()
+        with self._lock:
+            for run in self.runs:
+                if run.run_id == run_id:
+                    return run
+        raise FakeApiError(404, f"Run not found: {run_id}")
+
+
+def run_state(run: Any) -> Tuple[str, bool]:
+    """Get the current state of a submitted run of any backend.
+
+    Args:
+        run (Any): A run returned by :meth:`Backend.submit`.
+
+    Returns:
+        Tuple[str, bool]: The state, and whether the state is final.
+
+    """
+
+    if isinstance(run, FakeRun):
+        return run.backend.run_state(run)
+    elif hasattr(run, "run_id"):  # Kubeflow Pipelines
+        return _kfp_run_state(run)
+    else:  # Vertex AI Pipelines
+        return vertex_state(run.state)
+
+
+def run_id(run: Any) -> str:
+    """Get the ID of a submitted run of any backend.
+
+    Args:
+        run (Any): A run returned by :meth:`Backend.submit`.
+
+    Returns:
+        str: The ID of a run of Kubeflow Pipelines or a :class:`FakeBackend`, or the
+        resource name of a job of Vertex AI Pipelines.
+
+    """
+
+    if hasattr(run, "run_id"):  # Kubeflow Pipelines
+        return run.run_id
+    else:  # Vertex AI Pipelines
+        return run.resource_name
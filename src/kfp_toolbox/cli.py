@@ -1,10 +1,28 @@
 import argparse
+import collections
+import enum
+import json
+import os
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+)
 
 import typer
 
-from . import __version__, pipeline_jobs, pipeline_parser
+from . import __version__, tracing
+
+# The modules used by the commands are imported by each command instead, so that
+# the startup of the CLI, e.g. for --version, does not pay for them.
 
 app = typer.Typer(context_settings={"help_option_names": ["-h", "--help"]})
 
@@ -29,6 +47,35 @@ def callback(
     pass
 
 
+def _parse_labels(labels: Optional[List[str]]) -> Dict[str, str]:
+    labels_dict = {}
+    for label in labels or []:
+        try:
+            key, value = label.split(":", maxsplit=1)
+        except ValueError:
+            typer.echo(
+                f"Error: The --label value must be contained a colon.: {label}",
+                err=True,
+            )
+            raise typer.Abort()
+        labels_dict[key] = value
+    return labels_dict
+
+
+def _attach_option_values(args: Sequence[str], options: Set[str]) -> List[str]:
+    # argparse takes a value starting with a dash, such as -1,2 or -3:0, for another
+    # option, so the value following a known option is attached with "=".
+    attached: List[str] = []
+    args_iter = iter(args)
+    for arg in args_iter:
+        if arg in options:
+            value = next(args_iter, None)
+            if value is not None:
+                arg = f"{arg}={value}"
+        attached.append(arg)
+    return attached
+
+
 @app.command(add_help_option=False)
 def submit(
     ctx: typer.Context,
@@ -65,13 +112,57 @@ def submit(
     project: Optional[str] = typer.Option(None),
     location: Optional[str] = typer.Option(None),
     network: Optional[str] = typer.Option(None),
+    trace_file: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="Append the timing of each phase of the submission as JSON lines.",
+    ),
+    dedup_window: Optional[float] = typer.Option(
+        None,
+        min=0,
+        help=(
+            "Return the existing run of an identical submission made within the "
+            "given seconds, instead of submitting the job again."
+        ),
+    ),
+    arguments_file: Optional[typer.FileText] = typer.Option(
+        None,
+        help=(
+            "Submit a run for each line of the file, a JSON object of pipeline "
+            "parameters, and write the result of each line as JSON lines. "
+            "Use - to read from the standard input."
+        ),
+    ),
+    max_workers: int = typer.Option(
+        8, min=1, help="The maximum number of submissions from --arguments-file."
+    ),
+    daemon: bool = typer.Option(
+        False,
+        help=(
+            "Forward the submission to the daemon started by `kfp-toolbox serve`, "
+            "if it is running. The daemon submits with its own environment and "
+            "credentials, including KF_PIPELINES_* variables and the Google "
+            "Cloud account, not those of this command."
+        ),
+    ),
+    daemon_socket: Optional[Path] = typer.Option(
+        None, help="Path of the socket of the daemon."
+    ),
     pipeline_parameters: Optional[List[str]] = typer.Argument(None),
 ):
     """Submit a pipeline job from the pipeline package file."""
+    from . import daemon as daemon_client
+    from . import pipeline_cache
+
+    exporter = tracing.JsonLinesExporter(trace_file) if trace_file else None
+    tracer = tracing.Tracer([exporter]) if exporter else None
+
     parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
     parameters_group = parser.add_argument_group("Pipeline parameters")
     if pipeline_file:
-        pipeline = pipeline_parser.parse_pipeline_package(pipeline_file)
+        with tracing.span(tracer, "parse") as span:
+            span.bytes = tracing.file_size(pipeline_file)
+            pipeline = pipeline_cache.PackageCache().load(pipeline_file)
         for parameter in pipeline.parameters:
             sanitized_name = parameter.name.replace("_", "-").strip("-")
             required = parameter.default is None
@@ -81,8 +172,11 @@ def submit(
                 default=parameter.default,
                 dest=parameter.name,
                 help="[required]" if required else "[default: %(default)s]",
-                required=required,
+                # Required parameters may be given on each line of the file.
+                required=required and arguments_file is None,
             )
+    if exporter:
+        exporter.close()
 
     if help:
         typer.echo(ctx.get_help())
@@ -93,22 +187,52 @@ def submit(
         typer.echo("Error: The --pipeline-file option must be specified.", err=True)
         raise typer.Abort()
 
-    labels_dict = {}
-    for label in labels or []:
-        try:
-            key, value = label.split(":", maxsplit=1)
-        except ValueError:
+    labels_dict = _parse_labels(labels)
+
+    args = parser.parse_args(pipeline_parameters or [])
+    arguments_dict = vars(args)
+
+    if arguments_file is not None:
+        if trace_file or dedup_window is not None:
             typer.echo(
-                f"Error: The --label value must be contained a colon.: {label}",
+                "Error: The --arguments-file option cannot be used with "
+                "--trace-file or --dedup-window.",
                 err=True,
             )
             raise typer.Abort()
-        labels_dict[key] = value
-
-    args = parser.parse_args(pipeline_parameters or [])
-    arguments_dict = vars(args)
+        failures = _submit_arguments_file(
+            arguments_file,
+            pipeline.parameters,
+            # Parameters given on the command line are the same for all lines.
+            {
+                name: value
+                for name, value in arguments_dict.items()
+                if value is not None
+            },
+            max_workers,
+            pipeline_file=pipeline_file,
+            endpoint=endpoint,
+            iap_client_id=iap_client_id,
+            api_namespace=api_namespace,
+            other_client_id=other_client_id,
+            other_client_secret=other_client_secret,
+            run_name=run_name,
+            experiment_name=experiment_name,
+            namespace=namespace,
+            pipeline_root=pipeline_root,
+            enable_caching=caching,
+            service_account=service_account,
+            encryption_spec_key_name=encryption_spec_key_name,
+            labels=labels_dict,
+            project=project,
+            location=location,
+            network=network,
+        )
+        if failures:
+            raise typer.Exit(1)
+        return
 
-    pipeline_jobs.submit_pipeline_job(
+    submission = dict(
         pipeline_file=pipeline_file,
         endpoint=endpoint,
         iap_client_id=iap_client_id,
@@ -127,4 +251,365 @@ def submit(
         project=project,
         location=location,
         network=network,
+        trace_file=trace_file,
+        dedup_window=dedup_window,
     )
+
+    if daemon:
+        # The daemon may run in another directory, so paths are made absolute.
+        forwarded = dict(
+            submission,
+            pipeline_file=os.path.abspath(pipeline_file),
+            trace_file=os.path.abspath(trace_file) if trace_file else None,
+        )
+        try:
+            daemon_client.request("submit", daemon_socket, **forwarded)
+        except daemon_client.DaemonUnavailableError:
+            pass  # Submit in this process instead.
+        except daemon_client.DaemonError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(1)
+        else:
+            return
+
+    daemon_client.submit(**submission)
+
+
+def _echo_result(fields: Mapping[str, Any], result: Any):
+    output = dict(fields)
+    if isinstance(result, Exception):
+        output["error"] = {"type": type(result).__name__, "message": str(result)}
+    else:
+        from . import backends
+
+        output["run_id"] = backends.run_id(result)
+    typer.echo(json.dumps(output, default=str))
+
+
+def _submit_arguments_file(
+    arguments_file: Iterator[str],
+    parameters: Sequence[Any],
+    fixed: Mapping[str, Any],
+    max_workers: int,
+    **kwargs: Any,
+) -> int:
+    # Lines are read as the submissions progress, so that at most a bounded number
+    # of lines is held in memory. Invalid lines are reported as soon as they are
+    # read, so results are not always in the order of the lines.
+    from . import pipeline_jobs, sweeps
+
+    line_numbers: Deque[int] = collections.deque()
+    failures = 0
+
+    def read_arguments() -> Iterator[Dict[str, Any]]:
+        nonlocal failures
+        for line_number, line in enumerate(arguments_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                point = json.loads(line)
+                if not isinstance(point, dict):
+                    raise ValueError(f"a JSON object is expected: {line.strip()}")
+                arguments = next(sweeps.list_sweep(parameters, [point], fixed=fixed))
+            except ValueError as e:
+                failures += 1
+                _echo_result({"line": line_number}, e)
+                continue
+            line_numbers.append(line_number)
+            yield arguments
+
+    results = pipeline_jobs.iter_submit_pipeline_jobs(
+        arguments_list=read_arguments(), max_workers=max_workers, **kwargs
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            failures += 1
+        _echo_result({"line": line_numbers.popleft()}, result)
+    return failures
+
+
+@app.command(add_help_option=False)
+def sweep(
+    ctx: typer.Context,
+    help: bool = typer.Option(
+        False, "-h", "--help", help="Show this message and exit."
+    ),
+    pipeline_file: Optional[Path] = typer.Option(
+        None,
+        "-f",
+        "--pipeline-file",
+        exists=True,
+        dir_okay=False,
+        help="Path of the pipeline package file.",
+    ),
+    endpoint: Optional[str] = typer.Option(
+        None, help="Endpoint of the KFP API service to connect."
+    ),
+    iap_client_id: Optional[str] = typer.Option(None),
+    api_namespace: str = typer.Option("kubeflow"),
+    other_client_id: Optional[str] = typer.Option(None),
+    other_client_secret: Optional[str] = typer.Option(None),
+    run_name: Optional[str] = typer.Option(
+        None, help="Prefix of the run names, which are suffixed with the index."
+    ),
+    experiment_name: Optional[str] = typer.Option(
+        None, "-e", "--experiment-name", help="Experiment name of the runs."
+    ),
+    namespace: Optional[str] = typer.Option(None, "-n", "--namespace"),
+    pipeline_root: Optional[str] = typer.Option(
+        None, help="The root path of the pipeline outputs."
+    ),
+    caching: Optional[bool] = typer.Option(None),
+    service_account: Optional[str] = typer.Option(None),
+    encryption_spec_key_name: Optional[str] = typer.Option(None),
+    labels: Optional[List[str]] = typer.Option(None, "-l", "--label"),
+    project: Optional[str] = typer.Option(None),
+    location: Optional[str] = typer.Option(None),
+    network: Optional[str] = typer.Option(None),
+    upload_pipeline: bool = typer.Option(
+        False,
+        help=(
+            "Upload the pipeline package once and create the runs from it. "
+            "Used only for Kubeflow Pipelines."
+        ),
+    ),
+    max_workers: int = typer.Option(
+        8, min=1, help="The maximum number of submissions in progress."
+    ),
+    dry_run: bool = typer.Option(
+        False, help="Print the arguments of each run without submitting."
+    ),
+    pipeline_parameters: Optional[List[str]] = typer.Argument(None),
+):
+    """Submit a run for each combination of the values of pipeline parameters.
+
+    The values of each parameter are given after a double dash as a
+    comma-separated list, where ranges such as 1:9:2 (adding the step) and
+    32:256:x2 (multiplying by the step) are also accepted for numbers. Values may
+    start with a dash, such as --x -1,2 or --x=-1,2.
+    """
+    from . import pipeline_cache, pipeline_jobs, sweeps
+
+    parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
+    parameters_group = parser.add_argument_group("Pipeline parameters")
+    parameters: Sequence[Any] = []
+    options: Set[str] = set()
+    if pipeline_file:
+        parameters = pipeline_cache.PackageCache().load(pipeline_file).parameters
+        for parameter in parameters:
+            sanitized_name = parameter.name.replace("_", "-").strip("-")
+            options.add(f"--{sanitized_name}")
+            parameters_group.add_argument(
+                f"--{sanitized_name}",
+                dest=parameter.name,
+                metavar="VALUES",
+                help=(
+                    f"{parameter.type.__name__} values, "
+                    + (
+                        "[required]"
+                        if parameter.default is None
+                        else f"[default: {parameter.default}]".replace("%", "%%")
+                    )
+                ),
+            )
+
+    if help:
+        typer.echo(ctx.get_help())
+        typer.echo()
+        parser.print_help()
+        raise typer.Exit()
+    elif pipeline_file is None:
+        typer.echo("Error: The --pipeline-file option must be specified.", err=True)
+        raise typer.Abort()
+
+    labels_dict = _parse_labels(labels)
+    specs = vars(
+        parser.parse_args(_attach_option_values(pipeline_parameters or [], options))
+    )
+    parameters_by_name = {parameter.name: parameter for parameter in parameters}
+    try:
+        space = {
+            name: sweeps.parse_axis(parameters_by_name[name], spec)
+            for name, spec in specs.items()
+            if spec is not None
+        }
+        points = sweeps.grid_sweep(parameters, space)
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Abort()
+
+    if dry_run:
+        for index, arguments in enumerate(points):
+            typer.echo(json.dumps({"index": index, "arguments": arguments}))
+        return
+
+    # The combinations are generated as the submissions progress, and only those
+    # in flight are kept to report their arguments.
+    pending: Deque[Dict[str, Any]] = collections.deque()
+
+    def arguments_list() -> Iterator[Dict[str, Any]]:
+        for arguments in points:
+            pending.append(arguments)
+            yield arguments
+
+    started_at = time.perf_counter()
+    results = pipeline_jobs.iter_submit_pipeline_jobs(
+        pipeline_file,
+        arguments_list(),
+        max_workers=max_workers,
+        endpoint=endpoint,
+        iap_client_id=iap_client_id,
+        api_namespace=api_namespace,
+        other_client_id=other_client_id,
+        other_client_secret=other_client_secret,
+        run_name=run_name,
+        experiment_name=experiment_name,
+        namespace=namespace,
+        pipeline_root=pipeline_root,
+        enable_caching=caching,
+        service_account=service_account,
+        encryption_spec_key_name=encryption_spec_key_name,
+        labels=labels_dict,
+        project=project,
+        location=location,
+        network=network,
+        upload_pipeline=upload_pipeline,
+    )
+    total = failures = 0
+    for index, result in enumerate(results):
+        total += 1
+        if isinstance(result, Exception):
+            failures += 1
+        _echo_result({"index": index, "arguments": pending.popleft()}, result)
+
+    elapsed = time.perf_counter() - started_at
+    typer.echo(
+        f"Submitted {total - failures} of {total} runs in {elapsed:.1f}s "
+        f"({total / elapsed if elapsed else 0.0:.1f} runs/s), {failures} failed.",
+        err=True,
+    )
+    if failures:
+        raise typer.Exit(1)
+
+
+@app.command()
+def serve(
+    socket: Optional[Path] = typer.Option(
+        None, help="Path of the socket to listen on."
+    ),
+):
+    """Serve submissions from a warm process until interrupted.
+
+    The SDKs, clients and credentials are loaded once, and the submit command
+    forwards submissions to this process over a Unix domain socket when it is
+    given the --daemon option. Forwarded submissions use the environment and
+    credentials of this process.
+    """
+    from . import daemon
+
+    daemon.serve(socket)
+
+
+class OutputFormat(str, enum.Enum):
+    table = "table"
+    json = "json"
+
+
+def _format_columns(rows: Sequence[Sequence[str]]) -> List[str]:
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return [
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+        for row in rows
+    ]
+
+
+def _format_summary(summary: Any) -> str:
+    lines = _format_columns(
+        [
+            ["Name:", summary.name],
+            ["File:", summary.source],
+            ["Size:", f"{summary.size} bytes"],
+            ["Tasks:", str(summary.tasks)],
+            ["Components:", str(summary.components)],
+        ]
+    )
+    if summary.parameters:
+        lines.append("Parameters:")
+        lines += [
+            f"  {line}"
+            for line in _format_columns(
+                [["NAME", "TYPE", "DEFAULT"]]
+                + [
+                    [
+                        parameter.name,
+                        parameter.type.__name__,
+                        "[required]"
+                        if parameter.default is None
+                        else str(parameter.default),
+                    ]
+                    for parameter in summary.parameters
+                ]
+            )
+        ]
+    else:
+        lines.append("Parameters: none")
+    return "\n".join(lines)
+
+
+def _summary_to_dict(summary: Any) -> Dict[str, Any]:
+    return {
+        "file": summary.source,
+        "name": summary.name,
+        "parameters": [
+            {
+                "name": parameter.name,
+                "type": parameter.type.__name__,
+                "default": parameter.default,
+            }
+            for parameter in summary.parameters
+        ],
+        "tasks": summary.tasks,
+        "components": summary.components,
+        "size": summary.size,
+    }
+
+
+@app.command()
+def inspect(
+    pipeline_files: List[Path] = typer.Argument(
+        ..., exists=True, dir_okay=False, help="Paths of the pipeline package files."
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.table,
+        "--format",
+        help="Output format. With json, a line of JSON is written for each file.",
+    ),
+):
+    """Show a summary of pipeline package files.
+
+    The name, parameters, task count, component count and size of each file are
+    shown. JSON packages are decoded with a fast JSON decoder, and YAML packages
+    are scanned without constructing what is only counted, so that many packages
+    can be inspected quickly.
+    """
+    from . import pipeline_parser
+
+    failures = 0
+    shown = False
+    for pipeline_file in pipeline_files:
+        try:
+            summary = pipeline_parser.summarize_pipeline_package(pipeline_file)
+        except Exception as e:
+            failures += 1
+            typer.echo(f"Error: {pipeline_file}: {e}", err=True)
+            continue
+
+        if output_format == OutputFormat.json:
+            typer.echo(json.dumps(_summary_to_dict(summary)))
+        else:
+            if shown:
+                typer.echo()
+            typer.echo(_format_summary(summary))
+        shown = True
+    if failures:
+        raise typer.Exit(1)
@@ -0,0 +1,168 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+_ClientKey = Tuple[str, Optional[str], str, Optional[str], Optional[str]]
+
+
+def _close_kfp_client(client: Any):
+    # kfp.Client has no close method, so its API client and the HTTP connection
+    # pool shared by all of the generated APIs are closed directly.
+    api_client = getattr(getattr(client, "_run_api", None), "api_client", None)
+    if api_client is None:
+        return
+    api_client.close()
+    pool_manager = getattr(
+        getattr(api_client, "rest_client", None), "pool_manager", None
+    )
+    if pool_manager is not None:
+        pool_manager.clear()
+
+
+class ClientRegistry:
+    """Registry of reusable clients of Kubeflow Pipelines.
+
+    Creating a ``kfp.Client`` exchanges tokens with Identity-Aware Proxy or OAuth and
+    sets up a new HTTP connection pool. The registry creates a client once for each
+    combination of the endpoint, namespace and credentials, and returns the same
+    client until it is evicted or expires, so that the tokens and connections are
+    kept warm across submissions.
+
+    The tokens of Identity-Aware Proxy and OAuth expire after an hour, and an old
+    client would fail with 401 Unauthorized. A client older than ``max_age`` is
+    therefore replaced with a new one. It is not closed, since other threads may
+    still be using it, and its connections are released when it is garbage
+    collected.
+
+    The registry can be shared between threads. A client is created only once even
+    if it is requested by several threads at the same time, and creating a client
+    does not block requests for other clients.
+
+    Args:
+        max_age (Optional[float], optional): Seconds after which a client is
+            replaced. None keeps clients until they are evicted. Defaults to 2700,
+            which leaves a margin before the tokens expire.
+
+    """
+
+    def __init__(self, max_age: Optional[float] = 2700.0):
+        self.max_age = max_age
+        self._clients: Dict[_ClientKey, Tuple[Any, float]] = {}
+        self._creation_locks: Dict[_ClientKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def get(
+        self,
+        endpoint: str,
+        iap_client_id: Optional[str] = None,
+        api_namespace: str = "kubeflow",
+        other_client_id: Optional[str] = None,
+        other_client_secret: Optional[str] = None,
+    ) -> Any:
+        """Get a client of Kubeflow Pipelines, creating it if necessary.
+
+        Args:
+            endpoint (str): Endpoint of the KFP API service to connect.
+            iap_client_id (Optional[str], optional): The client ID used by
+                Identity-Aware Proxy. Defaults to None.
+            api_namespace (str, optional): Kubernetes namespace to connect to the KFP
+                API. Defaults to "kubeflow".
+            other_client_id (Optional[str], optional): The client ID used to obtain
+                the auth codes and refresh tokens. Defaults to None.
+            other_client_secret (Optional[str], optional): The client secret used to
+                obtain the auth codes and refresh tokens. Defaults to None.
+
+        Returns:
+            Any: A ``kfp.Client`` connected to the endpoint.
+
+        """
+
+        key = (
+            endpoint,
+            iap_client_id,
+            api_namespace,
+            other_client_id,
+            other_client_secret,
+        )
+        with self._lock:
+            client = self._get_fresh(key)
+            if client is not None:
+                return client
+            creation_lock = self._creation_locks.setdefault(key, threading.Lock())
+
+        with creation_lock:
+            with self._lock:
+                client = self._get_fresh(key)
+            if client is None:
+                import kfp
+
+                client = kfp.Client(
+                    host=endpoint,
+                    client_id=iap_client_id,
+                    namespace=api_namespace,
+                    other_client_id=other_client_id,
+                    other_client_secret=other_client_secret,
+                )
+                with self._lock:
+                    self._clients[key] = (client, time.monotonic())
+                    self._creation_locks.pop(key, None)
+        return client
+
+    def _get_fresh(self, key: _ClientKey) -> Any:
+        # Called with the lock held. An expired client is dropped without closing.
+        entry = self._clients.get(key)
+        if entry is None:
+            return None
+        client, created = entry
+        if self.max_age is not None and time.monotonic() - created >= self.max_age:
+            del self._clients[key]
+            return None
+        return client
+
+    def evict(
+        self,
+        endpoint: str,
+        iap_client_id: Optional[str] = None,
+        api_namespace: str = "kubeflow",
+        other_client_id: Optional[str] = None,
+        other_client_secret: Optional[str] = None,
+    ) -> bool:
+        """Remove a client from the registry and close it.
+
+        The arguments are the same as :meth:`get`.
+
+        Returns:
+            bool: True if the client was in the registry.
+
+        """
+
+        key = (
+            endpoint,
+            iap_client_id,
+            api_namespace,
+            other_client_id,
+            other_client_secret,
+        )
+        with self._lock:
+            entry = self._clients.pop(key, None)
+        if entry is None:
+            return False
+        _close_kfp_client(entry[0])
+        return True
+
+    def close(self):
+        """Remove all clients from the registry and close them."""
+
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            _close_kfp_client(client)
+
+
+default_registry = ClientRegistry()
+"""ClientRegistry: The registry used by :mod:`.pipeline_jobs`."""
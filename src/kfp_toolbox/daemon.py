@@ -0,0 +1,235 @@
+import json
+import os
+import socket
+import socketserver
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from . import backends, journal, pipeline_jobs, tracing
+from .pipeline_cache import default_cache_dir
+
+_CONNECT_TIMEOUT = 1.0
+
+
+def default_socket_path() -> Path:
+    """Return the default path of the socket of the daemon.
+
+    Returns:
+        Path: ``daemon.sock`` under :func:`.pipeline_cache.default_cache_dir`.
+
+    """
+
+    return default_cache_dir() / "daemon.sock"
+
+
+class DaemonUnavailableError(Exception):
+    """Error raised when no daemon is listening on the socket."""
+
+
+class DaemonError(Exception):
+    """Error raised by a request in the daemon.
+
+    Attributes:
+        type: The type name of the error raised in the daemon.
+
+    """
+
+    def __init__(self, type: str, message: str):
+        super().__init__(f"{type}: {message}" if message else type)
+        self.type = type
+
+
+def submit(
+    trace_file: Optional[Union[str, os.PathLike]] = None,
+    dedup_window: Optional[float] = None,
+    **kwargs: Any,
+) -> Any:
+    """Submit a pipeline job with the options of the ``submit`` command.
+
+    This is the submission shared by the daemon and the in-process fallback of the
+    command.
+
+    Args:
+        trace_file (Optional[Union[str, os.PathLike]], optional): Path of the file
+            to which the phases of the submission are appended as JSON lines.
+            Defaults to None.
+        dedup_window (Optional[float], optional): Seconds during which an identical
+            submission returns the existing run. Defaults to None.
+        **kwargs: Keyword arguments to :func:`.pipeline_jobs.submit_pipeline_job`.
+
+    Returns:
+        Any: The submitted run.
+
+    """
+
+    exporter = tracing.JsonLinesExporter(trace_file) if trace_file else None
+    try:
+        return pipeline_jobs.submit_pipeline_job(
+            **kwargs,
+            tracer=tracing.Tracer([exporter]) if exporter else None,
+            submission_journal=(
+                journal.SubmissionJournal(window=dedup_window)
+                if dedup_window is not None
+                else None
+            ),
+        )
+    finally:
+        if exporter:
+            exporter.close()
+
+
+def _handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    command = request.get("command")
+    if command == "ping":
+        return {"pid": os.getpid()}
+    elif command == "submit":
+        run = submit(**request.get("arguments", {}))
+        return {"run_id": backends.run_id(run)}
+    raise ValueError(f"unknown command: {command!r}")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    # Each connection carries one request and one response, both a line of JSON.
+
+    def handle(self):
+        try:
+            response = {"ok": True, **_handle(json.loads(self.rfile.readline()))}
+        except Exception as e:
+            response = {
+                "ok": False,
+                "error": {"type": type(e).__name__, "message": str(e)},
+            }
+        self.wfile.write(json.dumps(response, default=str).encode("utf-8") + b"\n")
+
+
+if hasattr(socket, "AF_UNIX"):
+
+    class SubmissionServer(socketserver.ThreadingUnixStreamServer):
+        """Server of the daemon on a Unix domain socket.
+
+        Requests are handled in separate threads, so slow submissions do not block
+        each other. The socket is accessible only by the owner.
+
+        Args:
+            socket_path (Optional[Union[str, os.PathLike]], optional): Path of the
+                socket. A stale socket file left by a daemon that has exited is
+                replaced. If None, :func:`default_socket_path` is used.
+                Defaults to None.
+
+        Raises:
+            OSError: If another daemon is listening on the socket.
+
+        """
+
+        daemon_threads = True
+
+        def __init__(self, socket_path: Optional[Union[str, os.PathLike]] = None):
+            self.socket_path = Path(socket_path or default_socket_path())
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            if self.socket_path.exists():
+                try:
+                    request("ping", self.socket_path)
+                except DaemonUnavailableError:
+                    self.socket_path.unlink()
+                else:
+                    raise OSError(
+                        f"a daemon is already listening on {self.socket_path}"
+                    )
+            # The mode of the socket is set on creation, since other users must
+            # never be able to submit jobs with the credentials of the daemon.
+            umask = os.umask(0o177)
+            try:
+                super().__init__(os.fspath(self.socket_path), _RequestHandler)
+            finally:
+                os.umask(umask)
+
+        def server_close(self):
+            super().server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def warm_up():
+    """Import the SDKs and load the default credentials of Google Cloud once.
+
+    The credentials are cached by ``aiplatform.init``, so that each job does not
+    discover them again. Failures to load the credentials are ignored, since they
+    are needed only for Vertex AI Pipelines.
+
+    """
+
+    import kfp  # noqa: F401
+    from google.cloud import aiplatform
+
+    try:
+        aiplatform.init(credentials=aiplatform.initializer.global_config.credentials)
+    except Exception:
+        pass
+
+
+def serve(socket_path: Optional[Union[str, os.PathLike]] = None):
+    """Serve submissions until interrupted.
+
+    The SDKs, clients and credentials are kept warm across submissions, so each
+    submission pays only for the API calls.
+
+    Args:
+        socket_path (Optional[Union[str, os.PathLike]], optional): Path of the
+            socket. If None, :func:`default_socket_path` is used. Defaults to None.
+
+    """
+
+    warm_up()
+    with SubmissionServer(socket_path) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def request(
+    command: str,
+    socket_path: Optional[Union[str, os.PathLike]] = None,
+    **arguments: Any,
+) -> Dict[str, Any]:
+    """Send a request to the daemon.
+
+    Args:
+        command (str): The command, ``"submit"`` or ``"ping"``.
+        socket_path (Optional[Union[str, os.PathLike]], optional): Path of the
+            socket. If None, :func:`default_socket_path` is used. Defaults to None.
+        **arguments: Arguments to the command, which must be encodable as JSON.
+
+    Raises:
+        DaemonUnavailableError: If no daemon is listening on the socket.
+        DaemonError: If the request fails in the daemon.
+
+    Returns:
+        Dict[str, Any]: The response of the daemon.
+
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailableError("Unix domain sockets are not supported")
+    path = os.fspath(socket_path or default_socket_path())
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(_CONNECT_TIMEOUT)
+        try:
+            sock.connect(path)
+        except OSError as e:
+            raise DaemonUnavailableError(f"no daemon is listening on {path}") from e
+        # Submissions may take long, so only the connection has a timeout.
+        sock.settimeout(None)
+        message = {"command": command, "arguments": arguments}
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise DaemonError("ConnectionError", "the daemon closed the connection")
+
+    response = json.loads(line)
+    if not response.pop("ok"):
+        raise DaemonError(response["error"]["type"], response["error"]["message"])
+    return response
@@ -0,0 +1,159 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Optional, Union
+
+from .pipeline_cache import default_cache_dir
+
+# Entries are kept at least this long, regardless of the window of the journal that
+# records a submission, since journals with other windows share the database.
+_RETENTION = 7 * 24 * 60 * 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    fingerprint TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    submitted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_fingerprint
+    ON submissions (fingerprint, submitted_at);
+"""
+
+
+def submission_fingerprint(
+    digest: str,
+    scope: str,
+    arguments: Optional[Mapping[str, Any]] = None,
+    pipeline_root: Optional[str] = None,
+    labels: Optional[Mapping[str, str]] = None,
+) -> str:
+    """Compute the fingerprint of a submission.
+
+    Submissions with the same fingerprint create identical runs, regardless of the
+    order of the arguments and labels.
+
+    Args:
+        digest (str): The content hash of the pipeline package file, such as
+            :func:`.pipeline_cache.package_digest`.
+        scope (str): The service that runs the job, such as
+            :attr:`.backends.Backend.scope`.
+        arguments (Optional[Mapping[str, Any]], optional): Arguments to the pipeline,
+            including the default values of the omitted parameters.
+            Defaults to None.
+        pipeline_root (Optional[str], optional): The root path of the pipeline
+            outputs. Defaults to None.
+        labels (Optional[Mapping[str, str]], optional): Labels of the run.
+            Defaults to None.
+
+    Returns:
+        str: The SHA-256 hex digest of the submission.
+
+    """
+
+    payload = json.dumps(
+        {
+            "package": digest,
+            "scope": scope,
+            "arguments": dict(arguments or {}),
+            "pipeline_root": pipeline_root,
+            "labels": dict(labels or {}),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SubmissionJournal:
+    """On-disk journal of recent submissions.
+
+    Each submission is recorded with its fingerprint and the ID of the created run,
+    so that an identical submission within :attr:`window` seconds, such as a retry
+    of a CI job, can return the existing run instead of creating another one.
+
+    The journal is an SQLite database, so it can be shared between threads and
+    processes. When a submission is recorded, entries older than both :attr:`window`
+    and 7 days are removed, so that a journal with a short window does not remove
+    the entries that a journal with a longer window relies on. Identical submissions made at the same time are not deduplicated,
+    since a run is recorded only after it is created.
+
+    Args:
+        path (Optional[Union[str, os.PathLike]], optional): The path of the database
+            file. If None, ``submissions.sqlite3`` under
+            :func:`.pipeline_cache.default_cache_dir` is used. Defaults to None.
+        window (float, optional): Seconds during which an identical submission
+            returns the existing run. Defaults to 3600.0.
+
+    Raises:
+        ValueError: If :attr:`window` is negative.
+
+    """
+
+    def __init__(
+        self, path: Optional[Union[str, os.PathLike]] = None, window: float = 3600.0
+    ):
+        if window < 0:
+            raise ValueError(f"window must not be negative: {window}")
+        if path is None:
+            path = default_cache_dir() / "submissions.sqlite3"
+        self.path = Path(path)
+        self.window = window
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection is opened for each operation, since connections cannot be
+        # shared between threads.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(os.fspath(self.path), timeout=30.0)
+        try:
+            connection.executescript(_SCHEMA)
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def find(self, fingerprint: str) -> Optional[str]:
+        """Find the run of an identical submission within the window.
+
+        Args:
+            fingerprint (str): The fingerprint of the submission.
+
+        Returns:
+            Optional[str]: The ID of the most recent run, or None if there is no
+            identical submission within the window.
+
+        """
+
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT run_id FROM submissions"
+                " WHERE fingerprint = ? AND submitted_at >= ?"
+                " ORDER BY submitted_at DESC LIMIT 1",
+                (fingerprint, time.time() - self.window),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, fingerprint: str, run_id: str):
+        """Record a submission.
+
+        Args:
+            fingerprint (str): The fingerprint of the submission.
+            run_id (str): The ID of the created run.
+
+        """
+
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM submissions WHERE submitted_at < ?",
+                (now - max(self.window, _RETENTION),),
+            )
+            connection.execute(
+                "INSERT INTO submissions (fingerprint, run_id, submitted_at)"
+                " VALUES (?, ?, ?)",
+                (fingerprint, run_id, now),
+            )
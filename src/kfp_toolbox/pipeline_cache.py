@@ -0,0 +1,468 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from . import pipeline_parser
+from .pipeline_parser import Parameter, Pipeline
+
+_CACHE_VERSION = 1
+_CHUNK_SIZE = 1024 * 1024
+_TYPE_NAMES = {int: "int", float: "float", str: "str"}
+_TYPE_FUNCTIONS = {name: type_function for type_function, name in _TYPE_NAMES.items()}
+
+
+def default_cache_dir() -> Path:
+    """Return the default directory of the kfp-toolbox cache.
+
+    ``$XDG_CACHE_HOME/kfp-toolbox`` is used if the environment variable is set,
+    otherwise ``~/.cache/kfp-toolbox``.
+
+    Returns:
+        Path: The path of the cache directory.
+
+    """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(cache_home) / "kfp-toolbox"
+
+
+def package_digest(filepath: Union[str, os.PathLike]) -> str:
+    """Compute the content hash of the pipeline package file.
+
+    Args:
+        filepath (Union[str, os.PathLike]): The path of the pipeline package file.
+
+    Returns:
+        str: The SHA-256 hex digest of the file content.
+
+    """
+
+    digest = hashlib.sha256()
+    with open(os.fspath(filepath), "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode_pipeline(pipeline: Pipeline) -> Dict[str, Any]:
+    return {
+        "version": _CACHE_VERSION,
+        "name": pipeline.name,
+        "parameters": [
+            {
+                "name": parameter.name,
+                "type": _TYPE_NAMES[parameter.type],
+                "default": parameter.default,
+            }
+            for parameter in pipeline.parameters
+        ],
+    }
+
+
+def _decode_pipeline(entry: Any) -> Optional[Pipeline]:
+    if not isinstance(entry, dict) or entry.get("version") != _CACHE_VERSION:
+        return None
+    try:
+        parameters = [
+            Parameter(
+                name=item["name"],
+                type=_TYPE_FUNCTIONS[item["type"]],
+                default=item["default"],
+            )
+            for item in entry["parameters"]
+        ]
+        return Pipeline(name=entry["name"], parameters=parameters)
+    except (KeyError, TypeError):
+        return None
+
+
+class PackageCache:
+    """On-disk cache of parsed pipeline packages.
+
+    Entries are keyed by the content hash of the pipeline package file and hold only
+    the pipeline name and parameters, so loading an unchanged package skips decoding
+    it entirely. Least recently used entries are evicted when the total size of the
+    cache exceeds :attr:`max_size`. Corrupt entries and entries written by another
+    version of the cache format are discarded and rebuilt.
+
+    :attr:`.Pipeline.spec` of a pipeline restored from the cache is read from the
+    pipeline package file when it is first accessed.
+
+    Args:
+        directory (Optional[Union[str, os.PathLike]], optional): The directory to
+            store the cache entries. If None, ``packages`` under
+            :func:`default_cache_dir` is used. Defaults to None.
+        max_size (int, optional): The maximum total size of the cache entries in
+            bytes. Defaults to 16 MiB.
+
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        max_size: int = 16 * 1024 * 1024,
+    ):
+        if directory is None:
+            directory = default_cache_dir() / "packages"
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Pipeline]:
+        """Get a cached pipeline.
+
+        Args:
+            key (str): The content hash of the pipeline package file.
+
+        Returns:
+            Optional[Pipeline]: The cached pipeline, or None if there is no valid
+            entry for the key.
+
+        """
+
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            entry = None
+
+        pipeline = _decode_pipeline(entry)
+        if pipeline is None:
+            self._remove(entry_path)
+            return None
+
+        try:
+            os.utime(entry_path)  # mark as recently used
+        except OSError:
+            pass
+        return pipeline
+
+    def put(self, key: str, pipeline: Pipeline):
+        """Store a pipeline in the cache.
+
+        Failures to write the cache are ignored since the cache is only an
+        optimization.
+
+        Args:
+            key (str): The content hash of the pipeline package file.
+            pipeline (Pipeline): The pipeline to be cached.
+
+        """
+
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(_encode_pipeline(pipeline), f)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+        self._evict()
+
+    def load(self, filepath: Union[str, os.PathLike]) -> Pipeline:
+        """Load a pipeline from the pipeline package file through the cache.
+
+        Args:
+            filepath (Union[str, os.PathLike]): The path of the pipeline package
+                file.
+
+        Raises:
+            ValueError: If the :attr:`filepath` file has an invalid schema.
+
+        Returns:
+            Pipeline: An object that represents the pipeline.
+
+        """
+
+        key = package_digest(filepath)
+        pipeline = self.get(key)
+        if pipeline is None:
+            pipeline = pipeline_parser.parse_pipeline_package(
+                filepath, header_only=True
+            )
+            self.put(key, pipeline)
+        else:
+            pipeline.source = os.path.abspath(os.fspath(filepath))
+        return pipeline
+
+    def clear(self):
+        """Remove all entries from the cache."""
+
+        for entry_path in self.directory.glob("*.json"):
+            self._remove(entry_path)
+
+    def _evict(self):
+        entries = []
+        total_size = 0
+        for entry_path in self.directory.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            self._remove(entry_path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _entry_size(key: str, pipeline: Pipeline) -> int:
+    # An estimate of the memory held by an entry of MemoryCache: the key, and the
+    # pipeline with its name, source and parameters.
+    objects = [key, pipeline, pipeline.name, pipeline.source, pipeline.parameters]
+    for parameter in pipeline.parameters:
+        objects += [parameter, parameter.name, parameter.default]
+    return sum(sys.getsizeof(obj) for obj in objects)
+
+
+@dataclass
+class CacheStats:
+    """Statistics of a :class:`MemoryCache`.
+
+    Attributes:
+        hits: The number of loads served from the cache.
+        misses: The number of loads that parsed the pipeline package file.
+        evictions: The number of entries evicted to respect the cache limits.
+        entries: The current number of entries.
+        size: The current estimated memory of the entries in bytes.
+
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size: int = 0
+
+
+class MemoryCache:
+    """In-process cache of parsed pipeline packages.
+
+    Entries are keyed by the absolute path of the pipeline package file and are
+    invalidated when the inode, modification time or size of the file changes. Least
+    recently used entries are evicted when the number of entries exceeds
+    :attr:`max_entries` or their estimated memory exceeds :attr:`max_bytes`. The
+    cache can be shared between threads.
+
+    Packages are parsed in header-only mode, and the cached pipelines never retain
+    :attr:`.Pipeline.spec` or :attr:`.Pipeline.graph`, which are read from the file
+    on each access. An entry thus holds only the name and parameters of a pipeline,
+    and is charged for the memory of those rather than for the size of the package
+    file, so large packages are cached as well.
+
+    The same :class:`.Pipeline` object is returned for every hit, so callers must not
+    modify it.
+
+    Args:
+        max_entries (int, optional): The maximum number of entries. Defaults to 128.
+        max_bytes (int, optional): The maximum estimated memory of the entries in
+            bytes. Defaults to 256 MiB.
+
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], Pipeline, int]]" = (
+            OrderedDict()
+        )
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        """CacheStats: A snapshot of the cache statistics."""
+
+        with self._lock:
+            return replace(self._stats)
+
+    def load(self, filepath: Union[str, os.PathLike]) -> Pipeline:
+        """Load a pipeline from the pipeline package file through the cache.
+
+        Args:
+            filepath (Union[str, os.PathLike]): The path of the pipeline package
+                file.
+
+        Raises:
+            ValueError: If the :attr:`filepath` file has an invalid schema.
+
+        Returns:
+            Pipeline: An object that represents the pipeline.
+
+        """
+
+        key = os.path.abspath(os.fspath(filepath))
+        stat = os.stat(key)
+        signature = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self._stats.hits += 1
+                return entry[1]
+            self._stats.misses += 1
+
+        pipeline = pipeline_parser.parse_pipeline_package(
+            key, header_only=True, retain_spec=False
+        )
+        size = _entry_size(key, pipeline)
+
+        with self._lock:
+            self._discard(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (signature, pipeline, size)
+                self._stats.entries += 1
+                self._stats.size += size
+            while self._entries and (
+                self._stats.entries > self.max_entries
+                or self._stats.size > self.max_bytes
+            ):
+                self._discard(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+        return pipeline
+
+    def clear(self):
+        """Remove all entries from the cache."""
+
+        with self._lock:
+            self._entries.clear()
+            self._stats.entries = 0
+            self._stats.size = 0
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._stats.entries -= 1
+            self._stats.size -= entry[2]
+
+
+class UploadCache:
+    """On-disk cache of pipeline versions uploaded to Kubeflow Pipelines.
+
+    Entries map the endpoint and the content hash of a pipeline package file to the
+    IDs of the pipeline and the pipeline version uploaded from it, so that the same
+    package is not uploaded again. The cache can be shared between threads, and
+    writes are atomic so that concurrent processes never see a partial file.
+
+    Args:
+        path (Optional[Union[str, os.PathLike]], optional): The path of the cache
+            file. If None, ``uploads.json`` under :func:`default_cache_dir` is used.
+            Defaults to None.
+
+    """
+
+    def __init__(self, path: Optional[Union[str, os.PathLike]] = None):
+        if path is None:
+            path = default_cache_dir() / "uploads.json"
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(endpoint: str, digest: str) -> str:
+        return f"{endpoint}#{digest}"
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict) or entries.get("version") != _CACHE_VERSION:
+            return {}
+        return entries
+
+    def _write(self, entries: Dict[str, Any]):
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            PackageCache._remove(tmp_path)
+
+    def get(self, endpoint: str, digest: str) -> Optional[Tuple[str, str]]:
+        """Get the uploaded pipeline version.
+
+        Args:
+            endpoint (str): Endpoint of the KFP API service.
+            digest (str): The content hash of the pipeline package file.
+
+        Returns:
+            Optional[Tuple[str, str]]: The IDs of the pipeline and the pipeline
+            version, or None if the package has not been uploaded.
+
+        """
+
+        with self._lock:
+            entry = self._read().get("uploads", {}).get(self._key(endpoint, digest))
+        if not (isinstance(entry, list) and len(entry) == 2):
+            return None
+        return entry[0], entry[1]
+
+    def put(self, endpoint: str, digest: str, pipeline_id: str, version_id: str):
+        """Record an uploaded pipeline version.
+
+        Failures to write the cache are ignored since the cache is only an
+        optimization.
+
+        Args:
+            endpoint (str): Endpoint of the KFP API service.
+            digest (str): The content hash of the pipeline package file.
+            pipeline_id (str): The ID of the pipeline.
+            version_id (str): The ID of the pipeline version.
+
+        """
+
+        with self._lock:
+            entries = self._read()
+            uploads = entries.get("uploads")
+            if not isinstance(uploads, dict):
+                uploads = {}
+            uploads[self._key(endpoint, digest)] = [pipeline_id, version_id]
+            self._write({"version": _CACHE_VERSION, "uploads": uploads})
+
+    def discard(self, endpoint: str, digest: str):
+        """Remove a pipeline version that is no longer available.
+
+        Args:
+            endpoint (str): Endpoint of the KFP API service.
+            digest (str): The content hash of the pipeline package file.
+
+        """
+
+        with self._lock:
+            entries = self._read()
+            uploads = entries.get("uploads")
+            if isinstance(uploads, dict) and uploads.pop(
+                self._key(endpoint, digest), None
+            ):
+                self._write(entries)
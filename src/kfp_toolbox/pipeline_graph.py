@@ -0,0 +1,215 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+@dataclass
+class Task:
+    """Pipeline task.
+
+    A class that represents a single task in the DAG of a pipeline.
+
+    Attributes:
+        name: A name of the task.
+        component: A name of the component (V2) or template (V1) that the task runs.
+        executor: A name of the executor that runs the task, or None if the task
+            does not run a container by itself (e.g. a sub-DAG).
+        dependencies: Names of the tasks that must finish before the task.
+
+    """
+
+    name: str
+    component: Optional[str] = None
+    executor: Optional[str] = None
+    dependencies: Tuple[str, ...] = ()
+
+
+class PipelineGraph:
+    """Indexed DAG of a compiled pipeline.
+
+    All indices are computed once when the object is created, in time linear in the
+    number of tasks and dependencies.
+
+    Args:
+        tasks (Sequence[Task]): Tasks of the DAG.
+        components (Optional[Mapping[str, Any]], optional): Component (V2) or template
+            (V1) definitions keyed by name. Defaults to None.
+        executors (Optional[Mapping[str, Any]], optional): Executor definitions keyed
+            by name. Defaults to None.
+
+    Raises:
+        ValueError: If a task depends on an unknown task, or the dependencies
+            contain a cycle.
+
+    Attributes:
+        tasks: Tasks keyed by name, in definition order.
+        components: Component (V2) or template (V1) definitions keyed by name.
+        executors: Executor definitions keyed by name.
+        successors: Names of the tasks that depend on each task.
+        predecessors: Names of the tasks that each task depends on.
+        topological_order: Names of all tasks, each after all of its dependencies.
+
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[Task],
+        components: Optional[Mapping[str, Any]] = None,
+        executors: Optional[Mapping[str, Any]] = None,
+    ):
+        self.tasks: Dict[str, Task] = {task.name: task for task in tasks}
+        self.components: Mapping[str, Any] = components or {}
+        self.executors: Mapping[str, Any] = executors or {}
+
+        self.successors: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        self.predecessors: Dict[str, List[str]] = {name: [] for name in self.tasks}
+        for task in self.tasks.values():
+            for dependency in task.dependencies:
+                if dependency not in self.tasks:
+                    raise ValueError(
+                        f"task {task.name!r} depends on an unknown task {dependency!r}"
+                    )
+                self.successors[dependency].append(task.name)
+                self.predecessors[task.name].append(dependency)
+
+        self.topological_order = self._sort()
+
+    def _sort(self) -> List[str]:
+        in_degrees = {name: len(self.predecessors[name]) for name in self.tasks}
+        queue = deque(name for name, degree in in_degrees.items() if degree == 0)
+        order = []
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for successor in self.successors[name]:
+                in_degrees[successor] -= 1
+                if in_degrees[successor] == 0:
+                    queue.append(successor)
+
+        if len(order) != len(self.tasks):
+            cyclic = sorted(name for name, degree in in_degrees.items() if degree)
+            raise ValueError(f"the dependencies of tasks contain a cycle: {cyclic}")
+        return order
+
+    @property
+    def roots(self) -> List[str]:
+        """List[str]: Names of the tasks without dependencies."""
+
+        return [name for name in self.tasks if not self.predecessors[name]]
+
+    @property
+    def leaves(self) -> List[str]:
+        """List[str]: Names of the tasks that no task depends on."""
+
+        return [name for name in self.tasks if not self.successors[name]]
+
+    def fan_in(self, name: str) -> int:
+        """Count the tasks that the task depends on.
+
+        Args:
+            name (str): A name of the task.
+
+        Returns:
+            int: The number of direct dependencies.
+
+        """
+
+        return len(self.predecessors[name])
+
+    def fan_out(self, name: str) -> int:
+        """Count the tasks that depend on the task.
+
+        Args:
+            name (str): A name of the task.
+
+        Returns:
+            int: The number of direct dependents.
+
+        """
+
+        return len(self.successors[name])
+
+    def executor(self, name: str) -> Optional[Mapping[str, Any]]:
+        """Get the executor definition of the task.
+
+        Args:
+            name (str): A name of the task.
+
+        Returns:
+            Optional[Mapping[str, Any]]: The executor definition, or None if the task
+            has no executor.
+
+        """
+
+        executor = self.tasks[name].executor
+        if executor is None:
+            return None
+        return self.executors.get(executor)
+
+    @classmethod
+    def from_spec(cls, pipeline_spec: Mapping[str, Any]) -> "PipelineGraph":
+        """Build the DAG from a decoded pipeline package.
+
+        The tasks of the root DAG are read from ``pipelineSpec`` for V2 packages, or
+        from the entrypoint template of the Argo workflow for V1 packages.
+
+        Args:
+            pipeline_spec (Mapping[str, Any]): The decoded pipeline package.
+
+        Raises:
+            ValueError: If the package has an invalid schema or an invalid DAG.
+
+        Returns:
+            PipelineGraph: The DAG of the pipeline.
+
+        """
+
+        if "pipelineSpec" in pipeline_spec:
+            return cls._from_v2_spec(pipeline_spec["pipelineSpec"])
+        elif "spec" in pipeline_spec and "templates" in pipeline_spec["spec"]:
+            return cls._from_v1_spec(pipeline_spec["spec"])
+        raise ValueError("invalid schema")
+
+    @classmethod
+    def _from_v2_spec(cls, spec: Mapping[str, Any]) -> "PipelineGraph":
+        components = spec.get("components", {})
+        executors = spec.get("deploymentSpec", {}).get("executors", {})
+        task_specs = spec["root"].get("dag", {}).get("tasks", {})
+
+        tasks = []
+        for name, task_spec in task_specs.items():
+            component = task_spec.get("componentRef", {}).get("name")
+            tasks.append(
+                Task(
+                    name=name,
+                    component=component,
+                    executor=components.get(component, {}).get("executorLabel"),
+                    dependencies=tuple(task_spec.get("dependentTasks", [])),
+                )
+            )
+
+        return cls(tasks, components=components, executors=executors)
+
+    @classmethod
+    def _from_v1_spec(cls, spec: Mapping[str, Any]) -> "PipelineGraph":
+        templates = {template["name"]: template for template in spec["templates"]}
+        executors = {
+            name: template
+            for name, template in templates.items()
+            if "container" in template
+        }
+        entrypoint = templates.get(spec.get("entrypoint"), {})
+
+        tasks = []
+        for task_spec in entrypoint.get("dag", {}).get("tasks", []):
+            template = task_spec.get("template")
+            tasks.append(
+                Task(
+                    name=task_spec["name"],
+                    component=template,
+                    executor=template if template in executors else None,
+                    dependencies=tuple(task_spec.get("dependencies", [])),
+                )
+            )
+
+        return cls(tasks, components=templates, executors=executors)
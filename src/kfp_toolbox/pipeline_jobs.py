@@ -1,5 +1,99 @@
+import asyncio
+import collections
+import datetime
+import functools
+import itertools
 import os
-from typing import Any, Mapping, Optional, Union
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from . import backends, journal, pipeline_cache, pipeline_parser, throttling, tracing
+
+T = TypeVar("T")
+
+
+def _create_backend(
+    endpoint: Optional[str],
+    iap_client_id: Optional[str],
+    api_namespace: str,
+    other_client_id: Optional[str],
+    other_client_secret: Optional[str],
+    namespace: Optional[str],
+    encryption_spec_key_name: Optional[str],
+    labels: Optional[Mapping[str, str]],
+    project: Optional[str],
+    location: Optional[str],
+    network: Optional[str],
+    upload_pipeline: bool,
+) -> backends.Backend:
+    if endpoint:  # Kubeflow Pipelines
+        return backends.KfpBackend(
+            endpoint=endpoint,
+            iap_client_id=iap_client_id,
+            api_namespace=api_namespace,
+            other_client_id=other_client_id,
+            other_client_secret=other_client_secret,
+            namespace=namespace,
+            upload_pipeline=upload_pipeline,
+        )
+    else:  # Vertex AI Pipelines
+        return backends.VertexBackend(
+            encryption_spec_key_name=encryption_spec_key_name,
+            labels=labels,
+            project=project,
+            location=location,
+            network=network,
+        )
+
+
+def _resolve_arguments(
+    pipeline_file: str, arguments: Optional[Mapping[str, Any]]
+) -> Dict[str, Any]:
+    # Omitted parameters take their default values, so that a submission that
+    # gives a default value explicitly is identical to one that omits it.
+    pipeline = pipeline_parser.parse_pipeline_package(
+        pipeline_file, header_only=True, retain_spec=False
+    )
+    resolved = {
+        parameter.name: parameter.default
+        for parameter in pipeline.parameters
+        if parameter.default is not None
+    }
+    resolved.update(arguments or {})
+    return resolved
+
+
+def _find_submitted_run(
+    submission_journal: journal.SubmissionJournal,
+    backend: backends.Backend,
+    fingerprint: str,
+) -> Optional[Any]:
+    run_id = submission_journal.find(fingerprint)
+    if run_id is None:
+        return None
+    try:
+        return backend.get_run(run_id)
+    except Exception as e:
+        # The run has been deleted from the service, so the job is submitted again.
+        if getattr(e, "status", None) == 404 or getattr(e, "code", None) == 404:
+            return None
+        raise
 
 
 def submit_pipeline_job(
@@ -21,12 +115,23 @@ def submit_pipeline_job(
     project: Optional[str] = None,
     location: Optional[str] = None,
     network: Optional[str] = None,
-):
+    upload_pipeline: bool = False,
+    throttle: Optional[throttling.Throttle] = None,
+    backend: Optional[backends.Backend] = None,
+    tracer: Optional[tracing.Tracer] = None,
+    submission_journal: Optional[journal.SubmissionJournal] = None,
+) -> Any:
     """Submit a pipeline job.
 
-    Submit a pipeline job to the appropriate environment. If an :attr:`endpoint` is
-    specified, it is considered an instance of Kubeflow Pipelines. Otherwise, attempt
-    to submit to Vertex AI Pipelines.
+    Submit a pipeline job to the appropriate environment. If a :attr:`backend` is
+    specified, the job is submitted to it. Otherwise, if an :attr:`endpoint` is
+    specified, it is considered an instance of Kubeflow Pipelines, or else attempt to
+    submit to Vertex AI Pipelines.
+
+    Compressed pipeline packages (``.tar.gz`` and ``.zip``) are also accepted.
+
+    Clients of Kubeflow Pipelines are reused across calls through
+    :data:`.clients.default_registry`.
 
     Args:
         pipeline_file (Union[str, os.PathLike]): Path of the pipeline package file.
@@ -68,46 +173,573 @@ def submit_pipeline_job(
         network (Optional[str], optional): The full name of the Compute Engine network
             to which the job should be peered. Used only for Vertex AI Pipelines.
             Defaults to None.
+        upload_pipeline (bool, optional): Whether or not to upload the pipeline
+            package as a pipeline version once and create runs from it by ID, instead
+            of sending the whole package with every run. Uploaded versions are
+            recorded in :class:`.pipeline_cache.UploadCache` by the content hash of
+            the package, so later calls skip the upload. Used only for Kubeflow
+            Pipelines. Defaults to False.
+        throttle (Optional[throttling.Throttle], optional): Limits the rate of each
+            API request that submits the job, and retries throttled requests. The
+            request that creates the run is retried only if the service rejected it
+            with 429, so that a run accepted before a 503 is not duplicated. If
+            None, the requests are sent once without limiting. Defaults to None.
+        backend (Optional[backends.Backend], optional): The service to submit the
+            job to. If specified, the options specific to a service are ignored, and
+            the :class:`.backends.Backend` holds them instead. Defaults to None.
+        tracer (Optional[tracing.Tracer], optional): Records the wall time and the
+            bytes transferred of each phase of the submission, such as importing
+            the SDK, creating the client, uploading the pipeline and creating the
+            run, within a ``"submit"`` span. Defaults to None.
+        submission_journal (Optional[journal.SubmissionJournal], optional): Makes
+            the submission idempotent. If an identical job, with the same package
+            content, arguments including defaults, :attr:`pipeline_root` and
+            :attr:`labels`, was submitted to the same service within the window of
+            the journal, the existing run is returned instead of submitting the job
+            again. Otherwise, the created run is recorded in the journal.
+            Defaults to None.
 
-    """
+    Raises:
+        ValueError: If :attr:`enable_caching` is specified with
+            :attr:`upload_pipeline`, since the caching options of an uploaded
+            pipeline version cannot be overridden.
 
-    pipeline_file_str = os.fspath(pipeline_file)
+    Returns:
+        Any: The submitted run. A ``kfp.Client.RunPipelineResult`` for Kubeflow
+        Pipelines, or an ``aiplatform.PipelineJob`` for Vertex AI Pipelines.
 
-    if endpoint:  # Kubeflow Pipelines
-        import kfp
+    """
 
-        client = kfp.Client(
-            host=endpoint,
-            client_id=iap_client_id,
-            namespace=api_namespace,
+    if backend is None:
+        backend = _create_backend(
+            endpoint=endpoint,
+            iap_client_id=iap_client_id,
+            api_namespace=api_namespace,
             other_client_id=other_client_id,
             other_client_secret=other_client_secret,
+            namespace=namespace,
+            encryption_spec_key_name=encryption_spec_key_name,
+            labels=labels,
+            project=project,
+            location=location,
+            network=network,
+            upload_pipeline=upload_pipeline,
         )
-        client.create_run_from_pipeline_package(
-            pipeline_file=pipeline_file_str,
-            arguments=arguments,  # type: ignore
+    pipeline_file = os.fspath(pipeline_file)
+    with tracing.span(tracer, "submit", backend=type(backend).__name__):
+        if submission_journal is not None:
+            with tracing.span(tracer, "dedup") as span:
+                fingerprint = journal.submission_fingerprint(
+                    pipeline_cache.package_digest(pipeline_file),
+                    backend.scope,
+                    arguments=_resolve_arguments(pipeline_file, arguments),
+                    pipeline_root=pipeline_root,
+                    labels=labels,
+                )
+                run = _find_submitted_run(submission_journal, backend, fingerprint)
+                span.attributes["hit"] = run is not None
+            if run is not None:
+                return run
+
+        run = backend.submit(
+            pipeline_file,
+            arguments=arguments,
             run_name=run_name,
             experiment_name=experiment_name,
-            namespace=namespace,
             pipeline_root=pipeline_root,
             enable_caching=enable_caching,
             service_account=service_account,
+            tracer=tracer,
+            throttle=throttle,
         )
-    else:  # Vertex AI Pipelines
-        from google.cloud import aiplatform
+        if submission_journal is not None:
+            submission_journal.record(fingerprint, backend.run_id(run))
+        return run
+
+
+def _map_in_order(
+    func: Callable[[int, T], Any], items: Iterable[T], max_workers: int
+) -> Iterator[Union[Any, Exception]]:
+    # Yield results in input order while keeping at most twice as many submissions
+    # in flight as there are workers, so that the input is consumed lazily.
+    pending: Deque[Future] = collections.deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, item in enumerate(items):
+            pending.append(executor.submit(func, index, item))
+            if len(pending) >= max_workers * 2:
+                yield _future_result(pending.popleft())
+        while pending:
+            yield _future_result(pending.popleft())
 
-        job = aiplatform.PipelineJob(
-            display_name=None,  # type: ignore  # will be generated
-            template_path=pipeline_file_str,
-            job_id=run_name,
+
+def _future_result(future: Future) -> Union[Any, Exception]:
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+
+def submit_pipeline_jobs(
+    pipeline_file: Union[str, os.PathLike],
+    arguments_list: Iterable[Optional[Mapping[str, Any]]],
+    max_workers: int = 8,
+    endpoint: Optional[str] = None,
+    iap_client_id: Optional[str] = None,
+    api_namespace: str = "kubeflow",
+    other_client_id: Optional[str] = None,
+    other_client_secret: Optional[str] = None,
+    run_name: Optional[str] = None,
+    experiment_name: Optional[str] = None,
+    namespace: Optional[str] = None,
+    pipeline_root: Optional[str] = None,
+    enable_caching: Optional[bool] = None,
+    service_account: Optional[str] = None,
+    encryption_spec_key_name: Optional[str] = None,
+    labels: Optional[Mapping[str, str]] = None,
+    project: Optional[str] = None,
+    location: Optional[str] = None,
+    network: Optional[str] = None,
+    upload_pipeline: bool = False,
+    throttle: Optional[throttling.Throttle] = None,
+    backend: Optional[backends.Backend] = None,
+) -> List[Union[Any, Exception]]:
+    """Submit pipeline jobs of the same pipeline in parallel.
+
+    A run is submitted for each set of arguments across a bounded pool of threads.
+    The pipeline package is decoded once for all submissions. With an endpoint,
+    they share a single client of Kubeflow Pipelines, an experiment and the decoded
+    workflow. Otherwise they share a single template job of Vertex AI Pipelines,
+    which is cloned for each run, along with its credentials.
+
+    A failed submission does not abort the others. The exception is returned in
+    place of the run. Pass a :class:`.throttling.Throttle` to pace the API requests
+    of all threads and retry throttled ones.
+
+    Args:
+        pipeline_file (Union[str, os.PathLike]): Path of the pipeline package file.
+        arguments_list (Iterable[Optional[Mapping[str, Any]]]): Arguments to the
+            pipeline function for each run.
+        max_workers (int, optional): The maximum number of submissions in progress
+            at the same time. Defaults to 8.
+        run_name (Optional[str], optional): Prefix of the names of the runs, which
+            are suffixed with the index of the arguments. If None, the names are
+            generated. Defaults to None.
+
+    The other arguments are the same as :func:`submit_pipeline_job`.
+
+    Returns:
+        List[Union[Any, Exception]]: The submitted runs, or the exceptions raised
+        while submitting them, in the order of :attr:`arguments_list`.
+
+    """
+
+    return list(
+        iter_submit_pipeline_jobs(
+            pipeline_file,
+            arguments_list,
+            max_workers=max_workers,
+            endpoint=endpoint,
+            iap_client_id=iap_client_id,
+            api_namespace=api_namespace,
+            other_client_id=other_client_id,
+            other_client_secret=other_client_secret,
+            run_name=run_name,
+            experiment_name=experiment_name,
+            namespace=namespace,
             pipeline_root=pipeline_root,
-            parameter_values=arguments,  # type: ignore
             enable_caching=enable_caching,
+            service_account=service_account,
+            encryption_spec_key_name=encryption_spec_key_name,
+            labels=labels,
+            project=project,
+            location=location,
+            network=network,
+            upload_pipeline=upload_pipeline,
+            throttle=throttle,
+            backend=backend,
+        )
+    )
+
+
+def iter_submit_pipeline_jobs(
+    pipeline_file: Union[str, os.PathLike],
+    arguments_list: Iterable[Optional[Mapping[str, Any]]],
+    max_workers: int = 8,
+    endpoint: Optional[str] = None,
+    iap_client_id: Optional[str] = None,
+    api_namespace: str = "kubeflow",
+    other_client_id: Optional[str] = None,
+    other_client_secret: Optional[str] = None,
+    run_name: Optional[str] = None,
+    experiment_name: Optional[str] = None,
+    namespace: Optional[str] = None,
+    pipeline_root: Optional[str] = None,
+    enable_caching: Optional[bool] = None,
+    service_account: Optional[str] = None,
+    encryption_spec_key_name: Optional[str] = None,
+    labels: Optional[Mapping[str, str]] = None,
+    project: Optional[str] = None,
+    location: Optional[str] = None,
+    network: Optional[str] = None,
+    upload_pipeline: bool = False,
+    throttle: Optional[throttling.Throttle] = None,
+    backend: Optional[backends.Backend] = None,
+) -> Iterator[Union[Any, Exception]]:
+    """Submit pipeline jobs of the same pipeline in parallel, lazily.
+
+    The same as :func:`submit_pipeline_jobs`, except that :attr:`arguments_list` is
+    consumed as the results are iterated, with at most twice :attr:`max_workers`
+    submissions in flight, so that memory stays flat for an input of any size, such
+    as a stream of lines. No more submissions are started once the iterator is
+    closed.
+
+    The arguments are the same as :func:`submit_pipeline_jobs`.
+
+    Returns:
+        Iterator[Union[Any, Exception]]: The submitted runs, or the exceptions raised
+        while submitting them, in the order of :attr:`arguments_list`.
+
+    """
+
+    if backend is None:
+        backend = _create_backend(
+            endpoint=endpoint,
+            iap_client_id=iap_client_id,
+            api_namespace=api_namespace,
+            other_client_id=other_client_id,
+            other_client_secret=other_client_secret,
+            namespace=namespace,
             encryption_spec_key_name=encryption_spec_key_name,
-            labels=labels,  # type: ignore
+            labels=labels,
             project=project,
             location=location,
+            network=network,
+            upload_pipeline=upload_pipeline,
         )
-        job.submit(
-            service_account=service_account, network=network, experiment=experiment_name
+    submitter = backend.submitter(
+        os.fspath(pipeline_file),
+        run_name=run_name,
+        experiment_name=experiment_name,
+        pipeline_root=pipeline_root,
+        enable_caching=enable_caching,
+        service_account=service_account,
+        throttle=throttle,
+    )
+    yield from _map_in_order(submitter, arguments_list, max_workers)
+
+
+async def submit_pipeline_job_async(
+    pipeline_file: Union[str, os.PathLike],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    **kwargs: Any,
+) -> Any:
+    """Submit a pipeline job without blocking the event loop.
+
+    :func:`submit_pipeline_job` is run in the default executor of the running event
+    loop. Share a :attr:`semaphore` between calls to bound the number of submissions
+    in progress at the same time.
+
+    Args:
+        pipeline_file (Union[str, os.PathLike]): Path of the pipeline package file.
+        semaphore (Optional[asyncio.Semaphore], optional): A semaphore acquired while
+            the job is submitted. Defaults to None.
+        **kwargs: The other arguments of :func:`submit_pipeline_job`.
+
+    Returns:
+        Any: The submitted run, the same as :func:`submit_pipeline_job`.
+
+    """
+
+    loop = asyncio.get_running_loop()
+    func = functools.partial(submit_pipeline_job, pipeline_file, **kwargs)
+    if semaphore is None:
+        return await loop.run_in_executor(None, func)
+    async with semaphore:
+        return await loop.run_in_executor(None, func)
+
+
+async def wait_for_runs(
+    runs: Sequence[Any],
+    poll_interval: float = 5.0,
+    timeout: Optional[float] = None,
+    max_concurrency: int = 16,
+) -> List[str]:
+    """Wait for submitted runs to finish without blocking the event loop.
+
+    The state of each run is polled every :attr:`poll_interval` seconds until it is
+    final. Polling requests are run in the default executor of the running event
+    loop, at most :attr:`max_concurrency` at the same time.
+
+    Args:
+        runs (Sequence[Any]): Runs returned by :func:`submit_pipeline_job` or
+            :func:`submit_pipeline_job_async`. A ``kfp.Client.RunPipelineResult`` for
+            Kubeflow Pipelines, or an ``aiplatform.PipelineJob`` for Vertex AI
+            Pipelines.
+        poll_interval (float, optional): Seconds between polls of a run.
+            Defaults to 5.0.
+        timeout (Optional[float], optional): Seconds to wait for all runs. If None,
+            wait indefinitely. Defaults to None.
+        max_concurrency (int, optional): The maximum number of polling requests in
+            progress at the same time. Defaults to 16.
+
+    Raises:
+        asyncio.TimeoutError: If the runs do not finish within :attr:`timeout`.
+
+    Returns:
+        List[str]: The final states of the runs, in the order of :attr:`runs`. For
+        example, "Succeeded" for Kubeflow Pipelines or "PIPELINE_STATE_SUCCEEDED"
+        for Vertex AI Pipelines.
+
+    """
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _wait(run: Any) -> str:
+        while True:
+            async with semaphore:
+                state, final = await loop.run_in_executor(None, backends.run_state, run)
+            if final:
+                return state
+            await asyncio.sleep(poll_interval)
+
+    return await asyncio.wait_for(
+        asyncio.gather(*(_wait(run) for run in runs)), timeout
+    )
+
+
+@dataclass
+class RunEvent:
+    """A change of the state of a watched run.
+
+    Attributes:
+        run: The run, as added to the :class:`RunWatcher`.
+        state: The new state of the run.
+        final: Whether the state is final, i.e. the run has finished.
+
+    """
+
+    run: Any
+    state: str
+    final: bool
+
+
+class _WatchedRun:
+    __slots__ = ("run", "state", "final", "changed_at", "next_poll_at")
+
+    def __init__(self, run: Any, now: float):
+        self.run = run
+        self.state: Optional[str] = None
+        self.final = False
+        self.changed_at = now
+        self.next_poll_at = now
+
+
+class RunWatcher:
+    """Watcher of the states of many submitted runs.
+
+    Runs of Vertex AI Pipelines are polled together with a single list request for
+    each project and location, which returns only the jobs updated since the
+    previous request. Runs of Kubeflow Pipelines are polled one by one.
+
+    Each run is polled at an interval proportional to the time since its state last
+    changed, bounded by :attr:`min_interval` and :attr:`max_interval`, so that runs
+    that just started or changed are checked often while long-running steps are
+    checked rarely. Runs are forgotten once they reach a final state.
+
+    Args:
+        min_interval (float, optional): The minimum seconds between polls of a run.
+            Defaults to 5.0.
+        max_interval (float, optional): The maximum seconds between polls of a run.
+            Defaults to 60.0.
+        age_factor (float, optional): The interval as a fraction of the age of the
+            current state of a run. Defaults to 0.25.
+        callback (Optional[Callable[[RunEvent], None]], optional): Called with each
+            event in addition to returning it. Defaults to None.
+
+    Attributes:
+        requests: The number of API requests made to poll the runs.
+
+    """
+
+    # Allowance for the difference between the local and server clocks when
+    # listing the jobs updated since the previous request.
+    _CLOCK_SKEW = datetime.timedelta(minutes=1)
+
+    def __init__(
+        self,
+        min_interval: float = 5.0,
+        max_interval: float = 60.0,
+        age_factor: float = 0.25,
+        callback: Optional[Callable[[RunEvent], None]] = None,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.age_factor = age_factor
+        self.callback = callback
+        self.requests = 0
+        self._kfp_runs: List[_WatchedRun] = []
+        self._vertex_runs: Dict[Tuple[Any, Any], Dict[str, _WatchedRun]] = {}
+        self._listed_at: Dict[Tuple[Any, Any], Optional[datetime.datetime]] = {}
+
+    def __len__(self) -> int:
+        return len(self._kfp_runs) + sum(map(len, self._vertex_runs.values()))
+
+    def add(self, run: Any):
+        """Start watching a run.
+
+        Args:
+            run (Any): A run returned by :func:`submit_pipeline_job`. A
+                ``kfp.Client.RunPipelineResult`` for Kubeflow Pipelines, or an
+                ``aiplatform.PipelineJob`` for Vertex AI Pipelines.
+
+        """
+
+        watched = _WatchedRun(run, time.monotonic())
+        if hasattr(run, "run_id"):  # Kubeflow Pipelines
+            self._kfp_runs.append(watched)
+            return
+
+        key = (run.project, run.location)
+        self._vertex_runs.setdefault(key, {})[run.resource_name] = watched
+        # List the jobs updated since the earliest job was created, so that no
+        # change is missed before the job was added.
+        created_at = getattr(run.gca_resource, "create_time", None)
+        listed_at = self._listed_at.get(key, created_at)
+        if created_at is None or listed_at is None:
+            self._listed_at[key] = None
+        else:
+            self._listed_at[key] = min(listed_at, created_at - self._CLOCK_SKEW)
+
+    def next_poll_at(self) -> Optional[float]:
+        """Return when the next run is due to be polled.
+
+        Returns:
+            Optional[float]: The time in :func:`time.monotonic` seconds, or None if no
+            run is watched.
+
+        """
+
+        runs = itertools.chain(
+            self._kfp_runs, *(runs.values() for runs in self._vertex_runs.values())
+        )
+        return min((watched.next_poll_at for watched in runs), default=None)
+
+    def poll(self) -> List[RunEvent]:
+        """Poll the runs that are due.
+
+        Returns:
+            List[RunEvent]: Events of the runs whose states have changed.
+
+        """
+
+        now = time.monotonic()
+        events: List[RunEvent] = []
+
+        for watched in self._kfp_runs:
+            if watched.next_poll_at <= now:
+                self.requests += 1
+                self._update(watched, *backends.run_state(watched.run), now, events)
+        self._kfp_runs = [watched for watched in self._kfp_runs if not watched.final]
+
+        for key, runs in list(self._vertex_runs.items()):
+            if any(watched.next_poll_at <= now for watched in runs.values()):
+                self._poll_vertex(key, runs, now, events)
+
+        for event in events:
+            if self.callback is not None:
+                self.callback(event)
+        return events
+
+    def _poll_vertex(
+        self,
+        key: Tuple[Any, Any],
+        runs: Dict[str, _WatchedRun],
+        now: float,
+        events: List[RunEvent],
+    ):
+        from google.cloud import aiplatform
+
+        project, location = key
+        listed_at = self._listed_at[key]
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        list_filter = None
+        if listed_at is not None:
+            timestamp = listed_at.astimezone(datetime.timezone.utc)
+            list_filter = 'update_time>"{}"'.format(
+                timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+            )
+
+        self.requests += 1
+        jobs = aiplatform.PipelineJob.list(
+            filter=list_filter,
+            project=project,
+            location=location,
+            credentials=next(iter(runs.values())).run.credentials,
         )
+        self._listed_at[key] = started_at - self._CLOCK_SKEW
+
+        updated = set()
+        for job in jobs:
+            watched = runs.get(job.resource_name)
+            if watched is not None:
+                updated.add(job.resource_name)
+                self._update(
+                    watched,
+                    *backends.vertex_state(job.gca_resource.state),
+                    now,
+                    events,
+                )
+        for name, watched in list(runs.items()):
+            if name not in updated and watched.next_poll_at <= now:
+                self._schedule(watched, now)
+            if watched.final:
+                del runs[name]
+        if not runs:
+            del self._vertex_runs[key]
+            del self._listed_at[key]
+
+    def _update(
+        self,
+        watched: _WatchedRun,
+        state: str,
+        final: bool,
+        now: float,
+        events: List[RunEvent],
+    ):
+        if state != watched.state:
+            watched.state = state
+            watched.final = final
+            watched.changed_at = now
+            events.append(RunEvent(run=watched.run, state=state, final=final))
+        self._schedule(watched, now)
+
+    def _schedule(self, watched: _WatchedRun, now: float):
+        interval = (now - watched.changed_at) * self.age_factor
+        interval = min(self.max_interval, max(self.min_interval, interval))
+        watched.next_poll_at = now + interval
+
+    def watch(self, timeout: Optional[float] = None) -> Iterator[RunEvent]:
+        """Poll the runs until all of them finish.
+
+        Args:
+            timeout (Optional[float], optional): Seconds to wait for all runs. If
+                None, wait indefinitely. Defaults to None.
+
+        Raises:
+            TimeoutError: If the runs do not finish within :attr:`timeout`.
+
+        Returns:
+            Iterator[RunEvent]: Events of the runs whose states have changed.
+
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            yield from self.poll()
+            next_poll_at = self.next_poll_at()
+            if next_poll_at is None:
+                return
+            if deadline is not None and next_poll_at > deadline:
+                raise TimeoutError(f"{len(self)} runs have not finished")
+            time.sleep(max(0.0, next_poll_at - time.monotonic()))
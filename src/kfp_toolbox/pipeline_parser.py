@@ -1,14 +1,82 @@
+import contextlib
+import functools
+import glob
+import gzip
+import io
 import json
 import os
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any, Callable, Mapping, Optional, Sequence, Union
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import yaml
 
+from .pipeline_graph import PipelineGraph
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 ParameterValue = Union[int, float, str]
 
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_SNIFF_SIZE = 64
+_PACKAGE_EXTENSIONS = {".json", ".yaml", ".yml", ".gz", ".tgz", ".zip"}
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+class _Each:
+    # A marker of sections to extract from each item of a sequence.
+
+    def __init__(self, sections: Mapping[str, Any]):
+        self.sections = sections
+
+
+# A marker of a mapping or sequence whose entries are only counted.
+_COUNT = object()
+
+# Sections of the pipeline package needed to create a Pipeline. A None leaf means
+# that the whole subtree is needed.
+_HEADER_SECTIONS: Dict[str, Any] = {
+    "pipelineSpec": {"pipelineInfo": None, "root": {"inputDefinitions": None}},
+    "runtimeConfig": None,
+    "metadata": {"annotations": None},
+}
+
+# Sections needed to summarize a pipeline package, in addition to the header. The
+# tasks of the root DAG and the components (V2), or the templates and the tasks of
+# the entrypoint (V1), are counted without being constructed.
+_SUMMARY_SECTIONS: Dict[str, Any] = {
+    **_HEADER_SECTIONS,
+    "pipelineSpec": {
+        "pipelineInfo": None,
+        "root": {"inputDefinitions": None, "dag": {"tasks": _COUNT}},
+        "components": _COUNT,
+    },
+    "spec": {
+        "entrypoint": None,
+        "templates": _Each({"name": None, "dag": {"tasks": _COUNT}}),
+    },
+}
+
 
-@dataclass
 class Parameter:
     """Pipeline parameter.
 
@@ -21,26 +89,140 @@ class Parameter:
 
     """
 
-    name: str
-    type: Callable
-    default: Optional[ParameterValue] = None
+    __slots__ = ("name", "type", "default")
+
+    def __init__(
+        self, name: str, type: Callable, default: Optional[ParameterValue] = None
+    ):
+        self.name = name
+        self.type = type
+        self.default = default
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Parameter):
+            return NotImplemented
+        return (self.name, self.type, self.default) == (
+            other.name,
+            other.type,
+            other.default,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Parameter(name={self.name!r}, type={self.type!r}, "
+            f"default={self.default!r})"
+        )
 
 
-@dataclass
 class Pipeline:
     """Pipeline.
 
     A class that summarizes pipeline information.
 
+    Parameters can be looked up by name with :meth:`parameter`, and ``name in
+    pipeline`` checks whether the pipeline has a parameter of that name.
+
     Attributes:
         name: A name of the pipeline.
         parameters: A sequence of the pipeline parameters.
+        spec: The decoded pipeline package. If it is not held by the object, it is
+            read from :attr:`source` on access, and kept only if
+            :attr:`retain_spec` is True.
+        source: An absolute path of the pipeline package file, if any.
+        retain_spec: Whether the object keeps :attr:`spec` once it is read.
+        graph: The indexed DAG of the pipeline, built from :attr:`spec` on first
+            access, and kept only if :attr:`retain_spec` is True.
 
     """
 
-    name: str
-    parameters: Sequence[Parameter]
-    spec: Mapping[str, Any]
+    __slots__ = (
+        "name",
+        "source",
+        "retain_spec",
+        "_parameters",
+        "_index",
+        "_spec",
+        "_graph",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parameters: Sequence[Parameter],
+        spec: Optional[Mapping[str, Any]] = None,
+        source: Optional[str] = None,
+        retain_spec: bool = True,
+    ):
+        self.name = name
+        self.parameters = parameters
+        self.source = source
+        self.retain_spec = retain_spec
+        self._spec = spec
+        self._graph: Optional[PipelineGraph] = None
+
+    @property
+    def parameters(self) -> Sequence[Parameter]:
+        return self._parameters
+
+    @parameters.setter
+    def parameters(self, parameters: Sequence[Parameter]):
+        self._parameters = parameters
+        self._index = {parameter.name: parameter for parameter in parameters}
+
+    def parameter(self, name: str) -> Parameter:
+        """Get a pipeline parameter by name.
+
+        Args:
+            name (str): A name of the parameter.
+
+        Raises:
+            KeyError: If the pipeline has no parameter of the name.
+
+        Returns:
+            Parameter: The pipeline parameter.
+
+        """
+
+        return self._index[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    @property
+    def spec(self) -> Optional[Mapping[str, Any]]:
+        if self._spec is not None or self.source is None:
+            return self._spec
+
+        with open_pipeline_package(self.source) as f:
+            spec = _load_pipeline_spec(f)
+        if self.retain_spec:
+            self._spec = spec
+        return spec
+
+    @spec.setter
+    def spec(self, spec: Optional[Mapping[str, Any]]):
+        self._spec = spec
+
+    @property
+    def graph(self) -> PipelineGraph:
+        if self._graph is not None:
+            return self._graph
+
+        spec = self.spec
+        if spec is None:
+            raise ValueError(f"no pipeline spec: {self.name}")
+        graph = PipelineGraph.from_spec(spec)
+        if self.retain_spec:
+            self._graph = graph
+        return graph
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Pipeline):
+            return NotImplemented
+        return (self.name, self.parameters) == (other.name, other.parameters)
+
+    def __repr__(self) -> str:
+        return f"Pipeline(name={self.name!r}, parameters={self.parameters!r})"
 
 
 def _type_function_from_name(type_name: str) -> Callable:
@@ -84,7 +266,7 @@ def _create_pipeline(pipeline_spec: Mapping[str, Any]) -> Pipeline:
             parameter.default = _actual_parameter_value(key, value)
         parameters.append(parameter)
 
-    return Pipeline(name=pipeline_name, parameters=parameters, spec=pipeline_spec)
+    return Pipeline(name=pipeline_name, parameters=parameters)
 
 
 def _create_v1_pipeline(pipeline_spec: Mapping[str, Any]) -> Pipeline:
@@ -105,10 +287,258 @@ def _create_v1_pipeline(pipeline_spec: Mapping[str, Any]) -> Pipeline:
             parameter.default = _actual_parameter_value(item["type"], item["default"])
         parameters.append(parameter)
 
-    return Pipeline(name=pipeline_name, parameters=parameters, spec=pipeline_spec)
+    return Pipeline(name=pipeline_name, parameters=parameters)
+
+
+def _is_json(head: bytes) -> bool:
+    return head.lstrip()[:1] in {b"{", b"["}
+
+
+def _load_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_pipeline_spec(f: BinaryIO) -> Any:
+    # The V2 compiler emits JSON, which is decoded much faster by a JSON decoder than
+    # by a YAML loader. Anything else (or JSON-looking flow-style YAML) goes through
+    # the libyaml based loader when it is available.
+    if _is_json(f.peek(_SNIFF_SIZE)):
+        data = f.read()
+        try:
+            return _load_json(data)
+        except ValueError:
+            return yaml.load(data, Loader=_YamlLoader)
+    return yaml.load(f, Loader=_YamlLoader)
+
+
+def is_compressed_pipeline_package(filepath: Union[str, os.PathLike]) -> bool:
+    """Check whether the pipeline package file is a compressed archive.
+
+    Args:
+        filepath (Union[str, os.PathLike]): The path of the pipeline package file.
+
+    Returns:
+        bool: True if the file is gzipped, either as a tar archive or as a single
+        file, or is a zip archive.
+
+    """
+
+    with open(os.fspath(filepath), "rb") as f:
+        magic = f.read(len(_ZIP_MAGIC))
+    return magic.startswith(_GZIP_MAGIC) or magic == _ZIP_MAGIC
+
+
+def _is_gzipped_tar(f: BinaryIO) -> bool:
+    # A tar archive starts with a header block that has a valid checksum. The file
+    # is rewound for reading it again.
+    try:
+        with gzip.GzipFile(fileobj=f) as gz:
+            block = gz.read(tarfile.BLOCKSIZE)
+    finally:
+        f.seek(0)
+    try:
+        tarfile.TarInfo.frombuf(block, tarfile.ENCODING, "surrogateescape")
+    except tarfile.HeaderError:
+        return False
+    return True
+
 
+@contextlib.contextmanager
+def open_pipeline_package(filepath: Union[str, os.PathLike]) -> Iterator[BinaryIO]:
+    """Open the pipeline package file for reading in binary mode.
 
-def parse_pipeline_package(filepath: Union[str, os.PathLike]) -> Pipeline:
+    Compressed packages (``.tar.gz`` and ``.zip`` archives as written by the V1
+    compiler) are detected by their content, and the first file in the archive is
+    decompressed on the fly as it is read, without being extracted to disk. A
+    gzipped file that is not a tar archive, such as ``pipeline.json.gz``, is
+    decompressed as the package itself.
+
+    Args:
+        filepath (Union[str, os.PathLike]): The path of the pipeline package file.
+
+    Yields:
+        BinaryIO: A buffered binary stream of the pipeline package.
+
+    """
+
+    with open(os.fspath(filepath), "rb") as f:
+        magic = f.peek(len(_ZIP_MAGIC))[: len(_ZIP_MAGIC)]
+        if magic.startswith(_GZIP_MAGIC) and not _is_gzipped_tar(f):
+            with gzip.GzipFile(fileobj=f) as member:
+                yield member  # type: ignore
+        elif magic.startswith(_GZIP_MAGIC):
+            with tarfile.open(fileobj=f, mode="r|gz") as tar:
+                for member in tar:
+                    if member.isfile():
+                        yield tar.extractfile(member)  # type: ignore
+                        return
+            yield io.BufferedReader(io.BytesIO())  # type: ignore
+        elif magic == _ZIP_MAGIC:
+            with zipfile.ZipFile(f) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        with archive.open(info) as member:
+                            yield member  # type: ignore
+                        return
+            yield io.BufferedReader(io.BytesIO())  # type: ignore
+        else:
+            yield f  # type: ignore
+
+
+def _skip_node(loader: Any):
+    depth = 0
+    while True:
+        event = loader.get_event()
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _construct_node(loader: Any) -> Any:
+    events: List[yaml.Event] = [yaml.StreamStartEvent(), yaml.DocumentStartEvent()]
+    depth = 0
+    while True:
+        event = loader.get_event()
+        events.append(event)
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            depth -= 1
+        if depth == 0:
+            break
+    events += [yaml.DocumentEndEvent(), yaml.StreamEndEvent()]
+    return yaml.load(yaml.emit(events), Loader=_YamlLoader)
+
+
+def _count_node(loader: Any) -> Optional[int]:
+    if not loader.check_event(yaml.MappingStartEvent, yaml.SequenceStartEvent):
+        _skip_node(loader)
+        return None
+
+    is_mapping = loader.check_event(yaml.MappingStartEvent)
+    loader.get_event()
+    count = 0
+    while not loader.check_event(yaml.MappingEndEvent, yaml.SequenceEndEvent):
+        if is_mapping:
+            _skip_node(loader)  # key
+        _skip_node(loader)
+        count += 1
+    loader.get_event()
+
+    return count
+
+
+def _extract_each(loader: Any, sections: Mapping[str, Any]) -> Optional[List[Any]]:
+    if not loader.check_event(yaml.SequenceStartEvent):
+        _skip_node(loader)
+        return None
+
+    loader.get_event()
+    items = []
+    while not loader.check_event(yaml.SequenceEndEvent):
+        items.append(_extract_sections(loader, sections))
+    loader.get_event()
+
+    return items
+
+
+def _extract_sections(loader: Any, sections: Mapping[str, Any]) -> Any:
+    if not loader.check_event(yaml.MappingStartEvent):
+        _skip_node(loader)
+        return None
+
+    loader.get_event()
+    extracted = {}
+    while not loader.check_event(yaml.MappingEndEvent):
+        if not loader.check_event(yaml.ScalarEvent):  # complex keys are not needed
+            _skip_node(loader)
+            _skip_node(loader)
+            continue
+
+        key = loader.get_event().value
+        if key not in sections:
+            _skip_node(loader)
+        elif sections[key] is None:
+            extracted[key] = _construct_node(loader)
+        else:
+            if sections[key] is _COUNT:
+                value = _count_node(loader)
+            elif isinstance(sections[key], _Each):
+                value = _extract_each(loader, sections[key].sections)
+            else:
+                value = _extract_sections(loader, sections[key])
+            if value is not None:
+                extracted[key] = value
+    loader.get_event()
+
+    return extracted
+
+
+def _select_sections(value: Any, sections: Mapping[str, Any]) -> Any:
+    # The same selection as _extract_sections, from an already decoded package.
+    if not isinstance(value, dict):
+        return None
+
+    selected = {}
+    for key, section in sections.items():
+        if key not in value:
+            continue
+        if section is None:
+            selected[key] = value[key]
+            continue
+        if section is _COUNT:
+            item = value[key]
+            selected_value = len(item) if isinstance(item, (dict, list)) else None
+        elif isinstance(section, _Each):
+            item = value[key]
+            selected_value = (
+                [_select_sections(element, section.sections) for element in item]
+                if isinstance(item, list)
+                else None
+            )
+        else:
+            selected_value = _select_sections(value[key], section)
+        if selected_value is not None:
+            selected[key] = selected_value
+    return selected
+
+
+def _load_pipeline_header(
+    f: BinaryIO, sections: Mapping[str, Any] = _HEADER_SECTIONS
+) -> Any:
+    # Keep only the sections needed to create a Pipeline. A JSON decoder is much
+    # faster than any scan in Python, so JSON packages are decoded whole and the
+    # sections are selected from the result. Anything else walks the event stream
+    # of the first YAML document, so that components, executors and the DAG are
+    # never constructed.
+    if _is_json(f.peek(_SNIFF_SIZE)):
+        data = f.read()
+        try:
+            return _select_sections(_load_json(data), sections)
+        except ValueError:
+            f = io.BytesIO(data)  # type: ignore
+
+    loader = _YamlLoader(f)
+    try:
+        loader.get_event()  # StreamStartEvent
+        if not loader.check_event(yaml.DocumentStartEvent):
+            return None
+        loader.get_event()
+        return _extract_sections(loader, sections)
+    finally:
+        loader.dispose()
+
+
+def parse_pipeline_package(
+    filepath: Union[str, os.PathLike],
+    header_only: bool = False,
+    retain_spec: bool = True,
+) -> Pipeline:
     """Parse the pipeline package file.
 
     Load a :class:`Pipeline` object from a pre-compiled file that represents
@@ -117,6 +547,15 @@ def parse_pipeline_package(filepath: Union[str, os.PathLike]) -> Pipeline:
     Args:
         filepath (Union[str, os.PathLike]): The path of the pre-compiled file that
             represents the pipeline.
+        header_only (bool, optional): If True, only the sections of the file that
+            describe the pipeline name and parameters are kept. YAML packages are
+            scanned and the rest is skipped without being materialized, while JSON
+            packages are decoded whole, which is faster than scanning them.
+            :attr:`Pipeline.spec` is read from the file when it is first accessed.
+            Defaults to False.
+        retain_spec (bool, optional): If False, the returned pipeline never keeps
+            :attr:`Pipeline.spec`, which is read from the file on every access
+            instead. Defaults to True.
 
     Raises:
         ValueError: If the :attr:`filepath` file has an invalid schema.
@@ -127,9 +566,20 @@ def parse_pipeline_package(filepath: Union[str, os.PathLike]) -> Pipeline:
     """
 
     filepath_str = os.fspath(filepath)
-    with open(filepath_str, "r") as f:
-        pipeline_spec = yaml.safe_load(f)
+    with open_pipeline_package(filepath_str) as f:
+        if header_only:
+            pipeline_spec = _load_pipeline_header(f)
+        else:
+            pipeline_spec = _load_pipeline_spec(f)
+
+    pipeline = _create_pipeline_from_package(pipeline_spec, filepath_str)
+    pipeline.retain_spec = retain_spec
+    if retain_spec and not header_only:
+        pipeline.spec = pipeline_spec
+    return pipeline
+
 
+def _create_pipeline_from_package(pipeline_spec: Any, filepath_str: str) -> Pipeline:
     if (
         isinstance(pipeline_spec, dict)
         and "pipelineSpec" in pipeline_spec
@@ -149,4 +599,159 @@ def parse_pipeline_package(filepath: Union[str, os.PathLike]) -> Pipeline:
     else:
         raise ValueError(f"invalid schema: {filepath_str}")
 
+    pipeline.source = os.path.abspath(filepath_str)
     return pipeline
+
+
+@dataclass
+class PipelineSummary:
+    """Summary of a pipeline package.
+
+    Attributes:
+        name: A name of the pipeline.
+        parameters: A sequence of the pipeline parameters.
+        tasks: The number of tasks in the root DAG (V2) or in the entrypoint
+            template (V1).
+        components: The number of components (V2) or templates (V1).
+        size: The size of the pipeline package file in bytes.
+        source: An absolute path of the pipeline package file.
+
+    """
+
+    name: str
+    parameters: Sequence[Parameter]
+    tasks: int
+    components: int
+    size: int
+    source: str
+
+
+def summarize_pipeline_package(filepath: Union[str, os.PathLike]) -> PipelineSummary:
+    """Summarize the pipeline package file.
+
+    JSON packages are decoded whole, which is faster than scanning them, and the
+    tasks and components are counted with ``len()``. YAML packages are scanned
+    as with the ``header_only`` option of :func:`parse_pipeline_package`, and
+    the tasks and components are counted while they are skipped, without being
+    constructed.
+
+    The counts agree with :attr:`Pipeline.graph`, which decodes the whole file.
+
+    Args:
+        filepath (Union[str, os.PathLike]): The path of the pre-compiled file that
+            represents the pipeline.
+
+    Raises:
+        ValueError: If the :attr:`filepath` file has an invalid schema.
+
+    Returns:
+        PipelineSummary: The summary of the pipeline.
+
+    """
+
+    filepath_str = os.fspath(filepath)
+    with open_pipeline_package(filepath_str) as f:
+        sections = _load_pipeline_header(f, _SUMMARY_SECTIONS)
+    pipeline = _create_pipeline_from_package(sections, filepath_str)
+
+    if "pipelineSpec" in sections:
+        pipeline_spec = sections["pipelineSpec"]
+        tasks = pipeline_spec["root"].get("dag", {}).get("tasks", 0)
+        components = pipeline_spec.get("components", 0)
+    else:
+        spec = sections.get("spec", {})
+        templates = [
+            template
+            for template in spec.get("templates", [])
+            if isinstance(template, dict)
+        ]
+        entrypoint = next(
+            (
+                template
+                for template in templates
+                if template.get("name") == spec.get("entrypoint")
+            ),
+            {},
+        )
+        tasks = entrypoint.get("dag", {}).get("tasks", 0)
+        components = len(templates)
+
+    return PipelineSummary(
+        name=pipeline.name,
+        parameters=pipeline.parameters,
+        tasks=tasks,
+        components=components,
+        size=os.path.getsize(filepath_str),
+        source=os.path.abspath(filepath_str),
+    )
+
+
+def _expand_package_paths(
+    paths: Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]]
+) -> List[str]:
+    if not isinstance(paths, (str, os.PathLike)):
+        return [os.fspath(path) for path in paths]
+
+    pattern = os.fspath(paths)
+    if os.path.isdir(pattern):
+        return sorted(
+            os.path.join(dirpath, filename)
+            for dirpath, _, filenames in os.walk(pattern)
+            for filename in filenames
+            if os.path.splitext(filename)[1] in _PACKAGE_EXTENSIONS
+        )
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def parse_pipeline_packages(
+    paths: Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]],
+    workers: Optional[int] = None,
+    header_only: bool = False,
+    retain_spec: bool = False,
+) -> Iterator[Tuple[str, Union[Pipeline, Exception]]]:
+    """Parse pipeline package files in parallel.
+
+    The files are parsed across a pool of worker processes, and the results are
+    yielded as they complete. A file that fails to be parsed does not abort the
+    others, and the exception is yielded in place of the pipeline.
+
+    Args:
+        paths (Union[str, os.PathLike, Iterable[Union[str, os.PathLike]]]): Paths of
+            the pipeline package files. A single path is treated as a glob pattern
+            (``**`` is supported), or as a directory to search recursively for
+            ``.json``, ``.yaml``, ``.yml``, ``.gz``, ``.tgz`` and ``.zip`` files.
+        workers (Optional[int], optional): The number of worker processes. If None,
+            the number of processors on the machine is used. If 1, the files are
+            parsed in the current process. Defaults to None.
+        header_only (bool, optional): Passed to :func:`parse_pipeline_package`.
+            Defaults to False.
+        retain_spec (bool, optional): Passed to :func:`parse_pipeline_package`. The
+            default differs from :func:`parse_pipeline_package` to avoid sending
+            whole specs back from the worker processes. Defaults to False.
+
+    Yields:
+        Tuple[str, Union[Pipeline, Exception]]: The path of a pipeline package file
+        and either the parsed pipeline or the exception raised while parsing it.
+
+    """
+
+    filepaths = _expand_package_paths(paths)
+    parse = functools.partial(
+        parse_pipeline_package, header_only=header_only, retain_spec=retain_spec
+    )
+
+    if workers == 1:
+        for filepath in filepaths:
+            try:
+                yield filepath, parse(filepath)
+            except Exception as e:
+                yield filepath, e
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(parse, filepath): filepath for filepath in filepaths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
@@ -0,0 +1,384 @@
+import itertools
+import math
+import random
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .pipeline_parser import Parameter, ParameterValue
+
+
+class Uniform:
+    """Uniform distribution of a random sweep dimension.
+
+    Samples of an ``int`` parameter are drawn from the integers between the bounds.
+
+    Args:
+        low (float): The lower bound.
+        high (float): The upper bound.
+
+    Raises:
+        ValueError: If :attr:`low` is greater than :attr:`high`.
+
+    """
+
+    def __init__(self, low: float, high: float):
+        if low > high:
+            raise ValueError(f"low must not be greater than high: {low} > {high}")
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: random.Random, type: Any) -> ParameterValue:
+        """Draw a value.
+
+        Args:
+            rng (random.Random): The random number generator.
+            type (Any): The type function of the parameter.
+
+        Returns:
+            ParameterValue: The sampled value.
+
+        """
+
+        if type is int:
+            return rng.randint(math.ceil(self.low), math.floor(self.high))
+        return type(rng.uniform(self.low, self.high))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(low={self.low!r}, high={self.high!r})"
+
+
+class LogUniform(Uniform):
+    """Log-uniform distribution of a random sweep dimension.
+
+    Samples of an ``int`` parameter are rounded to the nearest integer.
+
+    Args:
+        low (float): The lower bound, which must be positive.
+        high (float): The upper bound.
+
+    Raises:
+        ValueError: If :attr:`low` is not positive or is greater than :attr:`high`.
+
+    """
+
+    def __init__(self, low: float, high: float):
+        if low <= 0:
+            raise ValueError(f"low must be positive: {low}")
+        super().__init__(low, high)
+
+    def sample(self, rng: random.Random, type: Any) -> ParameterValue:
+        """Draw a value.
+
+        Args:
+            rng (random.Random): The random number generator.
+            type (Any): The type function of the parameter.
+
+        Returns:
+            ParameterValue: The sampled value.
+
+        """
+
+        value = math.exp(rng.uniform(math.log(self.low), math.log(self.high)))
+        if type is int:
+            return min(max(round(value), math.ceil(self.low)), math.floor(self.high))
+        return type(value)
+
+
+Dimension = Union[Sequence[Any], Uniform]
+
+
+def coerce_value(parameter: Parameter, value: Any) -> ParameterValue:
+    """Convert a value to the type of the parameter.
+
+    Args:
+        parameter (Parameter): The pipeline parameter.
+        value (Any): The value, such as a string given on the command line.
+
+    Raises:
+        ValueError: If the value cannot be converted without loss.
+
+    Returns:
+        ParameterValue: The converted value.
+
+    """
+
+    if parameter.type is int and isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"invalid int value for {parameter.name!r}: {value!r}")
+    try:
+        return parameter.type(value)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"invalid {parameter.type.__name__} value for {parameter.name!r}: "
+            f"{value!r}"
+        ) from None
+
+
+def _parse_range(parameter: Parameter, item: str) -> List[ParameterValue]:
+    parts = item.split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"invalid range of {parameter.name!r}: {item!r}")
+    start = coerce_value(parameter, parts[0])
+    stop = coerce_value(parameter, parts[1])
+    step = parts[2] if len(parts) == 3 else "1"
+    if start > stop:  # type: ignore
+        raise ValueError(f"start must not be greater than stop: {item!r}")
+
+    # The number of values is computed up front, so that steps are not accumulated
+    # with rounding errors, and a tolerance keeps a stop reached by a float step.
+    if step.startswith("x"):
+        factor = coerce_value(Parameter(parameter.name, float), step[1:])
+        if factor <= 1 or start <= 0:  # type: ignore
+            raise ValueError(
+                f"a multiplicative range needs a factor greater than 1 and a "
+                f"positive start: {item!r}"
+            )
+        count = math.floor(math.log(stop / start) / math.log(factor) + 1e-9)  # type: ignore
+        values = [start * factor**i for i in range(count + 1)]  # type: ignore
+    else:
+        increment = coerce_value(parameter, step)
+        if increment <= 0:  # type: ignore
+            raise ValueError(f"the step must be positive: {item!r}")
+        count = math.floor((stop - start) / increment + 1e-9)  # type: ignore
+        values = [start + increment * i for i in range(count + 1)]  # type: ignore
+
+    if parameter.type is int:
+        return [int(round(value)) for value in values]
+    return [float(f"{value:.12g}") for value in values]
+
+
+def parse_axis(parameter: Parameter, spec: str) -> List[ParameterValue]:
+    """Parse the values of a sweep dimension, such as given on the command line.
+
+    The spec is a comma-separated list of values. For ``int`` and ``float``
+    parameters, an item may also be a range ``start:stop[:step]`` that includes
+    ``stop``, where each value adds the step (``1:9:2``), or multiplies by the step
+    prefixed with ``x`` (``32:256:x2``). The step defaults to 1.
+
+    Args:
+        parameter (Parameter): The pipeline parameter.
+        spec (str): The spec of the values, such as ``"0.1,0.01"``.
+
+    Raises:
+        ValueError: If the spec is invalid, or a value cannot be converted to the
+            type of the parameter.
+
+    Returns:
+        List[ParameterValue]: The values of the dimension.
+
+    """
+
+    values: List[ParameterValue] = []
+    for item in spec.split(","):
+        if parameter.type in (int, float) and ":" in item:
+            values.extend(_parse_range(parameter, item))
+        else:
+            values.append(coerce_value(parameter, item))
+    return values
+
+
+class _Schema:
+    # Parameters of the pipeline with checks of sweep dimensions, so that each
+    # dimension is validated once rather than for each generated point.
+
+    def __init__(self, parameters: Sequence[Parameter]):
+        self.parameters = {parameter.name: parameter for parameter in parameters}
+        self.required = {
+            parameter.name for parameter in parameters if parameter.default is None
+        }
+
+    def __getitem__(self, name: str) -> Parameter:
+        try:
+            return self.parameters[name]
+        except KeyError:
+            raise ValueError(f"unknown parameter: {name!r}") from None
+
+    def check_required(self, names: Iterable[str]):
+        missing = self.required.difference(names)
+        if missing:
+            raise ValueError(f"missing required parameters: {sorted(missing)}")
+
+    def coerce_values(self, name: str, values: Sequence[Any]) -> List[ParameterValue]:
+        if isinstance(values, (str, bytes)) or not values:
+            raise ValueError(f"values of {name!r} must be a non-empty sequence")
+        parameter = self[name]
+        return [coerce_value(parameter, value) for value in values]
+
+    def coerce_point(self, point: Mapping[str, Any]) -> Dict[str, ParameterValue]:
+        return {name: coerce_value(self[name], value) for name, value in point.items()}
+
+
+def grid_sweep(
+    parameters: Sequence[Parameter],
+    space: Mapping[str, Sequence[Any]],
+    fixed: Optional[Mapping[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate the arguments of a grid sweep.
+
+    Every combination of the values of the dimensions is generated lazily, with the
+    last dimension varying fastest, so the whole grid is never held in memory.
+
+    Args:
+        parameters (Sequence[Parameter]): Parameters of the pipeline, such as
+            :attr:`.Pipeline.parameters`.
+        space (Mapping[str, Sequence[Any]]): Values of each swept parameter.
+        fixed (Optional[Mapping[str, Any]], optional): Values of the parameters that
+            are the same for all points. Defaults to None.
+
+    Raises:
+        ValueError: If a parameter is unknown, a value cannot be converted to the
+            type of its parameter, or a required parameter has no value.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Arguments to the pipeline for each point.
+
+    """
+
+    schema = _Schema(parameters)
+    fixed_values = schema.coerce_point(fixed or {})
+    names = list(space)
+    values = [schema.coerce_values(name, space[name]) for name in names]
+    schema.check_required([*names, *fixed_values])
+    return _generate_grid(fixed_values, names, values)
+
+
+def _generate_grid(
+    fixed: Dict[str, Any], names: List[str], values: List[List[Any]]
+) -> Iterator[Dict[str, Any]]:
+    for combination in itertools.product(*values):
+        arguments = dict(fixed)
+        arguments.update(zip(names, combination))
+        yield arguments
+
+
+def random_sweep(
+    parameters: Sequence[Parameter],
+    space: Mapping[str, Dimension],
+    num_samples: Optional[int] = None,
+    fixed: Optional[Mapping[str, Any]] = None,
+    seed: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate the arguments of a random sweep.
+
+    Each dimension is either a sequence of values chosen with equal probability, or
+    a :class:`Uniform` or :class:`LogUniform` distribution. Points are sampled
+    lazily, so a search space of any size can be sampled incrementally.
+
+    Args:
+        parameters (Sequence[Parameter]): Parameters of the pipeline, such as
+            :attr:`.Pipeline.parameters`.
+        space (Mapping[str, Dimension]): The dimension of each swept parameter.
+        num_samples (Optional[int], optional): The number of points. If None,
+            points are generated indefinitely. Defaults to None.
+        fixed (Optional[Mapping[str, Any]], optional): Values of the parameters that
+            are the same for all points. Defaults to None.
+        seed (Optional[int], optional): The seed of the random number generator.
+            Defaults to None.
+
+    Raises:
+        ValueError: If a parameter is unknown, a value cannot be converted to the
+            type of its parameter, or a required parameter has no value.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Arguments to the pipeline for each point.
+
+    """
+
+    schema = _Schema(parameters)
+    fixed_values = schema.coerce_point(fixed or {})
+    dimensions: Dict[str, Dimension] = {}
+    for name, dimension in space.items():
+        if isinstance(dimension, Uniform):
+            parameter = schema[name]
+            if parameter.type not in (int, float):
+                raise ValueError(
+                    f"a distribution cannot be used for {name!r} of type "
+                    f"{parameter.type.__name__}"
+                )
+            if parameter.type is int and math.ceil(dimension.low) > math.floor(
+                dimension.high
+            ):
+                raise ValueError(f"no int values of {name!r} in {dimension!r}")
+            dimensions[name] = dimension
+        else:
+            dimensions[name] = schema.coerce_values(name, dimension)
+    schema.check_required([*dimensions, *fixed_values])
+    return _generate_random(
+        schema, fixed_values, dimensions, num_samples, random.Random(seed)
+    )
+
+
+def _generate_random(
+    schema: _Schema,
+    fixed: Dict[str, Any],
+    dimensions: Dict[str, Dimension],
+    num_samples: Optional[int],
+    rng: random.Random,
+) -> Iterator[Dict[str, Any]]:
+    # The type of a distribution dimension, or None for a sequence of values.
+    types = [
+        schema[name].type if isinstance(dimension, Uniform) else None
+        for name, dimension in dimensions.items()
+    ]
+    samplers = list(zip(dimensions, dimensions.values(), types))
+    counter = itertools.count() if num_samples is None else range(num_samples)
+    for _ in counter:
+        arguments = dict(fixed)
+        for name, dimension, type in samplers:
+            if type is None:
+                arguments[name] = rng.choice(dimension)  # type: ignore
+            else:
+                arguments[name] = dimension.sample(rng, type)  # type: ignore
+        yield arguments
+
+
+def list_sweep(
+    parameters: Sequence[Parameter],
+    points: Iterable[Mapping[str, Any]],
+    fixed: Optional[Mapping[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Generate the arguments of a sweep over explicit points.
+
+    Points are read lazily from :attr:`points`, which may be a generator. Since each
+    point may have different parameters, each point is validated when it is
+    generated.
+
+    Args:
+        parameters (Sequence[Parameter]): Parameters of the pipeline, such as
+            :attr:`.Pipeline.parameters`.
+        points (Iterable[Mapping[str, Any]]): Values of the swept parameters for
+            each point.
+        fixed (Optional[Mapping[str, Any]], optional): Values of the parameters that
+            are the same for all points. Values of a point take precedence.
+            Defaults to None.
+
+    Raises:
+        ValueError: If a parameter is unknown, a value cannot be converted to the
+            type of its parameter, or a required parameter has no value.
+
+    Returns:
+        Iterator[Dict[str, Any]]: Arguments to the pipeline for each point.
+
+    """
+
+    schema = _Schema(parameters)
+    fixed_values = schema.coerce_point(fixed or {})
+    return _generate_list(schema, fixed_values, points)
+
+
+def _generate_list(
+    schema: _Schema, fixed: Dict[str, Any], points: Iterable[Mapping[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    for point in points:
+        arguments = dict(fixed)
+        arguments.update(schema.coerce_point(point))
+        schema.check_required(arguments)
+        yield arguments
@@ -0,0 +1,300 @@
+import random
+import threading
+import time
+from typing import AbstractSet, Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+THROTTLING_STATUSES = frozenset({429, 503})
+"""frozenset: HTTP status codes of responses that ask the client to slow down."""
+
+REJECTED_STATUSES = frozenset({429})
+"""frozenset: HTTP status codes of throttling responses to requests that the service
+rejected without processing them."""
+
+
+def is_throttling_error(
+    error: BaseException, statuses: AbstractSet[int] = THROTTLING_STATUSES
+) -> bool:
+    """Check whether an error is a throttling response of an API service.
+
+    Errors of the KFP API client have the HTTP status code in ``status``, and errors
+    of the Google API client have it in ``code``.
+
+    Args:
+        error (BaseException): The error raised by an API call.
+        statuses (AbstractSet[int], optional): The status codes of throttling
+            responses. Defaults to :data:`THROTTLING_STATUSES`.
+
+    Returns:
+        bool: True if the status code is in :attr:`statuses`, by default 429 (Too
+        Many Requests) or 503 (Service Unavailable).
+
+    """
+
+    for attribute in ("status", "code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int) and status in statuses:
+            return True
+    return False
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+
+    Tokens are added at :attr:`rate` per second up to :attr:`burst`, and each
+    request takes one token, waiting until a token is available.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (int, optional): The maximum number of tokens. Defaults to 1.
+
+    Raises:
+        ValueError: If :attr:`rate` or :attr:`burst` is not positive.
+
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate and burst must be positive")
+        self._rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """float: Tokens added per second."""
+
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill()
+            self._rate = rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """Take a token, waiting until one is available.
+
+        Returns:
+            float: Seconds waited for the token.
+
+        """
+
+        # A token is reserved before waiting, so that concurrent callers queue up
+        # behind each other instead of waking up for the same token.
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class Throttle:
+    """Client-side rate limiting and retries of throttled API calls.
+
+    Calls are paced by a :class:`TokenBucket` whose rate adapts to the responses of
+    the API service: the rate is cut by :attr:`decrease_factor` on a throttling
+    response (429 or 503) and grows by :attr:`increase` requests per second on each
+    success (additive increase, multiplicative decrease), so bulk submissions settle
+    at the maximum sustainable throughput.
+
+    Throttled calls are retried with exponential backoff and full jitter. Retries
+    are limited per call by :attr:`max_attempts` and across all calls by a retry
+    budget of :attr:`min_retries` plus :attr:`retry_ratio` of the calls made, so
+    that an overloaded service is not flooded with retries. Other errors are raised
+    immediately.
+
+    Calls that create a resource, such as a run, are made with :meth:`create`,
+    which retries only the responses of :data:`REJECTED_STATUSES`. A 503 may be
+    returned after the service has created the resource, and retrying it would
+    create a duplicate.
+
+    A throttle can be shared between threads. Use a separate throttle for each
+    backend, since each service has its own limits.
+
+    Args:
+        rate (float, optional): The initial rate in requests per second.
+            Defaults to 10.0.
+        burst (int, optional): The maximum number of requests sent at once.
+            Defaults to 10.
+        min_rate (float, optional): The lower bound of the rate. Defaults to 0.1.
+        max_rate (Optional[float], optional): The upper bound of the rate. If None,
+            :attr:`rate` is used. Defaults to None.
+        increase (float, optional): Requests per second added to the rate on each
+            success. Defaults to 0.1.
+        decrease_factor (float, optional): The factor applied to the rate on a
+            throttling response. Defaults to 0.5.
+        decrease_interval (float, optional): The minimum seconds between decreases
+            of the rate, so that the throttling responses to a burst of concurrent
+            calls cut the rate only once. Defaults to 1.0.
+        max_attempts (int, optional): The maximum number of attempts of a call.
+            Defaults to 5.
+        base_delay (float, optional): Seconds of the first backoff before jitter.
+            Defaults to 1.0.
+        max_delay (float, optional): The upper bound of a backoff in seconds.
+            Defaults to 60.0.
+        retry_ratio (float, optional): Retries allowed per call made, across all
+            calls. Defaults to 0.2.
+        min_retries (int, optional): Retries allowed regardless of
+            :attr:`retry_ratio`. Defaults to 10.
+
+    Raises:
+        ValueError: If the bounds of the rate are invalid.
+
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 10,
+        min_rate: float = 0.1,
+        max_rate: Optional[float] = None,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+        decrease_interval: float = 1.0,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        retry_ratio: float = 0.2,
+        min_retries: int = 10,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = rate if max_rate is None else max_rate
+        if not 0 < self.min_rate <= rate <= self.max_rate:
+            raise ValueError("min_rate <= rate <= max_rate must hold")
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_ratio = retry_ratio
+        self.min_retries = min_retries
+
+        self.bucket = TokenBucket(rate, burst)
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self._decreased_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """float: The current rate in requests per second."""
+
+        return self.bucket.rate
+
+    def _on_success(self):
+        with self._lock:
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + self.increase)
+
+    def _on_throttled(self, attempt: int, retry: bool) -> bool:
+        # Slow down and decide whether to retry.
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            if (
+                self._decreased_at is None
+                or now - self._decreased_at >= self.decrease_interval
+            ):
+                self._decreased_at = now
+                self.bucket.rate = max(
+                    self.min_rate, self.bucket.rate * self.decrease_factor
+                )
+            if not retry or attempt >= self.max_attempts:
+                return False
+            if self.retries >= self.min_retries + self.retry_ratio * self.calls:
+                return False
+            self.retries += 1
+            return True
+
+    def backoff(self, attempt: int) -> float:
+        """Compute the delay before retrying a throttled call.
+
+        Args:
+            attempt (int): The number of attempts made so far, starting from 1.
+
+        Returns:
+            float: A random delay in seconds, up to :attr:`base_delay` doubled for
+            each attempt and capped by :attr:`max_delay`.
+
+        """
+
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call a function at the allowed rate, retrying throttled calls.
+
+        Args:
+            func (Callable[..., T]): The function that calls the API service.
+            *args: Positional arguments to the function.
+            **kwargs: Keyword arguments to the function.
+
+        Returns:
+            T: The return value of the function.
+
+        """
+
+        return self._call(THROTTLING_STATUSES, func, args, kwargs)
+
+    def create(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call a function that creates a resource at the allowed rate.
+
+        The same as :meth:`call`, except that only the responses of
+        :data:`REJECTED_STATUSES` are retried. Other throttling responses slow down
+        the rate and are raised, since the resource may have been created.
+
+        Args:
+            func (Callable[..., T]): The function that calls the API service.
+            *args: Positional arguments to the function.
+            **kwargs: Keyword arguments to the function.
+
+        Returns:
+            T: The return value of the function.
+
+        """
+
+        return self._call(REJECTED_STATUSES, func, args, kwargs)
+
+    def _call(
+        self,
+        retry_statuses: AbstractSet[int],
+        func: Callable[..., T],
+        args: Any,
+        kwargs: Any,
+    ) -> T:
+        with self._lock:
+            self.calls += 1
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self.bucket.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttling_error(e):
+                    raise
+                retry = is_throttling_error(e, retry_statuses)
+                if not self._on_throttled(attempt, retry):
+                    raise
+            else:
+                self._on_success()
+                return result
+            time.sleep(self.backoff(attempt))
@@ -0,0 +1,206 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+Exporter = Callable[["Span"], None]
+
+
+@dataclass
+class Span:
+    """Timed phase of an operation.
+
+    Attributes:
+        name: A name of the phase, such as ``"parse"`` or ``"upload"``.
+        start: The wall-clock time when the phase started, in seconds since the
+            epoch.
+        duration: Seconds that the phase took.
+        bytes: Bytes read or sent in the phase, or None if no data was transferred
+            or the size is unknown.
+        parent: A name of the enclosing phase, or None for a top-level phase.
+        error: The type name of the error raised in the phase, or None if the phase
+            succeeded.
+        attributes: Additional details of the phase.
+
+    """
+
+    name: str
+    start: float
+    duration: float = 0.0
+    bytes: Optional[int] = None
+    parent: Optional[str] = None
+    error: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a dict that can be encoded as JSON.
+
+        Returns:
+            Dict[str, Any]: The fields of the span.
+
+        """
+
+        return asdict(self)
+
+
+class Tracer:
+    """Recorder of the phases of submissions.
+
+    Each phase is timed with :meth:`span`, and finished spans are kept in
+    :attr:`spans` and passed to each exporter. Spans opened in the same thread
+    while another span is open record it as their parent.
+
+    A tracer can be shared between threads.
+
+    Args:
+        exporters (Sequence[Exporter], optional): Functions called with each
+            finished span, such as a :class:`JsonLinesExporter`. Defaults to ().
+
+    Attributes:
+        spans: Finished spans, in order of completion.
+
+    """
+
+    def __init__(self, exporters: Sequence[Exporter] = ()):
+        self.exporters = list(exporters)
+        self.spans: List[Span] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time a phase.
+
+        The yielded span can be updated in the block, e.g. to set
+        :attr:`Span.bytes`. The span is recorded even if the block raises.
+
+        Args:
+            name (str): A name of the phase.
+            **attributes: Additional details of the phase.
+
+        Yields:
+            Span: The span of the phase.
+
+        """
+
+        stack = self._local.__dict__.setdefault("stack", [])
+        span = Span(
+            name=name,
+            start=time.time(),
+            parent=stack[-1].name if stack else None,
+            attributes=attributes,
+        )
+        stack.append(span)
+        started_at = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - started_at
+            stack.pop()
+            self._finish(span)
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        for exporter in self.exporters:
+            exporter(span)
+
+    def summary(self) -> Dict[str, float]:
+        """Sum the durations of the finished spans by name.
+
+        Returns:
+            Dict[str, float]: Total seconds of each phase.
+
+        """
+
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration
+        return totals
+
+
+class JsonLinesExporter:
+    """Exporter that writes each span as a line of JSON.
+
+    Lines are appended to the file, so that the spans of several processes can be
+    collected in one file for offline analysis. Each line is flushed as it is
+    written.
+
+    Args:
+        file (Union[str, os.PathLike, IO[str]]): Path of the output file, or a text
+            file object. A file opened from a path is closed by :meth:`close`.
+
+    """
+
+    def __init__(self, file: Union[str, os.PathLike, IO[str]]):
+        if isinstance(file, (str, os.PathLike)):
+            self._file: IO[str] = open(file, "a", encoding="utf-8")
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """Close the file if it was opened from a path."""
+
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self) -> "JsonLinesExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+
+@contextlib.contextmanager
+def span(tracer: Optional[Tracer], name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a phase if a tracer is given.
+
+    Args:
+        tracer (Optional[Tracer]): The tracer that records the phase. If None, the
+            yielded span is discarded.
+        name (str): A name of the phase.
+        **attributes: Additional details of the phase.
+
+    Yields:
+        Span: The span of the phase.
+
+    """
+
+    if tracer is None:
+        yield Span(name=name, start=0.0, attributes=attributes)
+        return
+    with tracer.span(name, **attributes) as traced:
+        yield traced
+
+
+def file_size(path: Union[str, os.PathLike]) -> Optional[int]:
+    """Get the size of a file for :attr:`Span.bytes`.
+
+    Args:
+        path (Union[str, os.PathLike]): Path of the file.
+
+    Returns:
+        Optional[int]: The size in bytes, or None if the file cannot be accessed.
+
+    """
+
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+
+from kfp_toolbox import clients
+
+_PIPELINE = {
+    "pipelineSpec": {
+        "pipelineInfo": {"name": "echo-pipeline"},
+        "root": {"inputDefinitions": {"parameters": {}}},
+    },
+    "runtimeConfig": {},
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_client_registry():
+    # Clients created with mocked kfp.Client must not leak into other tests.
+    yield
+    clients.default_registry.close()
+
+
+@pytest.fixture(autouse=True)
+def cache_home(monkeypatch, tmp_path):
+    # The caches and the journal must not be written to the real cache directory,
+    # and a daemon running on the machine must not receive the submissions.
+    monkeypatch.setenv("XDG_CACHE_HOME", os.fspath(tmp_path / "cache"))
+
+
+@pytest.fixture
+def pipeline_spec():
+    # A minimal pipeline package without parameters, which tests may modify.
+    return json.loads(json.dumps(_PIPELINE))
+
+
+@pytest.fixture
+def pipeline_path(tmp_path, pipeline_spec):
+    path = tmp_path / "pipeline.json"
+    path.write_text(json.dumps(pipeline_spec))
+    return os.fspath(path)
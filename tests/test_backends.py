@@ -0,0 +1,407 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import google.auth
+import pytest
+from google.auth.credentials import AnonymousCredentials
+from kfp.v2 import compiler, dsl
+
+from kfp_toolbox.backends import (
+    FakeApiError,
+    FakeBackend,
+    FakeRun,
+    KfpBackend,
+    VertexBackend,
+    run_state,
+    vertex_state,
+)
+from kfp_toolbox.journal import SubmissionJournal
+from kfp_toolbox.pipeline_jobs import submit_pipeline_job, submit_pipeline_jobs
+from kfp_toolbox.throttling import Throttle
+from kfp_toolbox.tracing import Tracer
+
+
+class TestFakeBackend:
+    def test_submit(self, pipeline_path):
+        backend = FakeBackend()
+
+        run = submit_pipeline_job(
+            pipeline_path,
+            arguments={"param": 1},
+            run_name="test-run",
+            experiment_name="test-experiment",
+            backend=backend,
+        )
+
+        assert backend.runs == [run]
+        assert isinstance(run, FakeRun)
+        assert run.pipeline_name == "echo-pipeline"
+        assert run.run_name == "test-run"
+        assert run.experiment_name == "test-experiment"
+        assert run.arguments == {"param": 1}
+        assert backend.requests == 1
+
+    def test_submitter(self, pipeline_path):
+        backend = FakeBackend()
+
+        runs = submit_pipeline_jobs(
+            pipeline_path,
+            [{"param": i} for i in range(10)],
+            max_workers=4,
+            run_name="test-run",
+            backend=backend,
+        )
+
+        assert [run.run_name for run in runs] == [f"test-run-{i}" for i in range(10)]
+        assert [run.arguments for run in runs] == [{"param": i} for i in range(10)]
+        assert len({run.run_id for run in runs}) == 10
+        assert sorted(backend.runs, key=runs.index) == runs
+
+    def test_throttling(self, pipeline_path):
+        backend = FakeBackend(max_rate=0.001, burst=2)
+
+        results = submit_pipeline_jobs(
+            pipeline_path, [{}] * 3, max_workers=1, backend=backend
+        )
+
+        assert isinstance(results[2], FakeApiError)
+        assert results[2].status == 429
+        assert backend.throttled == 1
+        assert len(backend.runs) == 2
+
+    def test_throttle_retries(self, pipeline_path):
+        backend = FakeBackend(max_rate=200.0, burst=1)
+        throttle = Throttle(
+            rate=1000.0,
+            min_rate=100.0,
+            decrease_interval=0.0,
+            base_delay=0.005,
+            max_attempts=20,
+            min_retries=100,
+        )
+
+        results = submit_pipeline_jobs(
+            pipeline_path, [{}] * 20, backend=backend, throttle=throttle
+        )
+
+        assert all(isinstance(result, FakeRun) for result in results)
+        assert backend.throttled > 0
+        assert throttle.retries == backend.throttled
+        assert throttle.rate < 1000.0
+
+    def test_failures(self, pipeline_path):
+        backend = FakeBackend(failure_rate=0.5, seed=0)
+
+        results = submit_pipeline_jobs(pipeline_path, [{}] * 100, backend=backend)
+
+        errors = [result for result in results if isinstance(result, FakeApiError)]
+        assert 0 < len(errors) < 100
+        assert {error.status for error in errors} == {500}
+        assert backend.failed == len(errors)
+        assert len(backend.runs) == 100 - len(errors)
+
+    def test_run_state(self, pipeline_path):
+        backend = FakeBackend(run_duration=60.0)
+        run = backend.submit(pipeline_path)
+
+        assert run_state(run) == ("Running", False)
+        run.created_at -= 60.0
+        assert run_state(run) == ("Succeeded", True)
+        assert backend.requests == 3
+
+
+class TestRunState:
+    def test_kfp(self):
+        run = MagicMock(spec=["run_id", "_client"], run_id="run-id")
+        run._client.get_run.return_value.run.status = "Failed"
+
+        assert run_state(run) == ("Failed", True)
+        assert KfpBackend("http://localhost:8080").run_state(run) == ("Failed", True)
+
+    def test_vertex(self):
+        run = MagicMock(spec=["state"])
+        run.state.name = "PIPELINE_STATE_RUNNING"
+
+        assert run_state(run) == ("PIPELINE_STATE_RUNNING", False)
+        assert VertexBackend().run_state(run) == ("PIPELINE_STATE_RUNNING", False)
+
+    def test_vertex_state(self):
+        state = MagicMock()
+        state.name = "PIPELINE_STATE_SUCCEEDED"
+
+        assert vertex_state(state) == ("PIPELINE_STATE_SUCCEEDED", True)
+        assert vertex_state("PIPELINE_STATE_PENDING") == (
+            "PIPELINE_STATE_PENDING",
+            False,
+        )
+
+
+class TestKfpBackend:
+    @patch("kfp.Client")
+    def test_submit(self, mock_kfp):
+        backend = KfpBackend("http://localhost:8080", namespace="test-namespace")
+
+        backend.submit("/path/to/file", arguments={"param": 1})
+
+        mock_kfp.return_value.create_run_from_pipeline_package.assert_called_once_with(
+            pipeline_file="/path/to/file",
+            arguments={"param": 1},
+            run_name=None,
+            experiment_name=None,
+            namespace="test-namespace",
+            pipeline_root=None,
+            enable_caching=None,
+            service_account=None,
+        )
+
+    @pytest.mark.parametrize(
+        "environ, experiment_name, expected",
+        [
+            ({}, None, "Default"),
+            ({"KF_PIPELINES_DEFAULT_EXPERIMENT_NAME": "default"}, None, "default"),
+            ({"KF_PIPELINES_DEFAULT_EXPERIMENT_NAME": "default"}, "given", "given"),
+            (
+                {"KF_PIPELINES_OVERRIDE_EXPERIMENT_NAME": "override"},
+                "given",
+                "override",
+            ),
+        ],
+    )
+    @pytest.mark.parametrize("upload_pipeline", [False, True])
+    @patch("kfp.Client")
+    def test_experiment_name(
+        self,
+        mock_kfp,
+        monkeypatch,
+        pipeline_path,
+        upload_pipeline,
+        environ,
+        experiment_name,
+        expected,
+    ):
+        # The same experiment as kfp.Client.create_run_from_pipeline_package.
+        monkeypatch.delenv("KF_PIPELINES_DEFAULT_EXPERIMENT_NAME", raising=False)
+        monkeypatch.delenv("KF_PIPELINES_OVERRIDE_EXPERIMENT_NAME", raising=False)
+        for name, value in environ.items():
+            monkeypatch.setenv(name, value)
+        client = mock_kfp.return_value
+        client.get_pipeline_id.return_value = "pipeline-id"
+        client.list_pipeline_versions.return_value = MagicMock(
+            versions=None, next_page_token=""
+        )
+        client.upload_pipeline_version.return_value.id = "version-id"
+        backend = KfpBackend("http://localhost:8080", upload_pipeline=upload_pipeline)
+
+        backend.submitter(pipeline_path, experiment_name=experiment_name)
+
+        client.create_experiment.assert_called_once_with(name=expected, namespace=None)
+
+
+class TestVertexBackend:
+    @patch("google.cloud.aiplatform.PipelineJob.submit")
+    @patch.object(google.auth, "default")
+    def test_submitter(self, mock_default, mock_submit, tmp_path):
+        # Not mocked, so that the template job is cloned by the oldest version of
+        # google-cloud-aiplatform the package supports.
+        @dsl.component()
+        def echo(message: str) -> str:
+            return message
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(message: str = "default"):
+            echo(message=message)
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        mock_default.return_value = (AnonymousCredentials(), "test-project")
+        backend = VertexBackend(project="test-project", location="us-central1")
+
+        submitter = backend.submitter(
+            pipeline_path, run_name="test-run", pipeline_root="gs://bucket/root"
+        )
+        jobs = [submitter(i, {"message": f"message-{i}"}) for i in range(2)]
+
+        assert [job.job_id for job in jobs] == ["test-run-0", "test-run-1"]
+        for i, job in enumerate(jobs):
+            runtime_config = job._gca_resource.runtime_config
+            assert runtime_config.parameters["message"].string_value == f"message-{i}"
+            assert runtime_config.gcs_output_directory == "gs://bucket/root"
+        assert mock_submit.call_count == 2
+
+
+class TestTracing:
+    def test_fake(self, pipeline_path):
+        tracer = Tracer()
+
+        submit_pipeline_job(
+            pipeline_path, arguments={"param": 1}, backend=FakeBackend(), tracer=tracer
+        )
+
+        assert [(s.name, s.parent) for s in tracer.spans] == [
+            ("parse", "submit"),
+            ("run", "submit"),
+            ("submit", None),
+        ]
+        assert tracer.spans[1].bytes == len('{"param": 1}')
+        assert tracer.spans[2].attributes == {"backend": "FakeBackend"}
+
+    @patch("kfp.Client")
+    def test_kfp(self, mock_kfp, pipeline_path):
+        tracer = Tracer()
+
+        submit_pipeline_job(
+            pipeline_path, endpoint="http://localhost:8080", tracer=tracer
+        )
+
+        assert [s.name for s in tracer.spans] == ["import", "client", "run", "submit"]
+        assert tracer.spans[2].bytes == os.path.getsize(pipeline_path)
+
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_vertex(self, mock_aip, pipeline_path):
+        tracer = Tracer()
+
+        submit_pipeline_job(pipeline_path, tracer=tracer)
+
+        assert [s.name for s in tracer.spans] == ["import", "parse", "run", "submit"]
+        assert tracer.spans[1].bytes == os.path.getsize(pipeline_path)
+
+    def test_retries(self, pipeline_path):
+        backend = FakeBackend(max_rate=0.001)
+        backend.submit(pipeline_path)
+        tracer = Tracer()
+
+        with pytest.raises(FakeApiError):
+            submit_pipeline_job(
+                pipeline_path,
+                backend=backend,
+                throttle=Throttle(max_attempts=2, base_delay=0.001),
+                tracer=tracer,
+            )
+
+        # Only the request that creates the run is retried, within its span.
+        assert [(s.name, s.error) for s in tracer.spans] == [
+            ("parse", None),
+            ("run", "FakeApiError"),
+            ("submit", "FakeApiError"),
+        ]
+        assert backend.requests == 1 + 2
+
+
+class TestSubmissionJournal:
+    @pytest.fixture
+    def journal(self, tmp_path):
+        return SubmissionJournal(tmp_path / "journal.sqlite3")
+
+    def test_identical(self, pipeline_path, journal):
+        backend = FakeBackend()
+
+        runs = [
+            submit_pipeline_job(
+                pipeline_path,
+                arguments={"param": 1},
+                backend=backend,
+                submission_journal=journal,
+            )
+            for _ in range(2)
+        ]
+
+        assert runs[0] is runs[1]
+        assert backend.runs == [runs[0]]
+
+    def test_different(self, pipeline_path, journal):
+        backend = FakeBackend()
+
+        for arguments in [{"param": 1}, {"param": 2}]:
+            submit_pipeline_job(
+                pipeline_path,
+                arguments=arguments,
+                backend=backend,
+                submission_journal=journal,
+            )
+        submit_pipeline_job(
+            pipeline_path,
+            arguments={"param": 1},
+            pipeline_root="gs://bucket",
+            backend=backend,
+            submission_journal=journal,
+        )
+        submit_pipeline_job(
+            pipeline_path,
+            arguments={"param": 1},
+            backend=FakeBackend(),
+            submission_journal=journal,
+        )
+
+        assert len(backend.runs) == 3
+
+    def test_default_arguments(self, tmp_path, journal, pipeline_spec):
+        pipeline = pipeline_spec
+        pipeline["pipelineSpec"]["root"]["inputDefinitions"]["parameters"] = {
+            "param": {"type": "INT"}
+        }
+        pipeline["runtimeConfig"] = {"parameters": {"param": {"intValue": 1}}}
+        pipeline_path = tmp_path / "default.json"
+        pipeline_path.write_text(json.dumps(pipeline))
+        backend = FakeBackend()
+
+        for arguments in [{}, {"param": 1}]:
+            submit_pipeline_job(
+                pipeline_path,
+                arguments=arguments,
+                backend=backend,
+                submission_journal=journal,
+            )
+
+        assert len(backend.runs) == 1
+
+    def test_deleted_run(self, pipeline_path, journal):
+        backend = FakeBackend()
+        submit_pipeline_job(pipeline_path, backend=backend, submission_journal=journal)
+
+        backend.runs.clear()
+        run = submit_pipeline_job(
+            pipeline_path, backend=backend, submission_journal=journal
+        )
+
+        assert backend.runs == [run]
+        assert (
+            submit_pipeline_job(
+                pipeline_path, backend=backend, submission_journal=journal
+            )
+            is run
+        )
+
+    @patch("kfp.Client")
+    def test_kfp(self, mock_kfp, pipeline_path, journal):
+        client = mock_kfp.return_value
+        client.create_run_from_pipeline_package.return_value.run_id = "run-id"
+        client.get_run.return_value.run.id = "run-id"
+
+        for _ in range(2):
+            run = submit_pipeline_job(
+                pipeline_path,
+                endpoint="http://localhost:8080",
+                submission_journal=journal,
+            )
+
+        client.create_run_from_pipeline_package.assert_called_once()
+        client.get_run.assert_called_once_with("run-id")
+        assert run.run_id == "run-id"
+
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_vertex(self, mock_aip, pipeline_path, journal):
+        mock_aip.return_value.resource_name = "projects/p/pipelineJobs/job"
+
+        for _ in range(2):
+            run = submit_pipeline_job(
+                pipeline_path, project="p", submission_journal=journal
+            )
+
+        mock_aip.return_value.submit.assert_called_once()
+        mock_aip.get.assert_called_once_with(
+            resource_name="projects/p/pipelineJobs/job", project="p", location=None
+        )
+        assert run is mock_aip.get.return_value
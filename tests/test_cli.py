@@ -1,12 +1,17 @@
+import json
 import os
+import threading
 from pathlib import PosixPath
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+import pytest
 from kfp.v2 import compiler, dsl
 from typer.testing import CliRunner
 
 from kfp_toolbox import __version__
 from kfp_toolbox.cli import app
+from kfp_toolbox.daemon import SubmissionServer
+from kfp_toolbox.journal import SubmissionJournal
 
 runner = CliRunner()
 
@@ -81,6 +86,8 @@ class TestSubmit:
             project=None,
             location=None,
             network=None,
+            tracer=None,
+            submission_journal=None,
         )
 
     @patch("kfp_toolbox.pipeline_jobs.submit_pipeline_job")
@@ -122,6 +129,8 @@ class TestSubmit:
             project=None,
             location=None,
             network=None,
+            tracer=None,
+            submission_journal=None,
         )
 
     @patch("kfp_toolbox.pipeline_jobs.submit_pipeline_job")
@@ -163,6 +172,8 @@ class TestSubmit:
             project=None,
             location=None,
             network=None,
+            tracer=None,
+            submission_journal=None,
         )
 
     def test_no_pipelie_files(self):
@@ -195,8 +206,495 @@ class TestSubmit:
             in result.output
         )
 
+    @patch("kfp_toolbox.pipeline_jobs.submit_pipeline_job")
+    def test_dedup_window(self, mock_submit_pipeline_job, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline():
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+
+        result = runner.invoke(
+            app, ["submit", f"--pipeline-file={pipeline_path}", "--dedup-window=600"]
+        )
+
+        assert result.exit_code == 0
+        journal = mock_submit_pipeline_job.call_args[1]["submission_journal"]
+        assert isinstance(journal, SubmissionJournal)
+        assert journal.window == 600.0
+
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_trace_file(self, mock_aip, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline():
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        trace_path = tmp_path / "trace.jsonl"
+
+        result = runner.invoke(
+            app,
+            [
+                "submit",
+                f"--pipeline-file={pipeline_path}",
+                f"--trace-file={trace_path}",
+            ],
+        )
+
+        assert result.exit_code == 0
+        spans = [json.loads(line) for line in trace_path.read_text().splitlines()]
+        assert [(span["name"], span["parent"]) for span in spans] == [
+            ("parse", None),
+            ("import", "submit"),
+            ("parse", "submit"),
+            ("run", "submit"),
+            ("submit", None),
+        ]
+        assert spans[0]["bytes"] == os.path.getsize(pipeline_path)
+
+    @patch("kfp_toolbox.pipeline_jobs.submit_pipeline_job")
+    def test_daemon(self, mock_submit_pipeline_job, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(param: int = 1):
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        mock_submit_pipeline_job.return_value.run_id = "run-id"
+        socket_path = tmp_path / "daemon.sock"
+        server = SubmissionServer(socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            result = runner.invoke(
+                app,
+                [
+                    "submit",
+                    f"--pipeline-file={os.path.relpath(pipeline_path)}",
+                    "--daemon",
+                    f"--daemon-socket={socket_path}",
+                    "--",
+                    "--param=5",
+                ],
+            )
+            mock_submit_pipeline_job.side_effect = ValueError("invalid")
+            error_result = runner.invoke(
+                app,
+                [
+                    "submit",
+                    f"--pipeline-file={pipeline_path}",
+                    "--daemon",
+                    f"--daemon-socket={socket_path}",
+                ],
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        assert result.exit_code == 0
+        kwargs = mock_submit_pipeline_job.call_args_list[0][1]
+        assert kwargs["pipeline_file"] == pipeline_path
+        assert kwargs["arguments"] == {"param": 5}
+        assert error_result.exit_code == 1
+        assert "Error: ValueError: invalid" in error_result.output
+
+    @patch("kfp_toolbox.pipeline_jobs.submit_pipeline_job")
+    def test_no_daemon(self, mock_submit_pipeline_job, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline():
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+
+        # Forwarding is opt-in, since the daemon submits with its own environment.
+        with patch("kfp_toolbox.daemon.request") as mock_request:
+            results = [
+                runner.invoke(app, ["submit", f"--pipeline-file={pipeline_path}"]),
+                runner.invoke(
+                    app, ["submit", f"--pipeline-file={pipeline_path}", "--no-daemon"]
+                ),
+            ]
+
+        assert [result.exit_code for result in results] == [0, 0]
+        mock_request.assert_not_called()
+        assert mock_submit_pipeline_job.call_count == 2
+
+    @patch("kfp.Client")
+    def test_arguments_file(self, mock_kfp, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(required_param: int, param: str = "default"):
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        client = mock_kfp.return_value
+
+        def create_run(body):
+            arguments = {p.name: p.value for p in body.pipeline_spec.parameters}
+            return MagicMock(run=MagicMock(id=f"run-{arguments['required_param']}"))
+
+        client._run_api.create_run.side_effect = create_run
+        lines = [
+            '{"required_param": 1}',
+            "",
+            '{"required_param": 2, "param": "value"}',
+            '{"required_param": "invalid"}',
+            '{"param": "value"}',
+            "[1]",
+            "{",
+        ]
+
+        result = runner.invoke(
+            app,
+            [
+                "submit",
+                f"--pipeline-file={pipeline_path}",
+                "--endpoint=http://localhost:8080",
+                "--arguments-file=-",
+                "--max-workers=2",
+                "--",
+                "--param=fixed",
+            ],
+            input="\n".join(lines) + "\n",
+        )
+
+        assert result.exit_code == 1
+        outputs = sorted(
+            (json.loads(line) for line in result.output.splitlines()),
+            key=lambda output: output["line"],
+        )
+        assert outputs[:2] == [
+            {"line": 1, "run_id": "run-1"},
+            {"line": 3, "run_id": "run-2"},
+        ]
+        assert [output["line"] for output in outputs[2:]] == [4, 5, 6, 7]
+        assert all(output["error"]["type"] for output in outputs[2:])
+        arguments = [
+            {
+                parameter.name: parameter.value
+                for parameter in call[1]["body"].pipeline_spec.parameters
+            }
+            for call in client._run_api.create_run.call_args_list
+        ]
+        assert sorted(arguments, key=lambda a: a["required_param"]) == [
+            {"param": "fixed", "required_param": "1"},
+            {"param": "value", "required_param": "2"},
+        ]
+
+    @patch("kfp.Client")
+    def test_arguments_file_path(self, mock_kfp, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(param: int = 1):
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        mock_kfp.return_value._run_api.create_run.return_value = MagicMock(
+            run=MagicMock(id="run-id")
+        )
+        arguments_path = tmp_path / "runs.jsonl"
+        arguments_path.write_text("".join(f'{{"param": {i}}}\n' for i in range(20)))
+
+        result = runner.invoke(
+            app,
+            [
+                "submit",
+                f"--pipeline-file={pipeline_path}",
+                "--endpoint=http://localhost:8080",
+                f"--arguments-file={arguments_path}",
+            ],
+        )
+
+        assert result.exit_code == 0
+        outputs = [json.loads(line) for line in result.output.splitlines()]
+        assert outputs == [{"line": i, "run_id": "run-id"} for i in range(1, 21)]
+
+    def test_arguments_file_with_trace_file(self, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline():
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+
+        result = runner.invoke(
+            app,
+            [
+                "submit",
+                f"--pipeline-file={pipeline_path}",
+                "--arguments-file=-",
+                f"--trace-file={tmp_path / 'trace.jsonl'}",
+            ],
+            input="{}\n",
+        )
+
+        assert result.exit_code != 0
+        assert "cannot be used with" in result.output
+
     def test_help(self):
         result = runner.invoke(app, ["submit", "--help"])
 
         assert result.exit_code == 0
         assert result.output.startswith("Usage: ")
+
+
+class TestServe:
+    @patch("kfp_toolbox.daemon.serve")
+    def test(self, mock_serve, tmp_path):
+        result = runner.invoke(app, ["serve", f"--socket={tmp_path / 'daemon.sock'}"])
+
+        assert result.exit_code == 0
+        mock_serve.assert_called_once_with(tmp_path / "daemon.sock")
+
+
+class TestSweep:
+    @pytest.fixture
+    def pipeline_path(self, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(lr: float, batch_size: int = 32, name: str = "default"):
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        return pipeline_path
+
+    @patch("kfp.Client")
+    def test(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client._run_api.create_run.side_effect = lambda body: MagicMock(
+            run=MagicMock(id=body.name)
+        )
+
+        result = runner.invoke(
+            app,
+            [
+                "sweep",
+                f"--pipeline-file={pipeline_path}",
+                "--endpoint=http://localhost:8080",
+                "--run-name=sweep",
+                "--max-workers=2",
+                "--",
+                "--lr=0.1,0.01",
+                "--batch-size=32:128:x2",
+            ],
+        )
+
+        assert result.exit_code == 0
+        *lines, summary = result.output.splitlines()
+        outputs = [json.loads(line) for line in lines]
+        assert [output["index"] for output in outputs] == list(range(6))
+        assert [output["run_id"] for output in outputs] == [
+            f"sweep-{i}" for i in range(6)
+        ]
+        # The dimensions are in the order of the parameters in the package.
+        assert [output["arguments"] for output in outputs] == [
+            {"lr": lr, "batch_size": batch_size}
+            for batch_size in [32, 64, 128]
+            for lr in [0.1, 0.01]
+        ]
+        assert summary.startswith("Submitted 6 of 6 runs in ")
+        assert summary.endswith(", 0 failed.")
+        mock_kfp.assert_called_once()
+
+    @patch("kfp.Client")
+    def test_failures(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client._run_api.create_run.side_effect = RuntimeError("failed")
+
+        result = runner.invoke(
+            app,
+            [
+                "sweep",
+                f"--pipeline-file={pipeline_path}",
+                "--endpoint=http://localhost:8080",
+                "--",
+                "--lr=0.1,0.01",
+            ],
+        )
+
+        assert result.exit_code == 1
+        *lines, summary = result.output.splitlines()
+        errors = [json.loads(line)["error"] for line in lines]
+        assert errors == [{"type": "RuntimeError", "message": "failed"}] * 2
+        assert summary.endswith(", 2 failed.")
+
+    def test_dry_run(self, pipeline_path):
+        result = runner.invoke(
+            app,
+            [
+                "sweep",
+                f"--pipeline-file={pipeline_path}",
+                "--dry-run",
+                "--",
+                "--lr=1e-3:1e-1:x10",
+                "--name=a,b",
+            ],
+        )
+
+        assert result.exit_code == 0
+        outputs = [json.loads(line) for line in result.output.splitlines()]
+        assert outputs == [
+            {"index": i, "arguments": {"lr": lr, "name": name}}
+            for i, (lr, name) in enumerate(
+                (lr, name) for lr in [0.001, 0.01, 0.1] for name in ["a", "b"]
+            )
+        ]
+
+    @pytest.mark.parametrize(
+        "parameters",
+        [
+            ["--lr", "-1,0.5", "--batch-size", "-2:0"],
+            ["--lr=-1,0.5", "--batch-size=-2:0"],
+        ],
+    )
+    def test_negative_values(self, pipeline_path, parameters):
+        result = runner.invoke(
+            app,
+            [
+                "sweep",
+                f"--pipeline-file={pipeline_path}",
+                "--dry-run",
+                "--",
+                *parameters,
+            ],
+        )
+
+        assert result.exit_code == 0
+        outputs = [json.loads(line) for line in result.output.splitlines()]
+        assert [output["arguments"] for output in outputs] == [
+            {"lr": lr, "batch_size": batch_size}
+            for batch_size in [-2, -1, 0]
+            for lr in [-1.0, 0.5]
+        ]
+
+    @pytest.mark.parametrize(
+        "parameters",
+        [["--batch-size=1,2"], ["--lr=0.1", "--batch-size=1.5"], ["--lr=1:0"]],
+    )
+    def test_invalid_values(self, pipeline_path, parameters):
+        result = runner.invoke(
+            app, ["sweep", f"--pipeline-file={pipeline_path}", "--", *parameters]
+        )
+
+        assert result.exit_code != 0
+        assert "Error: " in result.output
+
+    def test_help(self, pipeline_path):
+        result = runner.invoke(app, ["sweep", f"--pipeline-file={pipeline_path}", "-h"])
+
+        assert result.exit_code == 0
+        assert "--batch-size VALUES" in result.output
+        assert "int values, [default: 32]" in result.output
+
+
+class TestInspect:
+    @pytest.fixture
+    def pipeline_path(self, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(lr: float, batch_size: int = 32):
+            echo()
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        return pipeline_path
+
+    def test(self, pipeline_path):
+        result = runner.invoke(app, ["inspect", pipeline_path])
+
+        assert result.exit_code == 0
+        assert result.output.splitlines() == [
+            "Name:        echo-pipeline",
+            f"File:        {pipeline_path}",
+            f"Size:        {os.path.getsize(pipeline_path)} bytes",
+            "Tasks:       2",
+            "Components:  2",
+            "Parameters:",
+            "  NAME        TYPE   DEFAULT",
+            "  batch_size  int    32",
+            "  lr          float  [required]",
+        ]
+
+    def test_json(self, pipeline_path, tmp_path):
+        invalid_path = os.fspath(tmp_path / "invalid.json")
+        with open(invalid_path, "w") as f:
+            f.write("{}")
+
+        result = runner.invoke(
+            app,
+            ["inspect", pipeline_path, invalid_path, pipeline_path, "--format=json"],
+        )
+
+        assert result.exit_code == 1
+        lines = [line for line in result.output.splitlines() if line.startswith("{")]
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == {
+            "file": pipeline_path,
+            "name": "echo-pipeline",
+            "parameters": [
+                {"name": "batch_size", "type": "int", "default": 32},
+                {"name": "lr", "type": "float", "default": None},
+            ],
+            "tasks": 2,
+            "components": 2,
+            "size": os.path.getsize(pipeline_path),
+        }
+        assert f"Error: {invalid_path}: invalid schema" in result.output
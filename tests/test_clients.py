@@ -0,0 +1,105 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from kfp_toolbox.clients import ClientRegistry
+
+
+class TestClientRegistry:
+    @patch("kfp.Client")
+    def test_get(self, mock_kfp):
+        mock_kfp.side_effect = lambda **kwargs: MagicMock()
+        registry = ClientRegistry()
+
+        first = registry.get("http://localhost:8080")
+        second = registry.get("http://localhost:8080")
+        another = registry.get("http://localhost:8080", api_namespace="another")
+
+        assert first is second
+        assert first is not another
+        assert len(registry) == 2
+        mock_kfp.assert_any_call(
+            host="http://localhost:8080",
+            client_id=None,
+            namespace="kubeflow",
+            other_client_id=None,
+            other_client_secret=None,
+        )
+
+    @patch("kfp.Client")
+    def test_threads(self, mock_kfp):
+        def create_client(**kwargs):
+            time.sleep(0.05)
+            return MagicMock()
+
+        mock_kfp.side_effect = create_client
+        registry = ClientRegistry()
+        results = []
+
+        def get():
+            results.append(registry.get("http://localhost:8080"))
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_kfp.assert_called_once()
+        assert len(results) == 8
+        assert all(result is results[0] for result in results)
+
+    @patch("kfp.Client")
+    def test_max_age(self, mock_kfp):
+        mock_kfp.side_effect = lambda **kwargs: MagicMock()
+        registry = ClientRegistry(max_age=0.05)
+        client = registry.get("http://localhost:8080")
+
+        assert registry.get("http://localhost:8080") is client
+        time.sleep(0.1)
+        renewed = registry.get("http://localhost:8080")
+
+        assert renewed is not client
+        assert registry.get("http://localhost:8080") is renewed
+        assert len(registry) == 1
+        assert mock_kfp.call_count == 2
+        # The expired client may still be used by other threads.
+        client._run_api.api_client.close.assert_not_called()
+
+    @patch("kfp.Client")
+    def test_no_max_age(self, mock_kfp):
+        mock_kfp.side_effect = lambda **kwargs: MagicMock()
+        registry = ClientRegistry(max_age=None)
+        client = registry.get("http://localhost:8080")
+
+        time.sleep(0.01)
+
+        assert registry.get("http://localhost:8080") is client
+        mock_kfp.assert_called_once()
+
+    @patch("kfp.Client")
+    def test_evict(self, mock_kfp):
+        mock_kfp.side_effect = lambda **kwargs: MagicMock()
+        registry = ClientRegistry()
+        client = registry.get("http://localhost:8080", iap_client_id="client-id")
+
+        assert not registry.evict("http://localhost:8080")
+        assert registry.evict("http://localhost:8080", iap_client_id="client-id")
+        assert len(registry) == 0
+        client._run_api.api_client.close.assert_called_once()
+        client._run_api.api_client.rest_client.pool_manager.clear.assert_called_once()
+        assert registry.get("http://localhost:8080", iap_client_id="client-id") is not (
+            client
+        )
+
+    @patch("kfp.Client")
+    def test_close(self, mock_kfp):
+        mock_kfp.side_effect = lambda **kwargs: MagicMock()
+        registry = ClientRegistry()
+        clients = [registry.get(f"http://localhost:{port}") for port in (8080, 8081)]
+
+        registry.close()
+
+        assert len(registry) == 0
+        for client in clients:
+            client._run_api.api_client.close.assert_called_once()
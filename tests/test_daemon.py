@@ -0,0 +1,117 @@
+import json
+import os
+import stat
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from kfp_toolbox import daemon
+from kfp_toolbox.daemon import (
+    DaemonError,
+    DaemonUnavailableError,
+    SubmissionServer,
+    default_socket_path,
+    request,
+)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "daemon.sock"
+
+
+@pytest.fixture
+def server(socket_path):
+    server = SubmissionServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_default_socket_path(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert default_socket_path() == tmp_path / "kfp-toolbox" / "daemon.sock"
+
+
+class TestSubmissionServer:
+    def test_ping(self, server, socket_path):
+        assert request("ping", socket_path) == {"pid": os.getpid()}
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+    @patch("kfp.Client")
+    def test_submit(self, mock_kfp, server, socket_path, pipeline_path):
+        client = mock_kfp.return_value
+        client.create_run_from_pipeline_package.return_value.run_id = "run-id"
+
+        for _ in range(2):
+            response = request(
+                "submit",
+                socket_path,
+                pipeline_file=pipeline_path,
+                endpoint="http://localhost:8080",
+                arguments={"param": 1},
+            )
+
+        assert response == {"run_id": "run-id"}
+        mock_kfp.assert_called_once()
+        assert client.create_run_from_pipeline_package.call_count == 2
+        assert client.create_run_from_pipeline_package.call_args[1]["arguments"] == {
+            "param": 1
+        }
+
+    @patch("kfp.Client")
+    def test_trace_file(self, mock_kfp, server, socket_path, pipeline_path, tmp_path):
+        trace_path = tmp_path / "trace.jsonl"
+
+        request(
+            "submit",
+            socket_path,
+            pipeline_file=pipeline_path,
+            endpoint="http://localhost:8080",
+            trace_file=os.fspath(trace_path),
+        )
+
+        spans = [json.loads(line) for line in trace_path.read_text().splitlines()]
+        assert spans[-1]["name"] == "submit"
+
+    def test_error(self, server, socket_path):
+        with pytest.raises(DaemonError) as e:
+            request("submit", socket_path, unknown_option=1)
+        assert e.value.type == "TypeError"
+
+        with pytest.raises(DaemonError) as e:
+            request("unknown", socket_path)
+        assert e.value.type == "ValueError"
+
+    def test_unavailable(self, socket_path):
+        with pytest.raises(DaemonUnavailableError):
+            request("ping", socket_path)
+
+    def test_stale_socket(self, server, socket_path):
+        with pytest.raises(OSError):
+            SubmissionServer(socket_path)
+
+        server.shutdown()
+        server.socket.close()  # The socket file is left as if the daemon crashed.
+        assert socket_path.exists()
+
+        with SubmissionServer(socket_path):
+            pass
+        assert not socket_path.exists()
+
+
+@patch("kfp_toolbox.daemon.SubmissionServer")
+@patch("kfp_toolbox.daemon.warm_up")
+def test_serve(mock_warm_up, mock_server, socket_path):
+    server = mock_server.return_value.__enter__.return_value
+    server.serve_forever.side_effect = KeyboardInterrupt
+
+    daemon.serve(socket_path)
+
+    mock_warm_up.assert_called_once()
+    mock_server.assert_called_once_with(socket_path)
@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+import pytest
+
+import kfp_toolbox
+
+# Generous enough for slow machines, but far below the time to import the kfp SDK.
+IMPORT_TIME_BUDGET = 0.5
+
+
+def import_time(module):
+    # Cumulative microseconds of the module reported by "python -X importtime",
+    # measured in a new interpreter so that no module has been imported yet.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+    raise AssertionError(f"{module} not found in the output of -X importtime")
+
+
+def imported_modules(module):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print('\\n'.join(sys.modules))",
+        ],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    return set(result.stdout.splitlines())
+
+
+class TestImports:
+    @pytest.mark.parametrize("module", ["kfp_toolbox", "kfp_toolbox.cli"])
+    def test_no_sdks(self, module):
+        modules = imported_modules(module)
+
+        assert "kfp" not in modules
+        assert "google.cloud.aiplatform" not in modules
+
+    @pytest.mark.parametrize("module", ["kfp_toolbox", "kfp_toolbox.cli"])
+    def test_import_time(self, module):
+        assert import_time(module) < IMPORT_TIME_BUDGET
+
+    def test_lazy_attributes(self):
+        from kfp_toolbox import decorators
+
+        assert kfp_toolbox.caching is decorators.caching
+        assert kfp_toolbox.spec is decorators.spec
+        assert "container_spec" in dir(kfp_toolbox)
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            kfp_toolbox.unknown
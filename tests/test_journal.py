@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+
+from kfp_toolbox.journal import _RETENTION, SubmissionJournal, submission_fingerprint
+
+
+class TestSubmissionFingerprint:
+    def test_order(self):
+        fingerprint = submission_fingerprint(
+            "digest", "scope", arguments={"a": 1, "b": 2}, labels={"x": "1", "y": "2"}
+        )
+
+        assert fingerprint == submission_fingerprint(
+            "digest", "scope", arguments={"b": 2, "a": 1}, labels={"y": "2", "x": "1"}
+        )
+
+    def test_differences(self):
+        fingerprints = {
+            submission_fingerprint("digest", "scope"),
+            submission_fingerprint("another-digest", "scope"),
+            submission_fingerprint("digest", "another-scope"),
+            submission_fingerprint("digest", "scope", arguments={"a": 1}),
+            submission_fingerprint("digest", "scope", pipeline_root="gs://bucket"),
+            submission_fingerprint("digest", "scope", labels={"x": "1"}),
+        }
+
+        assert len(fingerprints) == 6
+
+
+class TestSubmissionJournal:
+    @pytest.fixture
+    def mock_time(self):
+        with patch("kfp_toolbox.journal.time.time") as mock_time:
+            mock_time.return_value = 1000.0
+            yield mock_time
+
+    def test_find(self, tmp_path, mock_time):
+        journal = SubmissionJournal(tmp_path / "journal.sqlite3", window=60.0)
+
+        assert journal.find("fingerprint") is None
+
+        journal.record("fingerprint", "run-0")
+        mock_time.return_value = 1010.0
+        journal.record("fingerprint", "run-1")
+
+        assert journal.find("fingerprint") == "run-1"
+        assert journal.find("another-fingerprint") is None
+        # Another journal on the same file, e.g. in another process.
+        assert SubmissionJournal(journal.path).find("fingerprint") == "run-1"
+
+    def test_window(self, tmp_path, mock_time):
+        journal = SubmissionJournal(tmp_path / "journal.sqlite3", window=60.0)
+        journal.record("fingerprint", "run-0")
+
+        mock_time.return_value = 1060.0
+        assert journal.find("fingerprint") == "run-0"
+
+        mock_time.return_value = 1061.0
+        assert journal.find("fingerprint") is None
+
+    def test_prune(self, tmp_path, mock_time):
+        journal = SubmissionJournal(tmp_path / "journal.sqlite3", window=60.0)
+        journal.record("fingerprint", "run-0")
+
+        # A short window does not remove the entries of a journal with a longer one.
+        mock_time.return_value = 1100.0
+        journal.record("another-fingerprint", "run-1")
+
+        assert SubmissionJournal(journal.path, window=1000.0).find("fingerprint") == (
+            "run-0"
+        )
+
+        mock_time.return_value = 1001.0 + _RETENTION
+        journal.record("another-fingerprint", "run-2")
+
+        assert (
+            SubmissionJournal(journal.path, window=2 * _RETENTION).find("fingerprint")
+            is None
+        )
+
+    def test_default_path(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        journal = SubmissionJournal()
+
+        assert journal.path == tmp_path / "kfp-toolbox" / "submissions.sqlite3"
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            SubmissionJournal(window=-1.0)
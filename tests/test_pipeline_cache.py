@@ -0,0 +1,277 @@
+import json
+import os
+import threading
+from unittest.mock import patch
+
+from kfp_toolbox.pipeline_cache import (
+    CacheStats,
+    MemoryCache,
+    PackageCache,
+    UploadCache,
+    default_cache_dir,
+    package_digest,
+)
+from kfp_toolbox.pipeline_parser import Parameter, parse_pipeline_package
+
+PIPELINE = {
+    "pipelineSpec": {
+        "pipelineInfo": {"name": "echo-pipeline"},
+        "root": {
+            "inputDefinitions": {
+                "parameters": {
+                    "int_param": {"type": "INT"},
+                    "str_param": {"type": "STRING"},
+                }
+            }
+        },
+    },
+    "runtimeConfig": {"parameters": {"int_param": {"intValue": 1}}},
+}
+
+
+def write_pipeline(path, name="echo-pipeline"):
+    pipeline = json.loads(json.dumps(PIPELINE))
+    pipeline["pipelineSpec"]["pipelineInfo"]["name"] = name
+    with open(path, "w") as f:
+        json.dump(pipeline, f)
+    return os.fspath(path)
+
+
+class TestDefaultCacheDir:
+    def test_xdg_cache_home(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", os.fspath(tmp_path))
+        assert default_cache_dir() == tmp_path / "kfp-toolbox"
+
+    def test_home(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+        monkeypatch.setenv("HOME", os.fspath(tmp_path))
+        assert default_cache_dir() == tmp_path / ".cache" / "kfp-toolbox"
+
+
+class TestPackageCache:
+    def test_load(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = PackageCache(directory=tmp_path / "cache")
+
+        with patch(
+            "kfp_toolbox.pipeline_parser.parse_pipeline_package",
+            wraps=parse_pipeline_package,
+        ) as mock_parse:
+            first = cache.load(pipeline_path)
+            second = cache.load(pipeline_path)
+
+        mock_parse.assert_called_once_with(pipeline_path, header_only=True)
+        assert first.name == second.name == "echo-pipeline"
+        assert first.parameters == second.parameters
+        assert second.parameters == [
+            Parameter(name="int_param", type=int, default=1),
+            Parameter(name="str_param", type=str),
+        ]
+        assert second.spec == PIPELINE
+        assert (tmp_path / "cache" / f"{package_digest(pipeline_path)}.json").exists()
+
+    def test_changed_package(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = PackageCache(directory=tmp_path / "cache")
+
+        assert cache.load(pipeline_path).name == "echo-pipeline"
+        write_pipeline(pipeline_path, name="another-pipeline")
+        assert cache.load(pipeline_path).name == "another-pipeline"
+
+    def test_corrupt_entry(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = PackageCache(directory=tmp_path / "cache")
+        cache.load(pipeline_path)
+
+        entry_path = tmp_path / "cache" / f"{package_digest(pipeline_path)}.json"
+        entry_path.write_text("{corrupt")
+
+        assert cache.get(package_digest(pipeline_path)) is None
+        assert not entry_path.exists()
+        assert cache.load(pipeline_path).name == "echo-pipeline"
+        assert json.loads(entry_path.read_text())["name"] == "echo-pipeline"
+
+    def test_version_mismatch(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = PackageCache(directory=tmp_path / "cache")
+        cache.load(pipeline_path)
+
+        entry_path = tmp_path / "cache" / f"{package_digest(pipeline_path)}.json"
+        entry = json.loads(entry_path.read_text())
+        entry["version"] = -1
+        entry_path.write_text(json.dumps(entry))
+
+        assert cache.get(package_digest(pipeline_path)) is None
+        assert cache.load(pipeline_path).name == "echo-pipeline"
+
+    def test_eviction(self, tmp_path):
+        cache = PackageCache(directory=tmp_path / "cache")
+        paths = [
+            write_pipeline(tmp_path / f"pipeline-{i}.json", name=f"pipeline-{i}")
+            for i in range(3)
+        ]
+        cache.load(paths[0])
+        entry_size = os.path.getsize(
+            tmp_path / "cache" / f"{package_digest(paths[0])}.json"
+        )
+        cache.max_size = entry_size * 2
+
+        cache.load(paths[1])
+        os.utime(tmp_path / "cache" / f"{package_digest(paths[0])}.json", (0, 0))
+        cache.load(paths[2])
+
+        assert cache.get(package_digest(paths[0])) is None
+        assert cache.get(package_digest(paths[1])) is not None
+        assert cache.get(package_digest(paths[2])) is not None
+
+    def test_clear(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = PackageCache(directory=tmp_path / "cache")
+        cache.load(pipeline_path)
+        cache.clear()
+
+        assert list((tmp_path / "cache").iterdir()) == []
+
+
+class TestMemoryCache:
+    def test_load(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = MemoryCache()
+
+        with patch(
+            "kfp_toolbox.pipeline_parser.parse_pipeline_package",
+            wraps=parse_pipeline_package,
+        ) as mock_parse:
+            first = cache.load(pipeline_path)
+            second = cache.load(pipeline_path)
+
+        mock_parse.assert_called_once()
+        assert first is second
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert 0 < stats.size < 4096
+
+    def test_no_retained_spec(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = MemoryCache()
+
+        pipeline = cache.load(pipeline_path)
+
+        assert pipeline.spec["pipelineSpec"]["pipelineInfo"]["name"] == (
+            "echo-pipeline"
+        )
+        assert pipeline.spec is not pipeline.spec
+        assert pipeline.graph is not pipeline.graph
+
+    def test_modified_package(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = MemoryCache()
+
+        assert cache.load(pipeline_path).name == "echo-pipeline"
+        write_pipeline(pipeline_path, name="modified-pipeline")
+        os.utime(pipeline_path, ns=(0, 0))
+
+        assert cache.load(pipeline_path).name == "modified-pipeline"
+        assert cache.stats.misses == 2
+        assert cache.stats.entries == 1
+
+    def test_max_entries(self, tmp_path):
+        paths = [write_pipeline(tmp_path / f"pipeline-{i}.json") for i in range(3)]
+        cache = MemoryCache(max_entries=2)
+
+        cache.load(paths[0])
+        cache.load(paths[1])
+        cache.load(paths[0])
+        cache.load(paths[2])
+        cache.load(paths[0])
+        cache.load(paths[1])
+
+        assert cache.stats.hits == 2
+        assert cache.stats.misses == 4
+        assert cache.stats.evictions == 2
+        assert cache.stats.entries == 2
+
+    def test_max_bytes(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = MemoryCache(max_bytes=1)
+
+        cache.load(pipeline_path)
+        cache.load(pipeline_path)
+
+        assert cache.stats == CacheStats(misses=2)
+
+    def test_large_package(self, tmp_path):
+        # Only the header is kept, so a package larger than the budget is cached.
+        pipeline = json.loads(json.dumps(PIPELINE))
+        pipeline["pipelineSpec"]["deploymentSpec"] = {"padding": "x" * 1024 * 1024}
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            json.dump(pipeline, f)
+        cache = MemoryCache(max_bytes=64 * 1024)
+
+        cache.load(pipeline_path)
+        cache.load(pipeline_path)
+
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+        assert stats.size < os.path.getsize(pipeline_path)
+
+    def test_threads(self, tmp_path):
+        paths = [write_pipeline(tmp_path / f"pipeline-{i}.json") for i in range(4)]
+        cache = MemoryCache(max_entries=3)
+
+        def load():
+            for _ in range(50):
+                for path in paths:
+                    assert cache.load(path).name == "echo-pipeline"
+
+        threads = [threading.Thread(target=load) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats
+        assert stats.hits + stats.misses == 4 * 50 * 4
+        assert stats.entries == 3
+
+    def test_clear(self, tmp_path):
+        pipeline_path = write_pipeline(tmp_path / "pipeline.json")
+        cache = MemoryCache()
+        cache.load(pipeline_path)
+        cache.clear()
+
+        assert cache.stats == CacheStats(misses=1)
+
+
+class TestUploadCache:
+    def test_put(self, tmp_path):
+        cache = UploadCache(tmp_path / "uploads.json")
+        cache.put("http://localhost:8080", "digest", "pipeline-id", "version-id")
+
+        assert UploadCache(tmp_path / "uploads.json").get(
+            "http://localhost:8080", "digest"
+        ) == ("pipeline-id", "version-id")
+        assert cache.get("http://localhost:8081", "digest") is None
+        assert cache.get("http://localhost:8080", "another-digest") is None
+
+    def test_discard(self, tmp_path):
+        cache = UploadCache(tmp_path / "uploads.json")
+        cache.put("http://localhost:8080", "digest", "pipeline-id", "version-id")
+        cache.put("http://localhost:8080", "another", "pipeline-id", "version-id")
+        cache.discard("http://localhost:8080", "digest")
+
+        assert cache.get("http://localhost:8080", "digest") is None
+        assert cache.get("http://localhost:8080", "another") is not None
+
+    def test_corrupt_file(self, tmp_path):
+        (tmp_path / "uploads.json").write_text("{corrupt")
+        cache = UploadCache(tmp_path / "uploads.json")
+
+        assert cache.get("http://localhost:8080", "digest") is None
+        cache.put("http://localhost:8080", "digest", "pipeline-id", "version-id")
+        assert cache.get("http://localhost:8080", "digest") is not None
+
+    def test_default_path(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", os.fspath(tmp_path))
+        assert UploadCache().path == tmp_path / "kfp-toolbox" / "uploads.json"
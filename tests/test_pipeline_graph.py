@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+
+from kfp_toolbox.pipeline_graph import PipelineGraph, Task
+from kfp_toolbox.pipeline_parser import parse_pipeline_package
+
+
+def v2_spec():
+    def task(name, dependencies=()):
+        return {
+            "componentRef": {"name": f"comp-{name}"},
+            "dependentTasks": list(dependencies),
+            "taskInfo": {"name": name},
+        }
+
+    return {
+        "pipelineSpec": {
+            "components": {
+                "comp-a": {"executorLabel": "exec-a"},
+                "comp-b": {"executorLabel": "exec-b"},
+                "comp-c": {"executorLabel": "exec-c"},
+                "comp-d": {"dag": {"tasks": {}}},
+            },
+            "deploymentSpec": {
+                "executors": {
+                    "exec-a": {"container": {"image": "a"}},
+                    "exec-b": {"container": {"image": "b"}},
+                    "exec-c": {"container": {"image": "c"}},
+                }
+            },
+            "pipelineInfo": {"name": "graph-pipeline"},
+            "root": {
+                "dag": {
+                    "tasks": {
+                        "d": task("d", ["b", "c"]),
+                        "b": task("b", ["a"]),
+                        "c": task("c", ["a"]),
+                        "a": task("a"),
+                    }
+                }
+            },
+        },
+        "runtimeConfig": {},
+    }
+
+
+class TestPipelineGraph:
+    def test(self):
+        graph = PipelineGraph(
+            [
+                Task(name="a"),
+                Task(name="b", dependencies=("a",)),
+                Task(name="c", dependencies=("a", "b")),
+            ]
+        )
+
+        assert graph.topological_order == ["a", "b", "c"]
+        assert graph.successors == {"a": ["b", "c"], "b": ["c"], "c": []}
+        assert graph.predecessors == {"a": [], "b": ["a"], "c": ["a", "b"]}
+        assert graph.roots == ["a"]
+        assert graph.leaves == ["c"]
+        assert graph.fan_in("c") == 2
+        assert graph.fan_out("a") == 2
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ValueError) as exc_info:
+            PipelineGraph([Task(name="a", dependencies=("b",))])
+
+        assert str(exc_info.value) == "task 'a' depends on an unknown task 'b'"
+
+    def test_cycle(self):
+        with pytest.raises(ValueError) as exc_info:
+            PipelineGraph(
+                [
+                    Task(name="a"),
+                    Task(name="b", dependencies=("a", "c")),
+                    Task(name="c", dependencies=("b",)),
+                ]
+            )
+
+        assert str(exc_info.value) == (
+            "the dependencies of tasks contain a cycle: ['b', 'c']"
+        )
+
+    def test_from_spec(self):
+        graph = PipelineGraph.from_spec(v2_spec())
+
+        assert list(graph.tasks) == ["d", "b", "c", "a"]
+        assert graph.topological_order == ["a", "b", "c", "d"]
+        assert graph.tasks["b"] == Task(
+            name="b", component="comp-b", executor="exec-b", dependencies=("a",)
+        )
+        assert graph.executor("b") == {"container": {"image": "b"}}
+        assert graph.executor("d") is None
+        assert graph.fan_in("d") == 2
+        assert graph.fan_out("a") == 2
+
+    def test_from_v1_spec(self):
+        spec = {
+            "apiVersion": "argoproj.io/v1alpha1",
+            "kind": "Workflow",
+            "spec": {
+                "entrypoint": "graph-pipeline",
+                "templates": [
+                    {
+                        "name": "graph-pipeline",
+                        "dag": {
+                            "tasks": [
+                                {"name": "a", "template": "echo"},
+                                {
+                                    "name": "b",
+                                    "template": "echo",
+                                    "dependencies": ["a"],
+                                },
+                            ]
+                        },
+                    },
+                    {"name": "echo", "container": {"image": "echo"}},
+                ],
+            },
+        }
+
+        graph = PipelineGraph.from_spec(spec)
+
+        assert graph.topological_order == ["a", "b"]
+        assert graph.tasks["b"] == Task(
+            name="b", component="echo", executor="echo", dependencies=("a",)
+        )
+        assert graph.executor("a") == {"name": "echo", "container": {"image": "echo"}}
+
+    def test_invalid_schema(self):
+        with pytest.raises(ValueError) as exc_info:
+            PipelineGraph.from_spec({})
+
+        assert str(exc_info.value) == "invalid schema"
+
+    def test_pipeline(self, tmp_path):
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            json.dump(v2_spec(), f)
+
+        pipeline = parse_pipeline_package(pipeline_path, header_only=True)
+
+        assert pipeline.graph is pipeline.graph
+        assert pipeline.graph.topological_order == ["a", "b", "c", "d"]
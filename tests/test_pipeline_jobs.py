@@ -1,6 +1,25 @@
-from unittest.mock import patch
+import asyncio
+import datetime
+import io
+import itertools
+import os
+import tarfile
+from unittest.mock import DEFAULT, MagicMock, patch
 
-from kfp_toolbox.pipeline_jobs import submit_pipeline_job
+import pytest
+
+from kfp_toolbox.pipeline_cache import UploadCache, package_digest
+from kfp_toolbox.pipeline_jobs import (
+    RunEvent,
+    RunWatcher,
+    iter_submit_pipeline_jobs,
+    submit_pipeline_job,
+    submit_pipeline_job_async,
+    submit_pipeline_jobs,
+    wait_for_runs,
+)
+from kfp_toolbox.throttling import Throttle
+from kfp_toolbox.tracing import Tracer
 
 
 class TestSubmitPipelineJob:
@@ -60,3 +79,602 @@ class TestSubmitPipelineJob:
             enable_caching=None,
             service_account=None,
         )
+
+    @patch("kfp.Client")
+    def test_reuse_client(self, mock_kfp):
+        for _ in range(3):
+            submit_pipeline_job(
+                pipeline_file="/path/to/file", endpoint="http://localhost:8080"
+            )
+
+        mock_kfp.assert_called_once()
+        create_run = mock_kfp.return_value.create_run_from_pipeline_package
+        assert create_run.call_count == 3
+
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_compressed_package(self, mock_aip, tmp_path):
+        pipeline_json = b'{"pipelineSpec": {}, "runtimeConfig": {}}'
+        pipeline_path = os.fspath(tmp_path / "pipeline.tar.gz")
+        with tarfile.open(pipeline_path, "w:gz") as tar:
+            tarinfo = tarfile.TarInfo("pipeline.json")
+            tarinfo.size = len(pipeline_json)
+            tar.addfile(tarinfo, io.BytesIO(pipeline_json))
+
+        templates = []
+
+        def read_template(template_path, **kwargs):
+            with open(template_path, "rb") as f:
+                templates.append((template_path, f.read()))
+            return DEFAULT
+
+        mock_aip.side_effect = read_template
+        submit_pipeline_job(pipeline_file=pipeline_path)
+
+        assert len(templates) == 1
+        template_path, template = templates[0]
+        assert template_path != pipeline_path
+        assert template == pipeline_json
+        assert not os.path.exists(template_path)
+
+    @patch("time.sleep")
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_throttle(self, mock_aip, mock_sleep):
+        mock_aip.return_value.submit.side_effect = [ApiException(429), None]
+        throttle = Throttle(base_delay=0.01)
+
+        submit_pipeline_job(pipeline_file="/path/to/file", throttle=throttle)
+
+        assert mock_aip.return_value.submit.call_count == 2
+        assert throttle.retries == 1
+
+    @patch("time.sleep")
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_throttle_unavailable(self, mock_aip, mock_sleep):
+        # The job may have been created before the service became unavailable, so
+        # it is not submitted again.
+        mock_aip.return_value.submit.side_effect = [ApiException(503), None]
+        throttle = Throttle(base_delay=0.01)
+
+        with pytest.raises(ApiException):
+            submit_pipeline_job(pipeline_file="/path/to/file", throttle=throttle)
+
+        mock_aip.return_value.submit.assert_called_once()
+        assert throttle.retries == 0
+        assert throttle.throttled == 1
+
+    @patch("time.sleep")
+    @patch("kfp.Client")
+    def test_throttle_requests(self, mock_kfp, mock_sleep, pipeline_path):
+        client = mock_kfp.return_value
+        client.get_pipeline_id.side_effect = [ApiException(503), "pipeline-id"]
+        version = MagicMock(id="version-id")
+        version.name = f"echo-pipeline-{package_digest(pipeline_path)[:16]}"
+        client.list_pipeline_versions.return_value = MagicMock(
+            versions=[version], next_page_token=""
+        )
+        client.run_pipeline.side_effect = [ApiException(429), MagicMock(id="run-id")]
+        throttle = Throttle(base_delay=0.01)
+
+        result = submit_pipeline_job(
+            pipeline_file=pipeline_path,
+            endpoint="http://localhost:8080",
+            upload_pipeline=True,
+            throttle=throttle,
+        )
+
+        assert result.run_id == "run-id"
+        assert client.get_pipeline_id.call_count == 2
+        client.upload_pipeline_version.assert_not_called()
+        client.create_experiment.assert_called_once()
+        assert client.run_pipeline.call_count == 2
+        assert throttle.retries == 2
+
+
+class ApiException(Exception):
+    def __init__(self, status):
+        self.status = status
+
+
+class TestUploadPipeline:
+    @patch("kfp.Client")
+    def test_new_pipeline(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client.get_pipeline_id.return_value = None
+        client.upload_pipeline.return_value = MagicMock(
+            id="pipeline-id", default_version=MagicMock(id="default-version-id")
+        )
+        client.upload_pipeline_version.return_value.id = "version-id"
+        client.create_experiment.return_value.id = "experiment-id"
+        client.run_pipeline.return_value.id = "run-id"
+        uploaded = []
+
+        def upload(pipeline_package_path, **kwargs):
+            with open(pipeline_package_path) as f:
+                uploaded.append(f.read())
+            return DEFAULT
+
+        client.upload_pipeline.side_effect = upload
+        client.upload_pipeline_version.side_effect = upload
+
+        for i in range(2):
+            result = submit_pipeline_job(
+                pipeline_file=pipeline_path,
+                endpoint="http://localhost:8080",
+                arguments={"param": i},
+                run_name=f"test-run-{i}",
+                experiment_name="test-experiment",
+                upload_pipeline=True,
+            )
+
+        with open(pipeline_path) as f:
+            assert uploaded == [f.read()] * 2
+        client.upload_pipeline.assert_called_once()
+        assert client.upload_pipeline.call_args[1]["pipeline_name"] == "echo-pipeline"
+        # The version is named by the digest, so that it is found with a cold cache.
+        client.upload_pipeline_version.assert_called_once()
+        kwargs = client.upload_pipeline_version.call_args[1]
+        assert kwargs["pipeline_id"] == "pipeline-id"
+        assert kwargs["pipeline_version_name"] == (
+            f"echo-pipeline-{package_digest(pipeline_path)[:16]}"
+        )
+        client.create_run_from_pipeline_package.assert_not_called()
+        client.create_experiment.assert_called_with(
+            name="test-experiment", namespace=None
+        )
+        client.run_pipeline.assert_called_with(
+            experiment_id="experiment-id",
+            job_name="test-run-1",
+            params={"param": 1},
+            pipeline_id="pipeline-id",
+            version_id="version-id",
+            pipeline_root=None,
+            service_account=None,
+        )
+        assert result.run_id == "run-id"
+
+    @patch("kfp.Client")
+    def test_trace(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client.get_pipeline_id.return_value = None
+        client.upload_pipeline.return_value.id = "pipeline-id"
+        client.upload_pipeline_version.return_value.id = "version-id"
+        tracers = [Tracer(), Tracer()]
+
+        for tracer in tracers:
+            submit_pipeline_job(
+                pipeline_file=pipeline_path,
+                endpoint="http://localhost:8080",
+                arguments={"param": 1},
+                upload_pipeline=True,
+                tracer=tracer,
+            )
+
+        for tracer, cached in zip(tracers, [False, True]):
+            spans = {s.name: s for s in tracer.spans}
+            assert list(spans) == [
+                "import",
+                "client",
+                "upload",
+                "experiment",
+                "run",
+                "submit",
+            ]
+            assert spans["upload"].attributes == {"cached": cached}
+            assert spans["run"].bytes == len('{"param": 1}')
+        assert tracers[0].spans[2].bytes == os.path.getsize(pipeline_path)
+        assert tracers[1].spans[2].bytes is None
+
+    @patch("kfp.Client")
+    def test_existing_version(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client.get_pipeline_id.return_value = "pipeline-id"
+        version_name = f"echo-pipeline-{package_digest(pipeline_path)[:16]}"
+        versions = [MagicMock(id=f"version-{i}") for i in range(3)]
+        for i, version in enumerate(versions):
+            version.name = version_name if i == 2 else f"version-{i}"
+        client.list_pipeline_versions.side_effect = [
+            MagicMock(versions=versions[:2], next_page_token="token"),
+            MagicMock(versions=versions[2:], next_page_token=""),
+        ]
+
+        submit_pipeline_job(
+            pipeline_file=pipeline_path,
+            endpoint="http://localhost:8080",
+            upload_pipeline=True,
+        )
+
+        client.upload_pipeline.assert_not_called()
+        client.upload_pipeline_version.assert_not_called()
+        assert client.run_pipeline.call_args[1]["version_id"] == "version-2"
+
+    @patch("kfp.Client")
+    def test_new_version(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client.get_pipeline_id.return_value = "pipeline-id"
+        client.list_pipeline_versions.return_value = MagicMock(
+            versions=None, next_page_token=""
+        )
+        client.upload_pipeline_version.return_value.id = "version-id"
+
+        submit_pipeline_jobs(
+            pipeline_file=pipeline_path,
+            arguments_list=[{"param": i} for i in range(3)],
+            endpoint="http://localhost:8080",
+            upload_pipeline=True,
+        )
+
+        client.upload_pipeline_version.assert_called_once()
+        kwargs = client.upload_pipeline_version.call_args[1]
+        assert kwargs["pipeline_id"] == "pipeline-id"
+        assert kwargs["pipeline_package_path"].endswith(".yaml")
+        assert kwargs["pipeline_version_name"].startswith("echo-pipeline-")
+        client.create_experiment.assert_called_once()
+        assert client.run_pipeline.call_count == 3
+        assert {
+            call[1]["version_id"] for call in client.run_pipeline.call_args_list
+        } == {"version-id"}
+
+    @patch("kfp.Client")
+    def test_deleted_version(self, mock_kfp, pipeline_path):
+        client = mock_kfp.return_value
+        client.get_pipeline_id.return_value = "pipeline-id"
+        client.list_pipeline_versions.return_value = MagicMock(
+            versions=None, next_page_token=""
+        )
+        client.upload_pipeline_version.return_value.id = "new-version-id"
+        UploadCache().put(
+            "http://localhost:8080",
+            package_digest(pipeline_path),
+            "pipeline-id",
+            "deleted-version-id",
+        )
+        client.run_pipeline.side_effect = [ApiException(404), DEFAULT]
+
+        submit_pipeline_job(
+            pipeline_file=pipeline_path,
+            endpoint="http://localhost:8080",
+            upload_pipeline=True,
+        )
+
+        client.upload_pipeline_version.assert_called_once()
+        assert [
+            call[1]["version_id"] for call in client.run_pipeline.call_args_list
+        ] == ["deleted-version-id", "new-version-id"]
+        assert UploadCache().get(
+            "http://localhost:8080", package_digest(pipeline_path)
+        ) == ("pipeline-id", "new-version-id")
+
+    @patch("kfp.Client")
+    def test_enable_caching(self, mock_kfp, pipeline_path):
+        with pytest.raises(ValueError):
+            submit_pipeline_job(
+                pipeline_file=pipeline_path,
+                endpoint="http://localhost:8080",
+                enable_caching=False,
+                upload_pipeline=True,
+            )
+
+
+class TestSubmitPipelineJobs:
+    @patch("kfp_toolbox.pipeline_parser.parse_pipeline_package")
+    @patch("google.cloud.aiplatform.PipelineJob")
+    @patch("kfp.Client")
+    def test_endpoint(self, mock_kfp, mock_aip, mock_parse, pipeline_path):
+        mock_parse.return_value.spec = {"kind": "Workflow"}
+        client = mock_kfp.return_value
+        client.create_experiment.return_value.id = "experiment-id"
+        client._run_api.create_run.side_effect = lambda body: MagicMock(
+            run=MagicMock(id=body.name)
+        )
+
+        results = submit_pipeline_jobs(
+            pipeline_file=pipeline_path,
+            arguments_list=[{"param": i} for i in range(10)],
+            max_workers=3,
+            run_name="test-run",
+            endpoint="http://localhost:8080",
+        )
+
+        mock_aip.assert_not_called()
+        mock_kfp.assert_called_once()
+        mock_parse.assert_called_once_with(pipeline_path)
+        client.create_experiment.assert_called_once_with(name="Default", namespace=None)
+        client.create_run_from_pipeline_package.assert_not_called()
+        assert [result.run_id for result in results] == [
+            f"test-run-{i}" for i in range(10)
+        ]
+        assert client._run_api.create_run.call_count == 10
+        bodies = {
+            call[1]["body"].name: call[1]["body"]
+            for call in client._run_api.create_run.call_args_list
+        }
+        body = bodies["test-run-3"]
+        assert body.pipeline_spec.workflow_manifest == '{"kind": "Workflow"}'
+        assert [(p.name, p.value) for p in body.pipeline_spec.parameters] == [
+            ("param", "3")
+        ]
+        assert body.resource_references[0].key.id == "experiment-id"
+        assert body.service_account is None
+
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_no_endpoints(self, mock_aip):
+        template = mock_aip.return_value
+        template.job_id = "test-run"
+        clones = [MagicMock() for _ in range(3)]
+        template.clone.side_effect = clones
+
+        results = submit_pipeline_jobs(
+            pipeline_file="/path/to/file",
+            arguments_list=[{"param": i} for i in range(3)],
+            max_workers=1,
+            run_name="test-run",
+            experiment_name="test-experiment",
+        )
+
+        mock_aip.assert_called_once_with(
+            display_name=None,
+            template_path="/path/to/file",
+            job_id="test-run",
+            pipeline_root=None,
+            parameter_values=None,
+            enable_caching=None,
+            encryption_spec_key_name=None,
+            labels=None,
+            project=None,
+            location=None,
+        )
+        template.submit.assert_not_called()
+        assert results == clones
+        for i, clone in enumerate(clones):
+            template.clone.assert_any_call(
+                job_id=f"test-run-{i}", parameter_values={"param": i}
+            )
+            clone.submit.assert_called_once_with(
+                service_account=None, network=None, experiment="test-experiment"
+            )
+
+    @patch("kfp.Client")
+    def test_failures(self, mock_kfp, pipeline_path):
+        def create_run(body):
+            param = int(body.pipeline_spec.parameters[0].value)
+            if param % 2:
+                raise RuntimeError(param)
+            return MagicMock(run=MagicMock(id=param))
+
+        mock_kfp.return_value._run_api.create_run.side_effect = create_run
+
+        results = submit_pipeline_jobs(
+            pipeline_file=pipeline_path,
+            arguments_list=({"param": i} for i in range(5)),
+            endpoint="http://localhost:8080",
+        )
+
+        assert [result.run_id for result in results[0::2]] == [0, 2, 4]
+        assert [type(result) for result in results[1::2]] == [RuntimeError] * 2
+        assert [result.args for result in results[1::2]] == [(1,), (3,)]
+
+
+class TestIterSubmitPipelineJobs:
+    @patch("kfp.Client")
+    def test_lazy(self, mock_kfp, pipeline_path):
+        mock_kfp.return_value._run_api.create_run.side_effect = lambda body: (
+            MagicMock(run=MagicMock(id=int(body.pipeline_spec.parameters[0].value)))
+        )
+        consumed = []
+
+        def arguments_list():
+            for i in itertools.count():
+                consumed.append(i)
+                yield {"param": i}
+
+        results = iter_submit_pipeline_jobs(
+            pipeline_file=pipeline_path,
+            arguments_list=arguments_list(),
+            max_workers=2,
+            endpoint="http://localhost:8080",
+        )
+
+        assert [next(results).run_id for _ in range(10)] == list(range(10))
+        assert len(consumed) <= 10 + 2 * 2
+        results.close()
+
+
+class TestSubmitPipelineJobAsync:
+    @patch("kfp.Client")
+    def test_endpoint(self, mock_kfp):
+        mock_create_run = mock_kfp.return_value.create_run_from_pipeline_package
+
+        async def submit():
+            semaphore = asyncio.Semaphore(2)
+            return await asyncio.gather(
+                *(
+                    submit_pipeline_job_async(
+                        "/path/to/file",
+                        semaphore=semaphore,
+                        endpoint="http://localhost:8080",
+                        arguments={"param": i},
+                    )
+                    for i in range(5)
+                )
+            )
+
+        results = asyncio.run(submit())
+
+        assert results == [mock_create_run.return_value] * 5
+        assert mock_create_run.call_count == 5
+        mock_create_run.assert_any_call(
+            pipeline_file="/path/to/file",
+            arguments={"param": 4},
+            run_name=None,
+            experiment_name=None,
+            namespace=None,
+            pipeline_root=None,
+            enable_caching=None,
+            service_account=None,
+        )
+
+    @patch("google.cloud.aiplatform.PipelineJob")
+    def test_no_endpoints(self, mock_aip):
+        result = asyncio.run(submit_pipeline_job_async("/path/to/file"))
+
+        assert result is mock_aip.return_value
+        mock_aip.return_value.submit.assert_called_once()
+
+
+class TestWaitForRuns:
+    def test_kfp(self):
+        run = MagicMock(run_id="run-id")
+        run._client.get_run.side_effect = [
+            MagicMock(run=MagicMock(status=status))
+            for status in [None, "Running", "Succeeded"]
+        ]
+
+        states = asyncio.run(wait_for_runs([run], poll_interval=0))
+
+        assert states == ["Succeeded"]
+        assert run._client.get_run.call_count == 3
+        run._client.get_run.assert_called_with("run-id")
+
+    def test_vertex(self):
+        class Job:
+            def __init__(self, states):
+                self.states = iter(states)
+
+            @property
+            def state(self):
+                return next(self.states)
+
+        runs = [
+            Job(["PIPELINE_STATE_RUNNING", "PIPELINE_STATE_SUCCEEDED"]),
+            Job(["PIPELINE_STATE_FAILED"]),
+        ]
+
+        states = asyncio.run(wait_for_runs(runs, poll_interval=0))
+
+        assert states == ["PIPELINE_STATE_SUCCEEDED", "PIPELINE_STATE_FAILED"]
+
+    def test_timeout(self):
+        run = MagicMock(run_id="run-id")
+        run._client.get_run.return_value.run.status = "Running"
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(wait_for_runs([run], poll_interval=0.01, timeout=0.05))
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRunWatcher:
+    @pytest.fixture
+    def fake_time(self):
+        fake = FakeTime()
+        with patch("kfp_toolbox.pipeline_jobs.time", fake):
+            yield fake
+
+    def kfp_run(self, run_id, statuses):
+        run = MagicMock(spec=["run_id", "_client"], run_id=run_id)
+        run._client.get_run.side_effect = [
+            MagicMock(run=MagicMock(status=status)) for status in statuses
+        ]
+        return run
+
+    def vertex_run(self, name):
+        run = MagicMock(spec=["project", "location", "resource_name", "gca_resource"])
+        run.project, run.location, run.resource_name = "project", "location", name
+        run.gca_resource.create_time = datetime.datetime(
+            2022, 1, 1, tzinfo=datetime.timezone.utc
+        )
+        run.credentials = "credentials"
+        return run
+
+    def vertex_job(self, name, state):
+        job = MagicMock(resource_name=name)
+        job.gca_resource.state.name = state
+        return job
+
+    def test_kfp(self, fake_time):
+        run = self.kfp_run("run-id", ["Running"] * 4 + ["Succeeded"])
+        events = []
+        watcher = RunWatcher(
+            min_interval=1.0, max_interval=4.0, age_factor=0.5, callback=events.append
+        )
+        watcher.add(run)
+
+        assert list(watcher.watch()) == [
+            RunEvent(run=run, state="Running", final=False),
+            RunEvent(run=run, state="Succeeded", final=True),
+        ]
+        assert events == [
+            RunEvent(run=run, state="Running", final=False),
+            RunEvent(run=run, state="Succeeded", final=True),
+        ]
+        # The interval grows with the age of the state: 1 (min), 1, 1, 1.5.
+        assert fake_time.sleeps == [1.0, 1.0, 1.0, 1.5]
+        assert watcher.requests == 5
+        assert len(watcher) == 0
+
+    def test_vertex(self, fake_time):
+        runs = [self.vertex_run(f"job-{i}") for i in range(3)]
+        watcher = RunWatcher(min_interval=1.0)
+        for run in runs:
+            watcher.add(run)
+
+        with patch("google.cloud.aiplatform.PipelineJob.list") as mock_list:
+            mock_list.side_effect = [
+                [
+                    self.vertex_job("job-0", "PIPELINE_STATE_RUNNING"),
+                    self.vertex_job("job-1", "PIPELINE_STATE_SUCCEEDED"),
+                    self.vertex_job("job-2", "PIPELINE_STATE_RUNNING"),
+                    self.vertex_job("another-job", "PIPELINE_STATE_RUNNING"),
+                ],
+                [self.vertex_job("job-0", "PIPELINE_STATE_FAILED")],
+                [self.vertex_job("job-2", "PIPELINE_STATE_CANCELLED")],
+            ]
+            events = list(watcher.watch())
+
+        assert [(event.run, event.state) for event in events] == [
+            (runs[0], "PIPELINE_STATE_RUNNING"),
+            (runs[1], "PIPELINE_STATE_SUCCEEDED"),
+            (runs[2], "PIPELINE_STATE_RUNNING"),
+            (runs[0], "PIPELINE_STATE_FAILED"),
+            (runs[2], "PIPELINE_STATE_CANCELLED"),
+        ]
+        assert mock_list.call_count == watcher.requests == 3
+        mock_list.assert_any_call(
+            filter='update_time>"2021-12-31T23:59:00Z"',
+            project="project",
+            location="location",
+            credentials="credentials",
+        )
+        assert len(watcher) == 0
+
+    def test_timeout(self, fake_time):
+        run = self.kfp_run("run-id", ["Running"] * 10)
+        watcher = RunWatcher(min_interval=1.0)
+        watcher.add(run)
+
+        with pytest.raises(TimeoutError):
+            list(watcher.watch(timeout=3.0))
+        assert fake_time.now <= 3.0
+
+    def test_poll_only_due_runs(self, fake_time):
+        runs = [self.kfp_run(f"run-{i}", ["Running"] * 3) for i in range(2)]
+        watcher = RunWatcher(min_interval=1.0)
+        watcher.add(runs[0])
+        watcher.poll()
+        watcher.add(runs[1])
+
+        assert len(watcher.poll()) == 1
+        assert runs[0]._client.get_run.call_count == 1
+        assert runs[1]._client.get_run.call_count == 1
+        assert watcher.next_poll_at() == 1.0
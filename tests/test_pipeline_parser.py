@@ -1,12 +1,58 @@
+import gzip
+import io
+import json
 import os
+import tarfile
+import zipfile
 from typing import Dict, List
 
 import pytest
+import yaml
 from kfp import compiler as compiler_v1
 from kfp import dsl as dsl_v1
 from kfp.v2 import compiler, dsl
 
-from kfp_toolbox.pipeline_parser import Parameter, parse_pipeline_package
+from kfp_toolbox import pipeline_parser
+from kfp_toolbox.pipeline_parser import (
+    Parameter,
+    Pipeline,
+    is_compressed_pipeline_package,
+    parse_pipeline_package,
+    parse_pipeline_packages,
+    summarize_pipeline_package,
+)
+
+
+class TestParameter:
+    def test(self):
+        parameter = Parameter(name="int_param", type=int, default=1)
+
+        assert parameter == Parameter(name="int_param", type=int, default=1)
+        assert parameter != Parameter(name="int_param", type=int)
+        assert repr(parameter) == (
+            "Parameter(name='int_param', type=<class 'int'>, default=1)"
+        )
+        with pytest.raises(AttributeError):
+            parameter.unknown = None
+
+
+class TestPipeline:
+    def test_parameter(self):
+        int_param = Parameter(name="int_param", type=int, default=1)
+        str_param = Parameter(name="str_param", type=str)
+        pipeline = Pipeline(name="echo-pipeline", parameters=[int_param, str_param])
+
+        assert pipeline.parameter("int_param") is int_param
+        assert pipeline.parameter("str_param") is str_param
+        assert "int_param" in pipeline
+        assert "float_param" not in pipeline
+        with pytest.raises(KeyError):
+            pipeline.parameter("float_param")
+
+        pipeline.parameters = [str_param]
+
+        assert "int_param" not in pipeline
+        assert pipeline.parameter("str_param") is str_param
 
 
 class TestParsePipelinePackage:
@@ -211,3 +257,383 @@ class TestParsePipelinePackage:
             parse_pipeline_package(pipeline_path)
 
         assert str(exc_info.value) == f"invalid schema: {pipeline_path}"
+
+    def test_yaml_package(self, tmp_path):
+        pipeline = """
+            pipelineSpec:
+              pipelineInfo:
+                name: echo-pipeline
+              root:
+                inputDefinitions:
+                  parameters:
+                    int_param:
+                      type: INT
+            runtimeConfig:
+              parameters:
+                int_param:
+                  intValue: 1
+        """
+        pipeline_path = os.fspath(tmp_path / "pipeline.yaml")
+        with open(pipeline_path, "w") as f:
+            f.write(pipeline)
+
+        pipeline = parse_pipeline_package(pipeline_path)
+
+        assert pipeline.name == "echo-pipeline"
+        assert pipeline.parameters == [Parameter(name="int_param", type=int, default=1)]
+
+    def test_flow_style_yaml_package(self, tmp_path):
+        pipeline = """
+            {
+                pipelineSpec: {
+                    pipelineInfo: {name: echo-pipeline},
+                    root: {}
+                },
+                runtimeConfig: {}
+            }
+        """
+        pipeline_path = os.fspath(tmp_path / "pipeline.yaml")
+        with open(pipeline_path, "w") as f:
+            f.write(pipeline)
+
+        pipeline = parse_pipeline_package(pipeline_path)
+
+        assert pipeline.name == "echo-pipeline"
+        assert len(pipeline.parameters) == 0
+
+    def test_header_only(self, tmp_path):
+        pipeline = {
+            "pipelineSpec": {
+                "components": {"comp-echo": {"executorLabel": "exec-echo"}},
+                "deploymentSpec": {
+                    "executors": {
+                        "exec-echo": {
+                            "container": {
+                                "command": ["sh", "-c", 'echo "{[\\"]}"'],
+                                "image": "python:3.7",
+                            }
+                        }
+                    }
+                },
+                "pipelineInfo": {"name": "echo-pipeline"},
+                "root": {
+                    "dag": {"tasks": {"echo": {"taskInfo": {"name": "echo"}}}},
+                    "inputDefinitions": {
+                        "parameters": {
+                            "int_param": {"type": "INT"},
+                            "str_param": {"type": "STRING"},
+                        }
+                    },
+                },
+                "schemaVersion": "2.0.0",
+            },
+            "runtimeConfig": {
+                "gcsOutputDirectory": "gs://bucket/path",
+                "parameters": {"str_param": {"stringValue": "あ\\n"}},
+            },
+        }
+        json_path = os.fspath(tmp_path / "pipeline.json")
+        with open(json_path, "w") as f:
+            json.dump(pipeline, f, indent=2)
+        yaml_path = os.fspath(tmp_path / "pipeline.yaml")
+        with open(yaml_path, "w") as f:
+            yaml.safe_dump(pipeline, f)
+
+        for pipeline_path in [json_path, yaml_path]:
+            full = parse_pipeline_package(pipeline_path)
+            header = parse_pipeline_package(pipeline_path, header_only=True)
+
+            assert header.name == full.name == "echo-pipeline"
+            assert header.parameters == full.parameters
+            assert header.parameters == [
+                Parameter(name="int_param", type=int),
+                Parameter(name="str_param", type=str, default="あ\\n"),
+            ]
+            assert full.spec == pipeline
+            assert header.spec == pipeline
+
+    def test_header_only_v1(self, tmp_path):
+        spec = {
+            "name": "echo-pipeline",
+            "inputs": [
+                {"name": "int_param", "type": "Integer", "default": "1"},
+                {"name": "pipeline-root"},
+            ],
+        }
+        pipeline = {
+            "apiVersion": "argoproj.io/v1alpha1",
+            "kind": "Workflow",
+            "metadata": {
+                "annotations": {
+                    "pipelines.kubeflow.org/pipeline_spec": json.dumps(spec)
+                }
+            },
+            "spec": {"templates": [{"name": "echo", "container": {"args": ["{}"]}}]},
+        }
+        pipeline_path = os.fspath(tmp_path / "pipeline.yaml")
+        with open(pipeline_path, "w") as f:
+            yaml.safe_dump(pipeline, f)
+
+        pipeline = parse_pipeline_package(pipeline_path, header_only=True)
+
+        assert pipeline.name == "echo-pipeline"
+        assert pipeline.parameters == [Parameter(name="int_param", type=int, default=1)]
+
+    def test_header_only_invalid_schema(self, tmp_path):
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            f.write('{"pipelineSpec": {"root": {}}, "runtimeConfig": {}}')
+
+        with pytest.raises(ValueError) as exc_info:
+            parse_pipeline_package(pipeline_path, header_only=True)
+
+        assert str(exc_info.value) == f"invalid schema: {pipeline_path}"
+
+    def test_header_only_empty_file(self, tmp_path):
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            f.write("")
+
+        with pytest.raises(ValueError) as exc_info:
+            parse_pipeline_package(pipeline_path, header_only=True)
+
+        assert str(exc_info.value) == f"invalid schema: {pipeline_path}"
+
+    def test_retain_spec(self, tmp_path):
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            f.write(
+                '{"pipelineSpec": {"pipelineInfo": {"name": "echo-pipeline"}, '
+                '"root": {}}, "runtimeConfig": {}}'
+            )
+
+        pipeline = parse_pipeline_package(pipeline_path, retain_spec=False)
+
+        assert pipeline.source == pipeline_path
+        assert pipeline.spec["pipelineSpec"]["pipelineInfo"]["name"] == "echo-pipeline"
+        assert pipeline.spec is not pipeline.spec
+
+        pipeline = parse_pipeline_package(pipeline_path, header_only=True)
+
+        assert pipeline.spec is pipeline.spec
+
+    @pytest.mark.parametrize("extension", [".tar.gz", ".zip", ".json.gz"])
+    def test_compressed(self, tmp_path, extension):
+        pipeline = {
+            "pipelineSpec": {
+                "pipelineInfo": {"name": "echo-pipeline"},
+                "root": {"inputDefinitions": {"parameters": {"p": {"type": "INT"}}}},
+            },
+            "runtimeConfig": {"parameters": {"p": {"intValue": 1}}},
+        }
+        pipeline_yaml = yaml.safe_dump(pipeline).encode()
+        pipeline_path = os.fspath(tmp_path / f"pipeline{extension}")
+        if extension == ".zip":
+            with zipfile.ZipFile(pipeline_path, "w") as archive:
+                archive.writestr("pipeline.yaml", pipeline_yaml)
+        elif extension == ".json.gz":  # not a tar archive
+            with gzip.open(pipeline_path, "wt") as f:
+                json.dump(pipeline, f)
+        else:
+            with tarfile.open(pipeline_path, "w:gz") as tar:
+                tarinfo = tarfile.TarInfo("pipeline.yaml")
+                tarinfo.size = len(pipeline_yaml)
+                tar.addfile(tarinfo, io.BytesIO(pipeline_yaml))
+
+        assert is_compressed_pipeline_package(pipeline_path)
+        for header_only in [False, True]:
+            parsed = parse_pipeline_package(pipeline_path, header_only=header_only)
+
+            assert parsed.name == "echo-pipeline"
+            assert parsed.parameters == [Parameter(name="p", type=int, default=1)]
+            assert parsed.spec == pipeline
+
+    def test_not_compressed(self, tmp_path):
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            f.write("{}")
+
+        assert not is_compressed_pipeline_package(pipeline_path)
+
+
+class TestSummarizePipelinePackage:
+    def test(self, tmp_path):
+        @dsl.component()
+        def echo(message: str) -> str:
+            return message
+
+        @dsl.component()
+        def hello() -> str:
+            return "hello"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(message: str = "hello, world", count: int = 1):
+            echo(message=message)
+            echo(message=hello().output)
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        compiler.Compiler().compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+        with open(pipeline_path) as f:
+            pipeline = json.load(f)
+        yaml_path = os.fspath(tmp_path / "pipeline.yaml")
+        with open(yaml_path, "w") as f:
+            yaml.safe_dump(pipeline, f)
+
+        for path in [pipeline_path, yaml_path]:
+            summary = summarize_pipeline_package(path)
+            graph = parse_pipeline_package(path).graph
+
+            assert summary.name == "echo-pipeline"
+            assert summary.parameters == [
+                Parameter(name="count", type=int, default=1),
+                Parameter(name="message", type=str, default="hello, world"),
+            ]
+            assert summary.tasks == len(graph.tasks) == 3
+            assert summary.components == len(graph.components) == 3
+            assert summary.size == os.path.getsize(path)
+            assert summary.source == os.path.abspath(path)
+
+    def test_v1(self, tmp_path):
+        @dsl.component()
+        def echo() -> str:
+            return "hello, world"
+
+        @dsl.pipeline(name="echo-pipeline")
+        def echo_pipeline(int_param: int = 1):
+            echo()
+            echo()
+
+        pipeline_path = os.fspath(tmp_path / "pipeline.yaml")
+        compiler_v1.Compiler(mode=dsl_v1.PipelineExecutionMode.V2_COMPATIBLE).compile(
+            pipeline_func=echo_pipeline, package_path=pipeline_path
+        )
+
+        with open(pipeline_path) as f:
+            pipeline = yaml.safe_load(f)
+        json_path = os.fspath(tmp_path / "pipeline.json")
+        with open(json_path, "w") as f:
+            json.dump(pipeline, f)
+
+        for path in [pipeline_path, json_path]:
+            summary = summarize_pipeline_package(path)
+            graph = parse_pipeline_package(path).graph
+
+            assert summary.name == "echo-pipeline"
+            assert summary.parameters == [
+                Parameter(name="int_param", type=int, default=1)
+            ]
+            assert summary.tasks == len(graph.tasks) == 2
+            assert summary.components == len(graph.components) == 3
+
+    def test_no_tasks(self, tmp_path):
+        pipeline = """
+            {
+                pipelineSpec: {
+                    pipelineInfo: {name: echo-pipeline},
+                    root: {dag: {tasks: {}}},
+                    components: []
+                },
+                runtimeConfig: {}
+            }
+        """
+        pipeline_path = os.fspath(tmp_path / "pipeline.yaml")
+        with open(pipeline_path, "w") as f:
+            f.write(pipeline)
+
+        summary = summarize_pipeline_package(pipeline_path)
+
+        assert summary.tasks == 0
+        assert summary.components == 0
+
+    def test_json_decoded(self, tmp_path, monkeypatch):
+        # JSON packages are counted from the decoded dict, without a YAML scan.
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            json.dump(
+                {
+                    "pipelineSpec": {
+                        "pipelineInfo": {"name": "echo-pipeline"},
+                        "root": {
+                            "inputDefinitions": {"parameters": {}},
+                            "dag": {"tasks": {"a": {}, "b": {}}},
+                        },
+                        "components": {"comp-a": {}},
+                    },
+                    "runtimeConfig": {},
+                },
+                f,
+            )
+        monkeypatch.setattr(pipeline_parser, "_YamlLoader", None)
+
+        summary = summarize_pipeline_package(pipeline_path)
+
+        assert summary.tasks == 2
+        assert summary.components == 1
+
+    def test_invalid_schema(self, tmp_path):
+        pipeline_path = os.fspath(tmp_path / "pipeline.json")
+        with open(pipeline_path, "w") as f:
+            f.write('{"spec": {"templates": [{"name": "echo"}]}}')
+
+        with pytest.raises(ValueError) as exc_info:
+            summarize_pipeline_package(pipeline_path)
+
+        assert str(exc_info.value) == f"invalid schema: {pipeline_path}"
+
+
+class TestParsePipelinePackages:
+    def write_packages(self, directory):
+        directory.mkdir()
+        for i in range(3):
+            with open(directory / f"pipeline-{i}.json", "w") as f:
+                json.dump(
+                    {
+                        "pipelineSpec": {
+                            "pipelineInfo": {"name": f"pipeline-{i}"},
+                            "root": {},
+                        },
+                        "runtimeConfig": {},
+                    },
+                    f,
+                )
+        with open(directory / "invalid.json", "w") as f:
+            f.write('{"invalid_schema": {}}')
+        with open(directory / "README.md", "w") as f:
+            f.write("# Pipelines")
+        return [os.fspath(directory / f"pipeline-{i}.json") for i in range(3)]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test(self, tmp_path, workers):
+        paths = self.write_packages(tmp_path / "pipelines")
+        invalid_path = os.fspath(tmp_path / "pipelines" / "invalid.json")
+
+        results = dict(parse_pipeline_packages(tmp_path / "pipelines", workers=workers))
+
+        assert sorted(results) == sorted(paths + [invalid_path])
+        for i, path in enumerate(paths):
+            assert results[path] == Pipeline(name=f"pipeline-{i}", parameters=[])
+            assert results[path].spec["pipelineSpec"]["pipelineInfo"]["name"] == (
+                f"pipeline-{i}"
+            )
+        assert isinstance(results[invalid_path], ValueError)
+        assert str(results[invalid_path]) == f"invalid schema: {invalid_path}"
+
+    def test_glob(self, tmp_path):
+        paths = self.write_packages(tmp_path / "pipelines")
+
+        results = parse_pipeline_packages(
+            os.fspath(tmp_path / "**" / "pipeline-*.json"), workers=1
+        )
+
+        assert sorted(path for path, _ in results) == paths
+
+    def test_paths(self, tmp_path):
+        paths = self.write_packages(tmp_path / "pipelines")
+        missing_path = os.fspath(tmp_path / "missing.json")
+
+        results = dict(parse_pipeline_packages([paths[0], missing_path], workers=2))
+
+        assert results[paths[0]].name == "pipeline-0"
+        assert isinstance(results[missing_path], FileNotFoundError)
@@ -0,0 +1,200 @@
+import itertools
+
+import pytest
+
+from kfp_toolbox.pipeline_parser import Parameter
+from kfp_toolbox.sweeps import (
+    LogUniform,
+    Uniform,
+    coerce_value,
+    grid_sweep,
+    list_sweep,
+    parse_axis,
+    random_sweep,
+)
+
+PARAMETERS = [
+    Parameter(name="learning_rate", type=float),
+    Parameter(name="batch_size", type=int, default=32),
+    Parameter(name="optimizer", type=str, default="adam"),
+]
+
+
+class TestCoerceValue:
+    def test_coerce(self):
+        assert coerce_value(PARAMETERS[0], "0.1") == 0.1
+        assert coerce_value(PARAMETERS[1], "64") == 64
+        assert coerce_value(PARAMETERS[1], 64.0) == 64
+        assert coerce_value(PARAMETERS[2], 1) == "1"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="invalid int value for 'batch_size'"):
+            coerce_value(PARAMETERS[1], "abc")
+        with pytest.raises(ValueError):
+            coerce_value(PARAMETERS[1], 1.5)
+        with pytest.raises(ValueError):
+            coerce_value(PARAMETERS[0], None)
+
+
+class TestParseAxis:
+    def test_list(self):
+        assert parse_axis(PARAMETERS[0], "0.1,0.01") == [0.1, 0.01]
+        assert parse_axis(PARAMETERS[1], "64") == [64]
+        assert parse_axis(PARAMETERS[2], "adam,sgd:momentum") == [
+            "adam",
+            "sgd:momentum",
+        ]
+
+    def test_range(self):
+        assert parse_axis(PARAMETERS[1], "1:9:2") == [1, 3, 5, 7, 9]
+        assert parse_axis(PARAMETERS[1], "1:4") == [1, 2, 3, 4]
+        assert parse_axis(PARAMETERS[1], "1:10:4,16") == [1, 5, 9, 16]
+        assert parse_axis(PARAMETERS[0], "0.1:0.5:0.1") == [0.1, 0.2, 0.3, 0.4, 0.5]
+
+    def test_multiplicative_range(self):
+        assert parse_axis(PARAMETERS[1], "32:256:x2") == [32, 64, 128, 256]
+        assert parse_axis(PARAMETERS[1], "32:300:x2") == [32, 64, 128, 256]
+        assert parse_axis(PARAMETERS[0], "1e-4:1e-1:x10") == [1e-4, 1e-3, 1e-2, 1e-1]
+
+    @pytest.mark.parametrize(
+        "parameter, spec",
+        [
+            (PARAMETERS[1], "1.5"),
+            (PARAMETERS[1], "1:2:3:4"),
+            (PARAMETERS[1], "5:1"),
+            (PARAMETERS[1], "1:5:0"),
+            (PARAMETERS[1], "1:5:0.5"),
+            (PARAMETERS[1], "0:8:x2"),
+            (PARAMETERS[0], "1:8:x1"),
+            (PARAMETERS[0], "1:8:xy"),
+        ],
+    )
+    def test_invalid(self, parameter, spec):
+        with pytest.raises(ValueError):
+            parse_axis(parameter, spec)
+
+
+class TestGridSweep:
+    def test_grid(self):
+        points = grid_sweep(
+            PARAMETERS,
+            {"learning_rate": ["0.1", "0.01"], "batch_size": [32, "64"]},
+            fixed={"optimizer": "sgd"},
+        )
+
+        assert list(points) == [
+            {"optimizer": "sgd", "learning_rate": 0.1, "batch_size": 32},
+            {"optimizer": "sgd", "learning_rate": 0.1, "batch_size": 64},
+            {"optimizer": "sgd", "learning_rate": 0.01, "batch_size": 32},
+            {"optimizer": "sgd", "learning_rate": 0.01, "batch_size": 64},
+        ]
+
+    def test_lazy(self):
+        parameters = [Parameter(name=f"p{i}", type=int) for i in range(6)]
+        points = grid_sweep(parameters, {f"p{i}": range(100) for i in range(6)})
+
+        assert list(itertools.islice(points, 2)) == [
+            {"p0": 0, "p1": 0, "p2": 0, "p3": 0, "p4": 0, "p5": 0},
+            {"p0": 0, "p1": 0, "p2": 0, "p3": 0, "p4": 0, "p5": 1},
+        ]
+
+    def test_validate_eagerly(self):
+        with pytest.raises(ValueError, match="unknown parameter"):
+            grid_sweep(PARAMETERS, {"unknown": [1]})
+        with pytest.raises(ValueError, match="missing required parameters"):
+            grid_sweep(PARAMETERS, {"batch_size": [1]})
+        with pytest.raises(ValueError, match="invalid float value"):
+            grid_sweep(PARAMETERS, {"learning_rate": ["abc"]})
+        with pytest.raises(ValueError, match="non-empty sequence"):
+            grid_sweep(PARAMETERS, {"learning_rate": []})
+        with pytest.raises(ValueError, match="non-empty sequence"):
+            grid_sweep(PARAMETERS, {"learning_rate": "0.1"})
+
+
+class TestRandomSweep:
+    def test_random(self):
+        points = list(
+            random_sweep(
+                PARAMETERS,
+                {
+                    "learning_rate": LogUniform(1e-4, 1e-1),
+                    "batch_size": Uniform(16, 128),
+                    "optimizer": ["adam", "sgd"],
+                },
+                num_samples=100,
+                seed=0,
+            )
+        )
+
+        assert len(points) == 100
+        for point in points:
+            assert 1e-4 <= point["learning_rate"] <= 1e-1
+            assert isinstance(point["batch_size"], int)
+            assert 16 <= point["batch_size"] <= 128
+            assert point["optimizer"] in ("adam", "sgd")
+        assert len({point["optimizer"] for point in points}) == 2
+
+    def test_seed(self):
+        def sample(seed):
+            points = random_sweep(
+                PARAMETERS, {"learning_rate": Uniform(0, 1)}, num_samples=5, seed=seed
+            )
+            return list(points)
+
+        assert sample(1) == sample(1)
+        assert sample(1) != sample(2)
+
+    def test_infinite(self):
+        points = random_sweep(PARAMETERS, {"learning_rate": Uniform(0, 1)})
+
+        assert len(list(itertools.islice(points, 1000))) == 1000
+
+    def test_log_uniform_int(self):
+        points = random_sweep(
+            PARAMETERS,
+            {"batch_size": LogUniform(1, 1024)},
+            num_samples=200,
+            fixed={"learning_rate": 0.1},
+            seed=0,
+        )
+
+        values = [point["batch_size"] for point in points]
+        assert all(isinstance(value, int) and 1 <= value <= 1024 for value in values)
+        # About 2/3 of log-uniform samples are below 100, against 1/10 of uniform ones.
+        assert sum(value < 100 for value in values) > len(values) / 2
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="cannot be used"):
+            random_sweep(
+                PARAMETERS, {"learning_rate": [0.1], "optimizer": Uniform(0, 1)}
+            )
+        with pytest.raises(ValueError, match="no int values"):
+            random_sweep(
+                PARAMETERS, {"learning_rate": [0.1], "batch_size": Uniform(1.2, 1.8)}
+            )
+        with pytest.raises(ValueError):
+            Uniform(1, 0)
+        with pytest.raises(ValueError):
+            LogUniform(0, 1)
+
+
+class TestListSweep:
+    def test_list(self):
+        points = list_sweep(
+            PARAMETERS,
+            ({"learning_rate": f"0.{i}"} for i in range(1, 4)),
+            fixed={"batch_size": "64"},
+        )
+
+        assert list(points) == [
+            {"batch_size": 64, "learning_rate": 0.1},
+            {"batch_size": 64, "learning_rate": 0.2},
+            {"batch_size": 64, "learning_rate": 0.3},
+        ]
+
+    def test_invalid_point(self):
+        points = list_sweep(PARAMETERS, [{"learning_rate": 0.1}, {"batch_size": 1}])
+
+        assert next(points) == {"learning_rate": 0.1}
+        with pytest.raises(ValueError, match="missing required parameters"):
+            next(points)
@@ -0,0 +1,187 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kfp_toolbox.throttling import (
+    REJECTED_STATUSES,
+    Throttle,
+    TokenBucket,
+    is_throttling_error,
+)
+
+
+class ApiError(Exception):
+    def __init__(self, status=None, code=None):
+        self.status = status
+        self.code = code
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+@pytest.fixture
+def fake_time():
+    fake = FakeTime()
+    with patch("kfp_toolbox.throttling.time", fake):
+        yield fake
+
+
+class TestIsThrottlingError:
+    def test_status(self):
+        assert is_throttling_error(ApiError(status=429))
+        assert is_throttling_error(ApiError(status=503))
+        assert is_throttling_error(ApiError(code=429))
+        assert not is_throttling_error(ApiError(status=404))
+        assert not is_throttling_error(ApiError(code="429"))
+        assert not is_throttling_error(ValueError())
+
+    def test_statuses(self):
+        assert is_throttling_error(ApiError(status=429), REJECTED_STATUSES)
+        assert not is_throttling_error(ApiError(status=503), REJECTED_STATUSES)
+
+
+class TestTokenBucket:
+    def test_acquire(self, fake_time):
+        bucket = TokenBucket(rate=2.0, burst=2)
+
+        waits = [bucket.acquire() for _ in range(4)]
+
+        assert waits == [0.0, 0.0, 0.5, 0.5]
+        assert fake_time.now == 1.0
+
+    def test_refill(self, fake_time):
+        bucket = TokenBucket(rate=1.0, burst=2)
+        bucket.acquire()
+        bucket.acquire()
+        fake_time.now += 10
+
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 1.0
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1.0).rate = -1
+
+
+class TestThrottle:
+    def test_success(self, fake_time):
+        throttle = Throttle(rate=1.0, max_rate=2.0, increase=0.5)
+        func = MagicMock(return_value="result")
+
+        assert throttle.call(func, 1, key="value") == "result"
+        assert throttle.call(func, 2) == "result"
+        assert throttle.call(func, 3) == "result"
+
+        func.assert_called_with(3)
+        assert throttle.rate == 2.0
+        assert throttle.calls == 3
+        assert throttle.retries == 0
+
+    def test_retry(self, fake_time):
+        throttle = Throttle(rate=8.0, base_delay=1.0)
+        func = MagicMock(side_effect=[ApiError(status=429), ApiError(code=503), "ok"])
+
+        with patch("random.uniform", side_effect=lambda a, b: b):
+            assert throttle.call(func) == "ok"
+
+        assert func.call_count == 3
+        assert throttle.retries == 2
+        assert throttle.throttled == 2
+        assert [1.0, 2.0] == [s for s in fake_time.sleeps if s >= 1.0]
+        assert throttle.rate == 2.0 + throttle.increase
+
+    def test_create(self, fake_time):
+        throttle = Throttle(rate=8.0, base_delay=1.0)
+        func = MagicMock(side_effect=[ApiError(status=429), "ok"])
+
+        with patch("random.uniform", return_value=0.0):
+            assert throttle.create(func, key="value") == "ok"
+
+        func.assert_called_with(key="value")
+        assert throttle.retries == 1
+
+    def test_create_unavailable(self, fake_time):
+        # The resource may have been created before the service became unavailable.
+        throttle = Throttle(rate=8.0)
+        func = MagicMock(side_effect=ApiError(code=503))
+
+        with pytest.raises(ApiError):
+            throttle.create(func)
+
+        func.assert_called_once()
+        assert throttle.retries == 0
+        assert throttle.throttled == 1
+        assert throttle.rate == 4.0
+
+    def test_decrease_interval(self, fake_time):
+        throttle = Throttle(rate=8.0, decrease_interval=10.0)
+        func = MagicMock(side_effect=[ApiError(status=429), ApiError(status=429), "ok"])
+
+        with patch("random.uniform", return_value=0.0):
+            assert throttle.call(func) == "ok"
+
+        assert throttle.throttled == 2
+        assert throttle.rate == 4.0 + throttle.increase
+
+    def test_other_errors(self, fake_time):
+        throttle = Throttle()
+        func = MagicMock(side_effect=ApiError(status=500))
+
+        with pytest.raises(ApiError):
+            throttle.call(func)
+
+        func.assert_called_once()
+        assert throttle.rate == 10.0
+
+    def test_max_attempts(self, fake_time):
+        throttle = Throttle(max_attempts=3)
+        func = MagicMock(side_effect=ApiError(status=429))
+
+        with pytest.raises(ApiError):
+            throttle.call(func)
+
+        assert func.call_count == 3
+
+    def test_min_rate(self, fake_time):
+        throttle = Throttle(rate=1.0, min_rate=0.4, max_attempts=4)
+        func = MagicMock(side_effect=ApiError(status=429))
+
+        with pytest.raises(ApiError):
+            throttle.call(func)
+
+        assert throttle.rate == 0.4
+
+    def test_retry_budget(self, fake_time):
+        throttle = Throttle(min_retries=2, retry_ratio=0.5, max_attempts=10)
+        func = MagicMock(side_effect=ApiError(status=429))
+
+        with pytest.raises(ApiError):
+            throttle.call(func)
+        assert func.call_count == 4  # retries while fewer than 2 + 0.5 * 1
+
+        func.reset_mock()
+        with pytest.raises(ApiError):
+            throttle.call(func)
+        assert func.call_count == 1  # the budget of 2 + 0.5 * 2 is exhausted
+
+    def test_invalid_rates(self):
+        with pytest.raises(ValueError):
+            Throttle(rate=1.0, min_rate=2.0)
+        with pytest.raises(ValueError):
+            Throttle(rate=2.0, max_rate=1.0)
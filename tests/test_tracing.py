@@ -0,0 +1,118 @@
+import io
+import json
+import threading
+
+import pytest
+
+from kfp_toolbox.tracing import JsonLinesExporter, Span, Tracer, file_size, span
+
+
+class TestTracer:
+    def test_span(self):
+        exported = []
+        tracer = Tracer([exported.append])
+
+        with tracer.span("submit", backend="FakeBackend"):
+            with tracer.span("run") as run_span:
+                run_span.bytes = 10
+
+        assert [s.name for s in tracer.spans] == ["run", "submit"]
+        assert exported == tracer.spans
+        run, submit = tracer.spans
+        assert run.parent == "submit"
+        assert run.bytes == 10
+        assert submit.parent is None
+        assert submit.attributes == {"backend": "FakeBackend"}
+        assert submit.duration >= run.duration >= 0
+        assert submit.error is None
+
+    def test_error(self):
+        tracer = Tracer()
+
+        with pytest.raises(ValueError):
+            with tracer.span("parse"):
+                raise ValueError()
+
+        assert tracer.spans[0].error == "ValueError"
+
+    def test_threads(self):
+        tracer = Tracer()
+
+        def work():
+            with tracer.span("run"):
+                pass
+
+        with tracer.span("submit"):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+        run, submit = tracer.spans
+        assert run.parent is None
+
+    def test_summary(self):
+        tracer = Tracer()
+        tracer.spans = [
+            Span("run", start=0.0, duration=1.0),
+            Span("run", start=1.0, duration=2.0),
+            Span("parse", start=0.0, duration=0.5),
+        ]
+
+        assert tracer.summary() == {"run": 3.0, "parse": 0.5}
+
+
+class TestSpan:
+    def test_no_tracer(self):
+        with span(None, "run") as s:
+            s.bytes = 10
+
+        assert s.name == "run"
+
+    def test_tracer(self):
+        tracer = Tracer()
+
+        with span(tracer, "run", index=1):
+            pass
+
+        assert tracer.spans[0].attributes == {"index": 1}
+
+
+class TestJsonLinesExporter:
+    def test_path(self, tmp_path):
+        path = tmp_path / "trace.jsonl"
+        path.write_text('{"name": "previous"}\n')
+
+        with JsonLinesExporter(path) as exporter:
+            exporter(Span("parse", start=1.0, duration=0.5, bytes=100))
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines == [
+            {"name": "previous"},
+            {
+                "name": "parse",
+                "start": 1.0,
+                "duration": 0.5,
+                "bytes": 100,
+                "parent": None,
+                "error": None,
+                "attributes": {},
+            },
+        ]
+
+    def test_file(self):
+        file = io.StringIO()
+        exporter = JsonLinesExporter(file)
+
+        exporter(Span("run", start=0.0, attributes={"path": object()}))
+        exporter.close()
+
+        assert not file.closed
+        assert json.loads(file.getvalue())["name"] == "run"
+
+
+def test_file_size(tmp_path):
+    path = tmp_path / "pipeline.json"
+    path.write_bytes(b"12345")
+
+    assert file_size(path) == 5
+    assert file_size(tmp_path / "missing") is None